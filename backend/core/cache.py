@@ -0,0 +1,418 @@
+import asyncio
+import functools
+import inspect
+import math
+import random
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Union
+
+from fastapi import HTTPException
+from redis.client import NEVER_DECODE
+from redis.exceptions import LockError, RedisError
+
+from backend.core.config import (
+    logger,
+    CACHE_LOCK_TIMEOUT_SECONDS,
+    CACHE_LOCK_WAIT_SECONDS,
+    CACHE_XFETCH_BETA,
+    CACHE_TTL_JITTER,
+    CACHE_NEGATIVE_TTL_SECONDS,
+)
+from backend.core.redis_client import (
+    UNAVAILABLE,
+    get_redis_client,
+    call_redis,
+    cache_get,
+    cache_set,
+    decode_cached,
+    cache_key,
+    invalidate_cache,
+    key_family,
+    key_template,
+    legacy_key,
+    register_cache_tag,
+)
+from backend.core import metrics
+from backend.core.cache_codec import encode_value
+from backend.core.local_cache import local_cache
+
+ComputeFunction = Callable[[], Awaitable[Any]]
+TTL = Union[int, Callable[[Any], int]]
+
+CACHE_BYPASS_HEADER = "X-Cache-Bypass"
+NEGATIVE_MARKER = "__cache_error__"
+
+_inflight: Dict[str, asyncio.Task] = {}
+_background: Set[asyncio.Task] = set()
+_refreshing: Set[str] = set()
+# Скользящее среднее времени пересчета по пространствам ключей, секунды
+_compute_seconds: Dict[str, float] = {}
+_stats: Dict[str, Dict[str, int]] = defaultdict(
+    lambda: {
+        "hits": 0,
+        "misses": 0,
+        "local_hits": 0,
+        "negative_results": 0,
+        "early_refreshes": 0,
+        "bypasses": 0,
+        "degraded": 0,
+        "errors": 0,
+        "patches": 0,
+        "patch_conflicts": 0,
+    }
+)
+cache_bypass: ContextVar[bool] = ContextVar("cache_bypass", default=False)
+
+# Compare-and-set для write-through: новое значение пишется, только если ключ
+# не изменился с момента чтения, иначе ключ удаляется. TTL сохраняется.
+# 1 - обновлено, 0 - конфликт (ключ удален), -1 - ключа уже нет
+PATCH_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return -1
+end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'KEEPTTL')
+return 1
+"""
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {namespace: dict(values) for namespace, values in _stats.items()}
+
+
+metrics.describe(
+    "cache_events_total",
+    "counter",
+    "События кэша по пространствам ключей (hits, misses, local_hits и т.д.)",
+)
+metrics.describe(
+    "cache_compute_seconds",
+    "histogram",
+    "Время пересчета значения при промахе кэша",
+)
+
+
+def _stats_samples():
+    return [
+        ("cache_events_total", {"namespace": namespace, "event": event}, value)
+        for namespace, values in get_cache_stats().items()
+        for event, value in values.items()
+    ]
+
+
+metrics.register_collector(_stats_samples)
+
+
+def _should_refresh_early(namespace: str, pttl_ms: int) -> bool:
+    """
+    Вероятностный ранний пересчет (XFetch): чем ближе истечение ключа и чем
+    дороже пересчет, тем выше шанс, что этот запрос обновит значение заранее.
+    """
+    delta = _compute_seconds.get(namespace)
+    if not delta or pttl_ms is None or pttl_ms < 0:
+        return False
+    return -delta * CACHE_XFETCH_BETA * math.log(random.random()) >= pttl_ms / 1000
+
+
+async def _single_flight(key: str, factory: ComputeFunction) -> Any:
+    task = _inflight.get(key)
+    if task is None:
+        # Пересчет идет отдельной задачей, чтобы отмена одного запроса
+        # не отменяла его для остальных ожидающих
+        task = asyncio.create_task(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _finish_flight(key, done))
+    return await asyncio.shield(task)
+
+
+def _finish_flight(key: str, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    if not task.cancelled():
+        task.exception()
+
+
+async def _compute_and_store(
+    key: str, compute: ComputeFunction, ttl: TTL, namespace: str
+) -> Any:
+    started = time.perf_counter()
+    value = await compute()
+    elapsed = time.perf_counter() - started
+    metrics.observe("cache_compute_seconds", elapsed, namespace=namespace)
+    previous = _compute_seconds.get(namespace)
+    _compute_seconds[namespace] = (
+        elapsed if previous is None else previous * 0.8 + elapsed * 0.2
+    )
+    await cache_set(key, value, ex=ttl(value) if callable(ttl) else ttl)
+    return value
+
+
+async def _compute_with_lock(
+    key: str, compute: ComputeFunction, ttl: TTL, namespace: str, wait: bool
+) -> Any:
+    redis_client = get_redis_client()
+    lock = redis_client.lock(
+        f"lock:{key}", timeout=CACHE_LOCK_TIMEOUT_SECONDS, blocking=False
+    )
+
+    async def release():
+        try:
+            await lock.release()
+        except LockError:
+            # Блокировка истекла раньше, чем закончился пересчет
+            pass
+
+    acquired = await call_redis(lock.acquire, family="lock")
+    if acquired is UNAVAILABLE:
+        _stats[namespace]["degraded"] += 1
+        return await compute() if wait else None
+    if acquired:
+        try:
+            return await _compute_and_store(key, compute, ttl, namespace)
+        finally:
+            await call_redis(release, family="lock")
+
+    if not wait:
+        return None
+
+    # Значение пересчитывает другой воркер - ждем его результат
+    deadline = time.monotonic() + CACHE_LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        value = await cache_get(key)
+        if value is not None:
+            return value
+
+    logger.warning(f"Не дождались пересчета ключа {key}, считаем самостоятельно")
+    return await _compute_and_store(key, compute, ttl, namespace)
+
+
+def _refresh_in_background(
+    key: str, compute: ComputeFunction, ttl: TTL, namespace: str
+) -> None:
+    if key in _refreshing or key in _inflight:
+        return
+    _refreshing.add(key)
+    _stats[namespace]["early_refreshes"] += 1
+
+    async def refresh():
+        try:
+            await _compute_with_lock(key, compute, ttl, namespace, wait=False)
+        except Exception as e:
+            logger.warning(f"Ошибка фонового пересчета ключа {key}: {e}")
+        finally:
+            _refreshing.discard(key)
+
+    task = asyncio.create_task(refresh())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def get_or_compute(
+    key: str,
+    compute: ComputeFunction,
+    ttl: TTL,
+    namespace: Optional[str] = None,
+    early_refresh: bool = True,
+) -> Any:
+    """
+    Cache-aside с защитой от stampede: при промахе значение считает только один
+    запрос в процессе (общий future) и только один воркер (короткий Redis-lock),
+    остальные ждут результат. Горячие ключи пересчитываются заранее (XFetch).
+    Если Redis недоступен, `compute` вызывается напрямую без записи в кэш.
+    `compute` должен возвращать значение, которое умеет кодировать cache_codec.
+    `ttl` - число секунд или функция от вычисленного значения.
+    """
+    namespace = namespace or key_family(key)
+
+    legacy = legacy_key(key)
+
+    async def read():
+        async with get_redis_client().pipeline(transaction=False) as pipe:
+            pipe.execute_command("GET", key, **{NEVER_DECODE: True})
+            pipe.pttl(key)
+            if legacy:
+                pipe.execute_command("GET", legacy, **{NEVER_DECODE: True})
+            return await pipe.execute()
+
+    result = await call_redis(read, family=namespace)
+    if result is UNAVAILABLE:
+        # Redis недоступен или breaker открыт - читаем напрямую из MongoDB
+        _stats[namespace]["degraded"] += 1
+        return await compute()
+
+    raw, pttl = result[0], result[1]
+    if raw is None and legacy:
+        # Значение записано под старым именем до миграции ключей
+        raw, pttl = result[2], -1
+    value = decode_cached(key, raw)
+    if value is not None:
+        _stats[namespace]["hits"] += 1
+        if early_refresh and _should_refresh_early(namespace, pttl):
+            _refresh_in_background(key, compute, ttl, namespace)
+        return value
+
+    _stats[namespace]["misses"] += 1
+    return await _single_flight(
+        key, lambda: _compute_with_lock(key, compute, ttl, namespace, wait=True)
+    )
+
+
+def _with_jitter(ttl: int, jitter: float) -> int:
+    if not jitter:
+        return ttl
+    return max(1, round(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def _is_negative(value: Any) -> bool:
+    return isinstance(value, dict) and NEGATIVE_MARKER in value
+
+
+def _raise_if_negative(value: Any) -> Any:
+    if _is_negative(value):
+        error = value[NEGATIVE_MARKER]
+        raise HTTPException(status_code=error["status_code"], detail=error["detail"])
+    return value
+
+
+def cached(
+    namespace: str,
+    ttl: int,
+    key: Optional[str] = None,
+    tags: Iterable[str] = (),
+    jitter: float = CACHE_TTL_JITTER,
+    negative_ttl: int = CACHE_NEGATIVE_TTL_SECONDS,
+    negative_statuses: Iterable[int] = (404,),
+    early_refresh: bool = True,
+):
+    """
+    Декоратор cache-aside для асинхронных методов сервисов.
+
+    Ключ Redis - `namespace:key`, где `key` - шаблон str.format по аргументам
+    метода (например `"{current_user.id}"`); без `key` ключом служит `namespace`.
+    `tags` добавляет пространство в CACHE_TAGS, чтобы `invalidate_cache(
+    tags=["user:<id>"])` удалял и его ключи, поэтому `key` должен давать id тега.
+    HTTPException со статусом из `negative_statuses` кэшируется на
+    `negative_ttl` секунд. С заголовком X-Cache-Bypass метод вызывается
+    напрямую, кэш не читается и не пишется.
+    """
+    negative_statuses = frozenset(negative_statuses)
+    for tag in tags:
+        register_cache_tag(tag, key_template(namespace))
+
+    def ttl_for(value: Any) -> int:
+        if _is_negative(value):
+            return negative_ttl
+        return _with_jitter(ttl, jitter)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            stats = _stats[namespace]
+            if cache_bypass.get():
+                stats["bypasses"] += 1
+                return await func(*args, **kwargs)
+
+            if key is None:
+                redis_key = namespace
+            else:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                redis_key = cache_key(namespace, key.format(**bound.arguments))
+
+            value = local_cache.get(redis_key)
+            if value is not None:
+                stats["local_hits"] += 1
+                return _raise_if_negative(value)
+
+            async def compute():
+                try:
+                    return await func(*args, **kwargs)
+                except HTTPException as e:
+                    if e.status_code not in negative_statuses:
+                        raise
+                    return {
+                        NEGATIVE_MARKER: {
+                            "status_code": e.status_code,
+                            "detail": e.detail,
+                        }
+                    }
+
+            seq = local_cache.seq
+            try:
+                value = await get_or_compute(
+                    redis_key,
+                    compute,
+                    ttl=ttl_for,
+                    namespace=namespace,
+                    early_refresh=early_refresh,
+                )
+            except RedisError as e:
+                stats["errors"] += 1
+                logger.warning(f"Кэш {redis_key} недоступен, читаем из MongoDB: {e}")
+                return await func(*args, **kwargs)
+
+            if _is_negative(value):
+                stats["negative_results"] += 1
+            local_cache.put(redis_key, value, seq)
+            return _raise_if_negative(value)
+
+        return wrapper
+
+    return decorator
+
+
+async def patch_cached(key: str, patch: Callable[[Any], Optional[Any]]) -> bool:
+    """
+    Write-through обновление закэшированного значения после записи в MongoDB.
+    `patch` получает текущее значение и возвращает новое или None, если
+    значение не соответствует состоянию до записи (проверка версии) - тогда
+    ключ удаляется и следующее чтение пересоберет его. Запись идет через
+    Lua compare-and-set, поэтому параллельное изменение ключа тоже приводит
+    к удалению, а не к потере обновления. Возвращает True, если ключ обновлен.
+    """
+    stats = _stats[key_family(key)]
+    redis_client = get_redis_client()
+    legacy = legacy_key(key)
+    if legacy:
+        # Старое имя ключа не обновляется и не должно пережить новое значение
+        await invalidate_cache(legacy)
+    raw = await call_redis(
+        lambda: redis_client.execute_command("GET", key, **{NEVER_DECODE: True}),
+        family=key_family(key),
+    )
+    if raw is None:
+        return False
+    if raw is UNAVAILABLE:
+        await invalidate_cache(key)
+        return False
+
+    value = decode_cached(key, raw)
+    patched = None
+    if value is not None and not _is_negative(value):
+        patched = patch(value)
+    if patched is None:
+        stats["patch_conflicts"] += 1
+        await invalidate_cache(key)
+        return False
+
+    script = redis_client.register_script(PATCH_SCRIPT)
+    result = await call_redis(
+        lambda: script(keys=[key], args=[raw, encode_value(patched)]),
+        family=key_family(key),
+    )
+    if result is UNAVAILABLE:
+        await invalidate_cache(key)
+        return False
+    if result == 0:
+        stats["patch_conflicts"] += 1
+    elif result == 1:
+        stats["patches"] += 1
+    return result == 1
@@ -0,0 +1,152 @@
+import json
+import zlib
+from typing import Any, Optional
+
+from backend.core.config import (
+    logger,
+    CACHE_CODEC,
+    CACHE_COMPRESSION,
+    CACHE_COMPRESS_MIN_BYTES,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Первый байт значения - тег версии: младшие 4 бита - формат, старшие - сжатие.
+# Значения без тега (старый JSON-текст) читаются как JSON, поэтому смена
+# кодека не требует очистки Redis.
+FORMAT_JSON = 0x01
+FORMAT_MSGPACK = 0x02
+COMPRESSION_ZLIB = 0x40
+COMPRESSION_ZSTD = 0x80
+
+_FORMAT_MASK = 0x0F
+_COMPRESSION_MASK = 0xF0
+_KNOWN_TAGS = {
+    fmt | compression
+    for fmt in (FORMAT_JSON, FORMAT_MSGPACK)
+    for compression in (0, COMPRESSION_ZLIB, COMPRESSION_ZSTD)
+}
+
+_zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+_zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+class CacheDecodeError(ValueError):
+    pass
+
+
+def _resolve_codec(codec: str) -> str:
+    if codec == "msgpack" and msgpack is None:
+        logger.warning(
+            "CACHE_CODEC=msgpack, но msgpack не установлен: используется json"
+        )
+        return "json"
+    if codec not in ("json", "msgpack"):
+        logger.warning(f"Неизвестный CACHE_CODEC={codec}: используется json")
+        return "json"
+    return codec
+
+
+def _resolve_compression(compression: str) -> str:
+    if compression == "zstd" and zstandard is None:
+        logger.warning(
+            "CACHE_COMPRESSION=zstd, но zstandard не установлен: используется zlib"
+        )
+        return "zlib"
+    if compression not in ("zstd", "zlib", "none"):
+        logger.warning(f"Неизвестный CACHE_COMPRESSION={compression}: сжатие отключено")
+        return "none"
+    return compression
+
+
+DEFAULT_CODEC = _resolve_codec(CACHE_CODEC)
+DEFAULT_COMPRESSION = _resolve_compression(CACHE_COMPRESSION)
+
+
+def _dump_json(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _load_json(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_value(
+    value: Any,
+    codec: Optional[str] = None,
+    compression: Optional[str] = None,
+    min_bytes: int = CACHE_COMPRESS_MIN_BYTES,
+) -> bytes:
+    codec = _resolve_codec(codec) if codec else DEFAULT_CODEC
+    compression = (
+        _resolve_compression(compression) if compression else DEFAULT_COMPRESSION
+    )
+
+    if codec == "msgpack":
+        tag, payload = FORMAT_MSGPACK, msgpack.packb(value, use_bin_type=True)
+    else:
+        tag, payload = FORMAT_JSON, _dump_json(value)
+
+    if compression != "none" and len(payload) >= min_bytes:
+        if compression == "zstd":
+            compressed, flag = _zstd_compressor.compress(payload), COMPRESSION_ZSTD
+        else:
+            compressed, flag = zlib.compress(payload, 6), COMPRESSION_ZLIB
+        if len(compressed) < len(payload):
+            tag, payload = tag | flag, compressed
+
+    return bytes((tag,)) + payload
+
+
+def decode_value(raw: bytes) -> Any:
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    if not raw:
+        raise CacheDecodeError("Пустое значение")
+
+    tag = raw[0]
+    if tag not in _KNOWN_TAGS:
+        # Значение записано до появления кодека - обычный JSON-текст
+        try:
+            return _load_json(raw)
+        except ValueError as e:
+            raise CacheDecodeError(f"Некорректный JSON: {e}") from e
+
+    payload = raw[1:]
+    compression = tag & _COMPRESSION_MASK
+    try:
+        if compression == COMPRESSION_ZSTD:
+            if _zstd_decompressor is None:
+                raise CacheDecodeError(
+                    "Значение сжато zstd, но zstandard не установлен"
+                )
+            payload = _zstd_decompressor.decompress(payload)
+        elif compression == COMPRESSION_ZLIB:
+            payload = zlib.decompress(payload)
+
+        if tag & _FORMAT_MASK == FORMAT_MSGPACK:
+            if msgpack is None:
+                raise CacheDecodeError("Значение в msgpack, но msgpack не установлен")
+            return msgpack.unpackb(payload, raw=False)
+        return _load_json(payload)
+    except CacheDecodeError:
+        raise
+    except Exception as e:
+        raise CacheDecodeError(f"Не удалось декодировать значение: {e}") from e
@@ -1,5 +1,6 @@
 import os
 import logging
+import socket
 from dotenv import load_dotenv
 from pathlib import Path
 from urllib.parse import urlparse
@@ -28,7 +29,98 @@ if not AVATAR_UPLOAD_DIR.exists():
 
 PORT = int(os.getenv("PORT", 8000))
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_CONNECT_TIMEOUT_SECONDS = float(os.getenv("REDIS_CONNECT_TIMEOUT_SECONDS", 1))
+# Redis Cluster: REDIS_URL указывает на любой узел кластера
+REDIS_CLUSTER = os.getenv("REDIS_CLUSTER", "false").lower() == "true"
+REDIS_CLUSTER_READ_FROM_REPLICAS = (
+    os.getenv("REDIS_CLUSTER_READ_FROM_REPLICAS", "false").lower() == "true"
+)
+# Пока включено, ключи пользователя читаются и удаляются также под старыми
+# именами (user_data:<id> и т.д.). Отключить, когда истечет самый долгий TTL
+# старых ключей - refresh_token, REFRESH_TOKEN_EXPIRE_DAYS дней
+REDIS_LEGACY_KEY_FALLBACK = (
+    os.getenv("REDIS_LEGACY_KEY_FALLBACK", "true").lower() == "true"
+)
+# Пул соединений Redis: при исчерпании запросы ждут свободное соединение
+# не дольше REDIS_POOL_TIMEOUT_SECONDS вместо открытия новых. Подписки
+# pubsub (principal_cache, plan_catalog) держат по соединению из пула
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT_SECONDS = float(os.getenv("REDIS_POOL_TIMEOUT_SECONDS", 1))
+REDIS_POOL_WARMUP_CONNECTIONS = int(os.getenv("REDIS_POOL_WARMUP_CONNECTIONS", 10))
+REDIS_SOCKET_TIMEOUT_SECONDS = float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", 5))
+REDIS_HEALTH_CHECK_INTERVAL_SECONDS = int(
+    os.getenv("REDIS_HEALTH_CHECK_INTERVAL_SECONDS", 30)
+)
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", 2))
+REDIS_RETRY_BACKOFF_BASE_SECONDS = float(
+    os.getenv("REDIS_RETRY_BACKOFF_BASE_SECONDS", 0.01)
+)
+REDIS_RETRY_BACKOFF_CAP_SECONDS = float(
+    os.getenv("REDIS_RETRY_BACKOFF_CAP_SECONDS", 0.1)
+)
+# Таймаут одной операции кэша и параметры circuit breaker'а вокруг Redis
+REDIS_CALL_TIMEOUT_SECONDS = float(os.getenv("REDIS_CALL_TIMEOUT_SECONDS", 0.25))
+REDIS_BREAKER_FAILURE_THRESHOLD = int(os.getenv("REDIS_BREAKER_FAILURE_THRESHOLD", 5))
+REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", 5))
+REDIS_PENDING_INVALIDATIONS_MAX = int(
+    os.getenv("REDIS_PENDING_INVALIDATIONS_MAX", 10000)
+)
 BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Если BCRYPT_ROUNDS задан явно, стоимость фиксирована и калибровка не выполняется
+BCRYPT_AUTO_CALIBRATE = (
+    os.getenv(
+        "BCRYPT_AUTO_CALIBRATE", "false" if os.getenv("BCRYPT_ROUNDS") else "true"
+    ).lower()
+    == "true"
+)
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", 150))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", 16))
+# Воркеры с одинаковым значением используют общий результат калибровки.
+# По умолчанию - имя хоста. В смешанном парке лучше задать тип инстанса:
+# хеш перехешируется при входе на хосте с другой стоимостью
+BCRYPT_CALIBRATION_GROUP = os.getenv("BCRYPT_CALIBRATION_GROUP") or socket.gethostname()
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+)
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 10000))
+CACHE_LOCK_TIMEOUT_SECONDS = float(os.getenv("CACHE_LOCK_TIMEOUT_SECONDS", 5))
+CACHE_LOCK_WAIT_SECONDS = float(os.getenv("CACHE_LOCK_WAIT_SECONDS", 2))
+CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", 1.0))
+CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", 0.1))
+CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv("CACHE_NEGATIVE_TTL_SECONDS", 30))
+# Заголовок X-Cache-Bypass: 1 заставляет читать данные мимо кэша (для отладки)
+CACHE_BYPASS_ENABLED = os.getenv("CACHE_BYPASS_ENABLED", "false").lower() == "true"
+# Формат кэшируемых значений: json (через orjson, если установлен) или msgpack.
+# Сжатие: zstd (если установлен zstandard, иначе zlib), zlib или none
+CACHE_CODEC = os.getenv("CACHE_CODEC", "json").lower()
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zstd").lower()
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 1024))
+# Префиксы ключей Redis, кэшируемых в памяти воркера, и лимиты записей на префикс.
+# Формат: "prefix:=64,namespace=1", пустая строка отключает L1-кэш.
+# Тарифные планы держит в памяти PlanCatalog, поэтому по умолчанию кэш пуст
+LOCAL_CACHE_NAMESPACES = {
+    prefix.strip(): int(limit)
+    for prefix, _, limit in (
+        item.rpartition("=")
+        for item in os.getenv("LOCAL_CACHE_NAMESPACES", "").split(",")
+        if item.strip()
+    )
+}
+# /metrics в формате Prometheus; метрики воркеров собираются через Redis.
+# По умолчанию выключен. С METRICS_TOKEN эндпоинт требует заголовок
+# "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+if METRICS_ENABLED and not METRICS_TOKEN:
+    logger.warning(
+        "METRICS_TOKEN не задан: /metrics доступен без аутентификации, "
+        "закройте его на уровне сети"
+    )
+METRICS_PUSH_INTERVAL_SECONDS = float(os.getenv("METRICS_PUSH_INTERVAL_SECONDS", 5))
 if not os.getenv("PORT"):
     logger.warning(
         "Переменная окружения PORT не установлена, используется по умолчанию 8000."
@@ -60,12 +152,64 @@ if not MONGO_DB_NAME:
         "Переменная окружения MONGO_DB_NAME не установлена. База данных будет выбрана из URI."
     )
 
+# Настройки клиента MongoDB. Пустое значение оставляет умолчание драйвера
+# (или параметр из MONGO_URI). MONGO_MIN_POOL_SIZE соединений открываются
+# при старте, чтобы первые запросы после деплоя не ждали handshake
+MONGO_APP_NAME = os.getenv("MONGO_APP_NAME", "vosmerka-backend")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 10))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(
+    os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)
+)
+# Сжатие протокола в порядке предпочтения; zstd и snappy требуют пакетов
+# zstandard и python-snappy, недоступные алгоритмы пропускаются
+MONGO_COMPRESSORS = [
+    name.strip().lower()
+    for name in os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib").split(",")
+    if name.strip()
+]
+MONGO_ZLIB_COMPRESSION_LEVEL = int(os.getenv("MONGO_ZLIB_COMPRESSION_LEVEL", 6))
+# Read/write concern по умолчанию: MONGO_READ_CONCERN - local, majority, ...;
+# MONGO_WRITE_CONCERN - majority или число узлов
+MONGO_READ_CONCERN = os.getenv("MONGO_READ_CONCERN") or None
+MONGO_WRITE_CONCERN = os.getenv("MONGO_WRITE_CONCERN") or None
+MONGO_WRITE_CONCERN_JOURNAL = (
+    os.getenv("MONGO_WRITE_CONCERN_JOURNAL", "").lower() == "true"
+    if os.getenv("MONGO_WRITE_CONCERN_JOURNAL")
+    else None
+)
+MONGO_WRITE_CONCERN_TIMEOUT_MS = (
+    int(os.getenv("MONGO_WRITE_CONCERN_TIMEOUT_MS"))
+    if os.getenv("MONGO_WRITE_CONCERN_TIMEOUT_MS")
+    else None
+)
+# Чтения без транзакций (промахи кэша) уходят на вторичные узлы с отставанием
+# не больше MONGO_READ_MAX_STALENESS_SECONDS (минимум MongoDB - 90 секунд).
+# После собственной записи чтения пользователя MONGO_READ_PIN_SECONDS идут
+# на первичный узел, чтобы он видел свои изменения. Закрепление не короче
+# допустимого отставания плюс интервал heartbeat драйвера (10 секунд): иначе
+# промах кэша после снятия маркера прочитал бы со вторичного узла данные до
+# записи и положил их в Redis на весь TTL
+MONGO_READ_FROM_SECONDARIES = (
+    os.getenv("MONGO_READ_FROM_SECONDARIES", "false").lower() == "true"
+)
+MONGO_READ_MAX_STALENESS_SECONDS = max(
+    90, int(os.getenv("MONGO_READ_MAX_STALENESS_SECONDS", 90))
+)
+MONGO_READ_PIN_SECONDS = max(
+    MONGO_READ_MAX_STALENESS_SECONDS + 10,
+    int(os.getenv("MONGO_READ_PIN_SECONDS", 0)),
+)
+
 
 JWT_SECRET_KEY = os.getenv("JWT_SECRET")
 REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 15
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+AUTH_CLAIMS_MODE = os.getenv("AUTH_CLAIMS_MODE", "false").lower() == "true"
 
 if not JWT_SECRET_KEY:
     logger.error("Переменная окружения JWT_SECRET не установлена!")
@@ -1,15 +1,221 @@
+import asyncio
+import importlib.util
+import threading
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie, Document
-from typing import List, Type, Optional
-from backend.core.config import MONGO_URI, MONGO_DB_NAME, logger
+from pymongo import monitoring
+from typing import Any, Dict, List, Type, Optional
+from backend.core.config import (
+    MONGO_URI,
+    MONGO_DB_NAME,
+    MONGO_APP_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_COMPRESSORS,
+    MONGO_ZLIB_COMPRESSION_LEVEL,
+    MONGO_READ_CONCERN,
+    MONGO_WRITE_CONCERN,
+    MONGO_WRITE_CONCERN_JOURNAL,
+    MONGO_WRITE_CONCERN_TIMEOUT_MS,
+    logger,
+)
+from backend.core import metrics
 from backend.models.user import User
 from backend.models.subscription import SubscriptionPlan, SubscriptionHistory
 from backend.models.transaction import Transaction
 from backend.models.admin import AdminAction
+from backend.models.user_trigram import UserTrigram
 
 
 motor_client: Optional[AsyncIOMotorClient] = None
 
+metrics.describe(
+    "mongo_pool_checkout_wait_seconds",
+    "histogram",
+    "Ожидание соединения из пула MongoDB",
+)
+metrics.describe(
+    "mongo_pool_checkout_failures_total",
+    "counter",
+    "Неудачные попытки получить соединение из пула MongoDB",
+)
+metrics.describe(
+    "mongo_pool_connections", "gauge", "Соединения пула MongoDB: in_use и idle"
+)
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """
+    Слушатель событий пула PyMongo: время ожидания соединения и число
+    занятых/свободных соединений. PyMongo 4.5 не сообщает длительность
+    checkout, поэтому начало ожидания запоминается в потоке, который
+    берет соединение (Motor выполняет операции PyMongo в потоках).
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._total: Dict[str, int] = {}
+        self._in_use: Dict[str, int] = {}
+
+    def _change(self, counter: Dict[str, int], address, delta: int) -> None:
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            counter[key] = counter.get(key, 0) + delta
+
+    def _wait_finished(self) -> Optional[float]:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return None if started is None else time.perf_counter() - started
+
+    def open_connections(self) -> int:
+        """Наибольшее число открытых соединений среди пулов серверов."""
+        with self._lock:
+            return max(self._total.values(), default=0)
+
+    def samples(self):
+        with self._lock:
+            total, in_use = dict(self._total), dict(self._in_use)
+        result = []
+        for address, count in total.items():
+            busy = in_use.get(address, 0)
+            result.append(
+                (
+                    "mongo_pool_connections",
+                    {"address": address, "state": "in_use"},
+                    busy,
+                )
+            )
+            result.append(
+                (
+                    "mongo_pool_connections",
+                    {"address": address, "state": "idle"},
+                    max(count - busy, 0),
+                )
+            )
+        return result
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = self._wait_finished()
+        if waited is not None:
+            metrics.observe("mongo_pool_checkout_wait_seconds", waited)
+        self._change(self._in_use, event.address, 1)
+
+    def connection_check_out_failed(self, event):
+        waited = self._wait_finished()
+        if waited is not None:
+            metrics.observe("mongo_pool_checkout_wait_seconds", waited)
+        metrics.inc("mongo_pool_checkout_failures_total", reason=event.reason)
+
+    def connection_checked_in(self, event):
+        self._change(self._in_use, event.address, -1)
+
+    def connection_created(self, event):
+        self._change(self._total, event.address, 1)
+
+    def connection_closed(self, event):
+        self._change(self._total, event.address, -1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            key = f"{event.address[0]}:{event.address[1]}"
+            self._total.pop(key, None)
+            self._in_use.pop(key, None)
+
+    def connection_ready(self, event):
+        pass
+
+
+mongo_pool_listener = MongoPoolListener()
+metrics.register_collector(mongo_pool_listener.samples)
+
+# Модули, без которых PyMongo не умеет соответствующее сжатие
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def available_compressors(requested: List[str]) -> List[str]:
+    compressors = []
+    for name in requested:
+        module = _COMPRESSOR_MODULES.get(name)
+        if module is None:
+            logger.warning(f"Неизвестный алгоритм сжатия MongoDB: {name}")
+        elif importlib.util.find_spec(module) is None:
+            logger.info(f"Сжатие MongoDB {name} недоступно: не установлен {module}")
+        else:
+            compressors.append(name)
+    return compressors
+
+
+def mongo_client_options(**overrides) -> Dict[str, Any]:
+    """Параметры AsyncIOMotorClient из конфигурации; `overrides` имеют приоритет."""
+    options: Dict[str, Any] = {
+        "appname": MONGO_APP_NAME,
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS or None,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [mongo_pool_listener],
+    }
+    compressors = available_compressors(MONGO_COMPRESSORS)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+        if "zlib" in compressors:
+            options["zlibCompressionLevel"] = MONGO_ZLIB_COMPRESSION_LEVEL
+    if MONGO_READ_CONCERN:
+        options["readConcernLevel"] = MONGO_READ_CONCERN
+    if MONGO_WRITE_CONCERN:
+        options["w"] = (
+            int(MONGO_WRITE_CONCERN)
+            if MONGO_WRITE_CONCERN.isdigit()
+            else MONGO_WRITE_CONCERN
+        )
+    if MONGO_WRITE_CONCERN_JOURNAL is not None:
+        options["journal"] = MONGO_WRITE_CONCERN_JOURNAL
+    if MONGO_WRITE_CONCERN_TIMEOUT_MS is not None:
+        options["wTimeoutMS"] = MONGO_WRITE_CONCERN_TIMEOUT_MS
+    options.update(overrides)
+    return options
+
+
+async def warmup_mongo_pool(
+    client: AsyncIOMotorClient, connections: int, timeout: float = 5.0
+) -> int:
+    """
+    Открывает `connections` соединений заранее: параллельные ping заставляют
+    пул создавать соединения, а остальные до minPoolSize драйвер добирает
+    в фоне - их и дожидаемся. Возвращает число открытых соединений.
+    """
+    if connections <= 0:
+        return mongo_pool_listener.open_connections()
+    await asyncio.gather(
+        *(client.admin.command("ping") for _ in range(connections)),
+        return_exceptions=True,
+    )
+    deadline = time.monotonic() + timeout
+    while (
+        mongo_pool_listener.open_connections() < connections
+        and time.monotonic() < deadline
+    ):
+        await asyncio.sleep(0.05)
+    return mongo_pool_listener.open_connections()
+
 
 async def init_db():
     global motor_client
@@ -27,10 +233,16 @@ async def init_db():
     logger.info("Попытка подключения к MongoDB...")
 
     try:
-        motor_client = AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        options = mongo_client_options()
+        motor_client = AsyncIOMotorClient(MONGO_URI, **options)
 
         await motor_client.admin.command("ping")
-        logger.info("Подключение к MongoDB успешно установлено")
+        opened = await warmup_mongo_pool(motor_client, MONGO_MIN_POOL_SIZE)
+        logger.info(
+            f"Подключение к MongoDB успешно установлено (пул {MONGO_MIN_POOL_SIZE}-"
+            f"{MONGO_MAX_POOL_SIZE}, открыто заранее: {opened}, сжатие: "
+            f"{options.get('compressors', 'нет')})"
+        )
 
         db_name = MONGO_DB_NAME
 
@@ -42,6 +254,7 @@ async def init_db():
             SubscriptionHistory,
             Transaction,
             AdminAction,
+            UserTrigram,
         ]
 
         await init_beanie(
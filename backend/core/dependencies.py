@@ -1,9 +1,22 @@
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, Union
 from jose import JWTError, jwt, ExpiredSignatureError
 from fastapi import HTTPException, Depends, status, Request
 from beanie.odm.fields import PydanticObjectId
-from backend.core.redis_client import get_redis_client
+from pymongo import ReturnDocument
+from backend.core.redis_client import (
+    get_redis_client,
+    call_redis,
+    cache_key,
+    legacy_key,
+    invalidate_cache,
+    UNAVAILABLE,
+)
+from backend.core.principal_cache import (
+    principal_cache,
+    principal_view_cache,
+    invalidate_principal,
+)
 
 from backend.core.config import (
     logger,
@@ -12,18 +25,153 @@ from backend.core.config import (
     JWT_ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_DAYS,
+    AUTH_CLAIMS_MODE,
 )
 
 
 from backend.models.user import User
+from backend.models.user_views import (
+    UserAccountView,
+    UserPrincipalView,
+    UserTokenVersionView,
+)
 from backend.models.admin import AdminAction
+from backend.schemas.token import TokenPrincipal
 
 
 async def save_refresh_token_in_redis(
     user_id: str, refresh_token: str, expires: timedelta
 ):
     redis_client = get_redis_client()
-    await redis_client.set(f"refresh_token:{user_id}", refresh_token, ex=expires)
+    saved = await call_redis(
+        lambda: redis_client.set(
+            cache_key("refresh_token", user_id), refresh_token, ex=expires
+        ),
+        family="refresh_token",
+    )
+    if saved is UNAVAILABLE:
+        logger.warning(
+            f"Redis недоступен, refresh token пользователя {user_id} не сохранен"
+        )
+
+
+# Версия токенов хранится в документе пользователя (User.tokenVersion), а в
+# Redis лежит ее копия на время жизни access-токена: после вытеснения или
+# истечения ключа версия снова читается из MongoDB, а не начинается с нуля
+TOKEN_VERSION_TTL = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# Копия версии в Redis только растет: запоздавшая запись меньшего значения
+# (чтение из MongoDB до отзыва) не перезаписывает уже увеличенную версию
+_SET_MAX_VERSION_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '-1')
+if tonumber(ARGV[1]) > current then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+end
+return redis.call('GET', KEYS[1])
+"""
+
+
+async def get_token_version(user_id: str) -> Optional[int]:
+    """
+    Возвращает версию токенов пользователя из Redis (при промахе - из MongoDB).
+    None означает, что версию проверить не удалось (Redis недоступен или
+    пользователя нет), и токен нужно проверять через MongoDB.
+    """
+    redis_client = get_redis_client()
+    key = cache_key("token_version", user_id)
+    version = await call_redis(lambda: redis_client.get(key), family="token_version")
+    if version is UNAVAILABLE:
+        return None
+    if version is not None:
+        return int(version)
+
+    user = await User.find_one(
+        User.id == PydanticObjectId(user_id), projection_model=UserTokenVersionView
+    )
+    if not user:
+        return None
+    version = await call_redis(
+        lambda: redis_client.eval(
+            _SET_MAX_VERSION_SCRIPT,
+            1,
+            key,
+            user.tokenVersion,
+            int(TOKEN_VERSION_TTL.total_seconds()),
+        ),
+        family="token_version",
+    )
+    if version is UNAVAILABLE:
+        return user.tokenVersion
+    return int(version)
+
+
+async def _sync_token_version(
+    key: str, version: Optional[int], unlink_keys: Tuple[str, ...]
+) -> None:
+    async with get_redis_client().pipeline(transaction=False) as pipe:
+        if version is None:
+            # Пользователь удален: без ключа проверка версии дойдет до MongoDB
+            pipe.unlink(key, *unlink_keys)
+        else:
+            pipe.eval(
+                _SET_MAX_VERSION_SCRIPT,
+                1,
+                key,
+                version,
+                int(TOKEN_VERSION_TTL.total_seconds()),
+            )
+            if unlink_keys:
+                pipe.unlink(*unlink_keys)
+        # Ключи со старыми именами лежат в других слотах кластера, поэтому
+        # удаляются отдельными командами
+        for legacy in filter(None, map(legacy_key, (key, *unlink_keys))):
+            pipe.unlink(legacy)
+        await pipe.execute()
+
+
+async def revoke_user_tokens(user_id, *unlink_keys: str) -> None:
+    """
+    Увеличивает версию токенов пользователя: все ранее выданные access-токены
+    перестают приниматься. Версия сначала записывается в MongoDB, затем
+    обновляется ее копия в Redis; ошибка любого шага прерывает запрос, чтобы
+    выход или смена пароля не завершались успешно без отзыва токенов.
+    Ключи `unlink_keys` удаляются в том же запросе к Redis.
+    """
+    user = await User.get_motor_collection().find_one_and_update(
+        {"_id": PydanticObjectId(user_id)},
+        {"$inc": {"tokenVersion": 1}},
+        projection={"tokenVersion": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    await invalidate_principal(user_id)
+    key = cache_key("token_version", user_id)
+    version = user["tokenVersion"] if user else None
+    synced = await call_redis(
+        lambda: _sync_token_version(key, version, unlink_keys),
+        family="token_version",
+    )
+    if synced is UNAVAILABLE:
+        # Пока Redis недоступен, версия проверяется через MongoDB; устаревшая
+        # копия удаляется при восстановлении Redis
+        await invalidate_cache(key, *unlink_keys)
+        logger.error(
+            f"Redis недоступен, отзыв токенов пользователя {user_id} не завершен"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис временно недоступен",
+        )
+
+
+def _ensure_not_revoked(payload: Dict[str, Any], token_version: int) -> None:
+    # Токены без версии выданы до первого отзыва и считаются версией 0
+    if payload.get("tv", 0) < token_version:
+        logger.warning(f"Отозванный access token пользователя {payload['userId']}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
 
 async def generate_tokens(user: User) -> Dict[str, str]:
@@ -33,6 +181,7 @@ async def generate_tokens(user: User) -> Dict[str, str]:
     access_payload = {
         "userId": str(user.id),
         "role": user.role,
+        "tv": user.tokenVersion,
         "exp": datetime.now(timezone.utc) + access_token_expires,
     }
 
@@ -53,65 +202,140 @@ async def generate_tokens(user: User) -> Dict[str, str]:
     return {"accessToken": access_token, "refreshToken": refresh_token}
 
 
-async def get_current_user(request: Request) -> User:
+def _decode_access_token(request: Request) -> Dict[str, Any]:
+    auth_header = request.headers.get("Authorization")
+    x_access_token = request.headers.get("x-access-token")
+    token = None
+
+    if auth_header:
+        try:
+            scheme, token = auth_header.split()
+            if scheme.lower() != "bearer":
+                raise ValueError("Invalid scheme")
+        except ValueError:
+            token = None
+
+    if not token and x_access_token:
+        token = x_access_token
+
+    if not token:
+        logger.warning("Недостаточно прав доступа")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     try:
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except ExpiredSignatureError:
+        logger.warning("Access token expired")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token expired",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except JWTError as e:
+        logger.warning(f"JWT validation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
 
-        auth_header = request.headers.get("Authorization")
-        x_access_token = request.headers.get("x-access-token")
-        token = None
-
-        if auth_header:
-            try:
-                scheme, token = auth_header.split()
-                if scheme.lower() != "bearer":
-                    raise ValueError("Invalid scheme")
-            except ValueError:
-                token = None
-
-        if not token and x_access_token:
-            token = x_access_token
-
-        if not token:
-            logger.warning("Недостаточно прав доступа")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+    if not payload.get("userId"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token format",
+        )
+    return payload
 
-        try:
-            payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-            user_id = payload.get("userId")
-
-            if not user_id:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token format",
-                )
-
-            user = await User.get(PydanticObjectId(user_id))
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="User not found",
-                )
-
-            return user
-
-        except ExpiredSignatureError:
-            logger.warning("Access token expired")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token expired",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        except JWTError as e:
-            logger.warning(f"JWT validation failed: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
+
+async def _load_user(user_id: str) -> UserAccountView:
+    user = principal_cache.get(user_id)
+    if user:
+        return user
+
+    user = await User.find_one(
+        User.id == PydanticObjectId(user_id), projection_model=UserAccountView
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    principal_cache.set(user_id, user)
+    return user
+
+
+async def _load_principal_view(
+    user_id: str,
+) -> Union[UserAccountView, UserPrincipalView]:
+    # Пользователь из principal_cache тоже подходит: нужны те же поля.
+    # Версия токенов читается с первичного узла, как и в _load_user
+    user = principal_cache.get(user_id) or principal_view_cache.get(user_id)
+    if user:
+        return user
+
+    user = await User.find_one(
+        User.id == PydanticObjectId(user_id), projection_model=UserPrincipalView
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    principal_view_cache.set(user_id, user)
+    return user
+
+
+async def get_current_user(request: Request) -> UserAccountView:
+    try:
+        payload = _decode_access_token(request)
+        user = await _load_user(payload["userId"])
+        _ensure_not_revoked(payload, user.tokenVersion)
+        return user
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected auth error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Authentication error",
+        )
+
+
+async def get_current_principal(request: Request) -> TokenPrincipal:
+    """
+    Аутентификация только по подписанным claims access-токена, без запроса в MongoDB.
+    Отзыв токенов проверяется по версии `u:{userId}:token_version` в Redis.
+    Токены, выданные до появления claims, и запросы при недоступном Redis
+    проверяются через MongoDB.
+    """
+    try:
+        payload = _decode_access_token(request)
+        user_id = payload["userId"]
+        token_version = None
+        if "tv" in payload:
+            token_version = await get_token_version(user_id)
+
+        if token_version is None:
+            user = await _load_principal_view(user_id)
+            _ensure_not_revoked(payload, user.tokenVersion)
+            return TokenPrincipal(
+                id=user.id, role=user.role, tokenVersion=user.tokenVersion
             )
 
+        _ensure_not_revoked(payload, token_version)
+
+        return TokenPrincipal(
+            id=PydanticObjectId(user_id),
+            role=payload.get("role") or "user",
+            tokenVersion=payload["tv"],
+        )
+
     except HTTPException:
         raise
     except Exception as e:
@@ -122,7 +346,17 @@ async def get_current_user(request: Request) -> User:
         )
 
 
-async def get_admin_user(current_user: User = Depends(get_current_user)):
+async def get_read_only_user(
+    request: Request,
+) -> Union[UserAccountView, TokenPrincipal]:
+    if AUTH_CLAIMS_MODE:
+        return await get_current_principal(request)
+    return await get_current_user(request)
+
+
+async def get_admin_user(
+    current_user: UserAccountView = Depends(get_current_user),
+) -> UserAccountView:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -132,7 +366,7 @@ async def get_admin_user(current_user: User = Depends(get_current_user)):
 
 
 async def log_admin_action(
-    admin_user: User,
+    admin_user: UserAccountView,
     request: Request,
     action_type: str,
     target_model: str,
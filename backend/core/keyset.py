@@ -0,0 +1,54 @@
+import base64
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+
+# Постраничный вывод по ключу (createdAt, _id) от новых к старым: курсор -
+# позиция последней показанной записи, следующая страница - диапазон по
+# индексу (..., createdAt: -1, _id: -1) после нее, без skip. Записи без
+# createdAt (старые документы до миграции) при такой сортировке идут
+# последними и листаются по одному _id; у пользователей createdAt заполняет
+# backend.tools.backfill_user_created_at.
+
+KEYSET_SORT = [("createdAt", -1), ("_id", -1)]
+
+
+def encode_cursor(created_at: Optional[datetime], document_id: Any) -> str:
+    """Непрозрачный курсор на позицию после записи (`created_at`, `document_id`)."""
+    millis = ""
+    if created_at is not None:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        millis = str(int(created_at.timestamp() * 1000))
+    raw = f"{millis}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], PydanticObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        millis, document_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        created_at = (
+            datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+            if millis
+            else None
+        )
+        return created_at, PydanticObjectId(document_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def after_cursor(cursor: str) -> Dict[str, Any]:
+    """Условие "после курсора" в порядке KEYSET_SORT. Некорректный курсор - 400."""
+    created_at, document_id = decode_cursor(cursor)
+    if created_at is None:
+        return {"createdAt": None, "_id": {"$lt": document_id}}
+    return {
+        "$or": [
+            {"createdAt": {"$lt": created_at}},
+            {"createdAt": created_at, "_id": {"$lt": document_id}},
+            {"createdAt": None},
+        ]
+    }
@@ -0,0 +1,184 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from backend.core.config import logger, LOCAL_CACHE_NAMESPACES
+from backend.core.redis_client import get_redis_client, is_cluster
+from backend.core import metrics
+
+INVALIDATION_CHANNEL = "__redis__:invalidate"
+
+
+class LocalCache:
+    """
+    L1-кэш в памяти воркера перед Redis для горячих ключей из LOCAL_CACHE_NAMESPACES.
+    Хранит уже разобранные значения, поэтому вызывающий код не должен их изменять.
+    Согласованность обеспечивается через CLIENT TRACKING (BCAST): Redis присылает
+    инвалидации по префиксам ключей, и пока подписка не активна, L1 не используется.
+    """
+
+    def __init__(self, namespaces: Dict[str, int]):
+        self.limits = namespaces
+        self._entries: Dict[str, "OrderedDict[str, Any]"] = {
+            prefix: OrderedDict() for prefix in namespaces
+        }
+        self._stats: Dict[str, Dict[str, int]] = {
+            prefix: {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+            for prefix in namespaces
+        }
+        self._invalidation_seq = 0
+        self.active = False
+
+    def namespace_for(self, key: str) -> Optional[str]:
+        for prefix in self.limits:
+            if key.startswith(prefix):
+                return prefix
+        return None
+
+    def get(self, key: str):
+        namespace = self.namespace_for(key)
+        if namespace is None or not self.active:
+            return None
+        entries = self._entries[namespace]
+        if key not in entries:
+            self._stats[namespace]["misses"] += 1
+            return None
+        entries.move_to_end(key)
+        self._stats[namespace]["hits"] += 1
+        return entries[key]
+
+    def put(self, key: str, value: Any, seq: int) -> None:
+        namespace = self.namespace_for(key)
+        # Если между чтением из Redis и записью пришла инвалидация, значение
+        # могло устареть - не кэшируем его
+        if namespace is None or not self.active or seq != self._invalidation_seq:
+            return
+        entries = self._entries[namespace]
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.limits[namespace]:
+            entries.popitem(last=False)
+            self._stats[namespace]["evictions"] += 1
+
+    def invalidate(self, key: str) -> None:
+        self._invalidation_seq += 1
+        namespace = self.namespace_for(key)
+        if namespace and self._entries[namespace].pop(key, None) is not None:
+            self._stats[namespace]["invalidations"] += 1
+
+    def clear(self) -> None:
+        self._invalidation_seq += 1
+        for entries in self._entries.values():
+            entries.clear()
+
+    @property
+    def seq(self) -> int:
+        return self._invalidation_seq
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            prefix: {**values, "size": len(self._entries[prefix])}
+            for prefix, values in self._stats.items()
+        }
+
+
+local_cache = LocalCache(LOCAL_CACHE_NAMESPACES)
+
+metrics.describe(
+    "local_cache_events_total", "counter", "События L1-кэша воркера по префиксам"
+)
+metrics.describe("local_cache_entries", "gauge", "Записей в L1-кэше воркера")
+
+
+def _local_cache_samples():
+    samples = []
+    for prefix, values in local_cache.stats().items():
+        for event, value in values.items():
+            if event == "size":
+                samples.append(("local_cache_entries", {"prefix": prefix}, value))
+            else:
+                samples.append(
+                    (
+                        "local_cache_events_total",
+                        {"prefix": prefix, "event": event},
+                        value,
+                    )
+                )
+    return samples
+
+
+metrics.register_collector(_local_cache_samples)
+_tracking_task: Optional[asyncio.Task] = None
+
+
+async def _track_invalidations():
+    prefixes = list(local_cache.limits)
+    while True:
+        connection = None
+        try:
+            pool = get_redis_client().connection_pool
+            connection = pool.connection_class(**pool.connection_kwargs)
+            await connection.connect()
+            await connection.send_command("CLIENT", "ID")
+            client_id = await connection.read_response()
+
+            tracking_args = ["CLIENT", "TRACKING", "ON", "REDIRECT", client_id, "BCAST"]
+            for prefix in prefixes:
+                tracking_args.extend(["PREFIX", prefix])
+            await connection.send_command(*tracking_args)
+            await connection.read_response()
+            await connection.send_command("SUBSCRIBE", INVALIDATION_CHANNEL)
+            await connection.read_response()
+
+            local_cache.clear()
+            local_cache.active = True
+            logger.info("L1-кэш: подписка на инвалидации Redis активна")
+
+            while True:
+                message = await connection.read_response()
+                if not isinstance(message, list) or message[0] != "message":
+                    continue
+                keys = message[2]
+                if keys is None:
+                    # FLUSHALL/FLUSHDB
+                    local_cache.clear()
+                else:
+                    for key in keys:
+                        local_cache.invalidate(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"L1-кэш отключен, подписка на инвалидации прервана: {e}")
+            await asyncio.sleep(1)
+        finally:
+            local_cache.active = False
+            local_cache.clear()
+            if connection is not None:
+                try:
+                    await connection.disconnect()
+                except Exception:
+                    pass
+
+
+async def init_local_cache():
+    global _tracking_task
+    if not local_cache.limits:
+        logger.info("L1-кэш отключен")
+        return
+    if is_cluster():
+        # CLIENT TRACKING BCAST работает в пределах одного узла
+        logger.warning("L1-кэш не поддерживается в режиме Redis Cluster и отключен")
+        return
+    if _tracking_task is None:
+        _tracking_task = asyncio.create_task(_track_invalidations())
+
+
+async def close_local_cache():
+    global _tracking_task
+    if _tracking_task is not None:
+        _tracking_task.cancel()
+        try:
+            await _tracking_task
+        except asyncio.CancelledError:
+            pass
+        _tracking_task = None
@@ -0,0 +1,192 @@
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Реестр метрик воркера в текстовом формате Prometheus. Счетчики и гистограммы
+# копятся в процессе, gauges и счетчики из статистики других модулей
+# снимаются коллекторами в момент запроса /metrics. Все функции
+# потокобезопасны: события пула MongoDB приходят из потоков PyMongo.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+_lock = threading.Lock()
+_descriptions: Dict[str, Tuple[str, str]] = {}
+_buckets: Dict[str, Tuple[float, ...]] = {}
+_counters: Dict[Tuple[str, Labels], float] = {}
+_histograms: Dict[Tuple[str, Labels], List[float]] = {}
+_collectors: List[Callable[[], Iterable[Sample]]] = []
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def describe(
+    name: str, kind: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> None:
+    """`kind` - counter, gauge или histogram."""
+    _descriptions[name] = (kind, help_text)
+    if kind == "histogram":
+        _buckets[name] = tuple(buckets)
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    buckets = _buckets.get(name, DEFAULT_BUCKETS)
+    key = (name, _labels(labels))
+    with _lock:
+        # Счетчики по бакетам (не кумулятивные), затем сумма и количество
+        data = _histograms.get(key)
+        if data is None:
+            data = _histograms[key] = [0.0] * (len(buckets) + 2)
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                data[index] += 1
+                break
+        data[-2] += value
+        data[-1] += 1
+
+
+def register_collector(collector: Callable[[], Iterable[Sample]]) -> None:
+    """Коллектор возвращает сэмплы `(имя, метки, значение)` на момент запроса."""
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def snapshot(extra_labels: Optional[Dict[str, str]] = None) -> Dict[str, list]:
+    """
+    Сериализуемый снимок метрик воркера. `extra_labels` добавляются к
+    gauges: их значения не суммируются между воркерами.
+    """
+    gauges = []
+    collected = []
+    for collector in list(_collectors):
+        for name, labels, value in collector():
+            kind = _descriptions.get(name, ("gauge", ""))[0]
+            if kind == "gauge":
+                gauges.append([name, {**labels, **(extra_labels or {})}, value])
+            else:
+                collected.append([name, labels, value])
+    with _lock:
+        counters = [
+            [name, dict(labels), value] for (name, labels), value in _counters.items()
+        ]
+        histograms = [
+            [name, dict(labels), list(data)]
+            for (name, labels), data in _histograms.items()
+        ]
+    return {
+        "counters": counters + collected,
+        "histograms": histograms,
+        "gauges": gauges,
+    }
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, list]]) -> Dict[str, list]:
+    """Складывает счетчики и гистограммы воркеров, gauges оставляет как есть."""
+    counters: Dict[Tuple[str, Labels], float] = {}
+    histograms: Dict[Tuple[str, Labels], List[float]] = {}
+    gauges = []
+    for data in snapshots:
+        for name, labels, value in data.get("counters", []):
+            key = (name, _labels(labels))
+            counters[key] = counters.get(key, 0.0) + value
+        for name, labels, values in data.get("histograms", []):
+            key = (name, _labels(labels))
+            current = histograms.get(key)
+            if current is None or len(current) != len(values):
+                histograms[key] = list(values)
+            else:
+                histograms[key] = [a + b for a, b in zip(current, values)]
+        gauges.extend(data.get("gauges", []))
+    return {
+        "counters": [
+            [name, dict(labels), value] for (name, labels), value in counters.items()
+        ],
+        "histograms": [
+            [name, dict(labels), values]
+            for (name, labels), values in histograms.items()
+        ],
+        "gauges": gauges,
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in sorted(labels.items())
+    )
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render(data: Dict[str, list]) -> str:
+    by_name: Dict[str, List[str]] = {}
+
+    for name, labels, value in data.get("counters", []) + data.get("gauges", []):
+        by_name.setdefault(name, []).append(
+            f"{name}{_format_labels(labels)} {_format_value(value)}"
+        )
+
+    for name, labels, values in data.get("histograms", []):
+        buckets = _buckets.get(name, DEFAULT_BUCKETS)
+        lines = by_name.setdefault(name, [])
+        cumulative = 0.0
+        for bound, count in zip(buckets, values):
+            cumulative += count
+            lines.append(
+                f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} "
+                f"{_format_value(cumulative)}"
+            )
+        lines.append(
+            f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} "
+            f"{_format_value(values[-1])}"
+        )
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+        lines.append(
+            f"{name}_count{_format_labels(labels)} {_format_value(values[-1])}"
+        )
+
+    output = []
+    for name in sorted(by_name):
+        kind, help_text = _descriptions.get(name, ("untyped", ""))
+        if help_text:
+            output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {kind}")
+        output.extend(by_name[name])
+    return "\n".join(output) + "\n"
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Optional
+
+from backend.core import metrics
+from backend.core.config import logger, METRICS_PUSH_INTERVAL_SECONDS
+from backend.core.redis_client import UNAVAILABLE, call_redis, get_redis_client
+
+# Каждый воркер uvicorn периодически кладет снимок своих метрик в Redis,
+# а /metrics на любом воркере складывает снимки всех живых воркеров.
+# Снимок умершего воркера истекает через несколько интервалов, и его
+# счетчики пропадают из суммы - Prometheus воспринимает это как сброс счетчика.
+# Hash tag {metrics} держит ключи в одном слоте кластера, чтобы работал MGET
+METRICS_WORKERS_KEY = "{metrics}:workers"
+METRICS_WORKER_KEY = "{{metrics}}:worker:{worker}"
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+metrics.describe(
+    "http_request_duration_seconds",
+    "histogram",
+    "Время обработки HTTP-запросов по маршрутам",
+)
+metrics.describe("metrics_workers_reporting", "gauge", "Воркеров, чьи метрики собраны")
+
+_push_task: Optional[asyncio.Task] = None
+
+
+def observe_request(method: str, route: str, status_code: int, seconds: float):
+    metrics.observe(
+        "http_request_duration_seconds",
+        seconds,
+        method=method,
+        route=route,
+        status=status_code,
+    )
+
+
+def _worker_snapshot() -> dict:
+    return metrics.snapshot(extra_labels={"worker": WORKER_ID})
+
+
+async def _push_snapshot(data: dict) -> None:
+    redis_client = get_redis_client()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.set(
+            METRICS_WORKER_KEY.format(worker=WORKER_ID),
+            json.dumps(data),
+            ex=max(1, int(METRICS_PUSH_INTERVAL_SECONDS * 3)),
+        )
+        pipe.sadd(METRICS_WORKERS_KEY, WORKER_ID)
+        await pipe.execute()
+
+
+async def _read_snapshots() -> list:
+    redis_client = get_redis_client()
+    workers = sorted(await redis_client.smembers(METRICS_WORKERS_KEY))
+    if not workers:
+        return []
+    values = await redis_client.mget(
+        [METRICS_WORKER_KEY.format(worker=worker) for worker in workers]
+    )
+    expired = [worker for worker, value in zip(workers, values) if value is None]
+    if expired:
+        await redis_client.srem(METRICS_WORKERS_KEY, *expired)
+    return [json.loads(value) for value in values if value is not None]
+
+
+async def collect_metrics() -> str:
+    """
+    Метрики всех воркеров в текстовом формате Prometheus. Если Redis
+    недоступен, отдаются метрики только текущего воркера.
+    """
+    own = _worker_snapshot()
+    snapshots = UNAVAILABLE
+    if (
+        await call_redis(lambda: _push_snapshot(own), family="metrics")
+        is not UNAVAILABLE
+    ):
+        snapshots = await call_redis(_read_snapshots, family="metrics")
+    if snapshots is UNAVAILABLE or not snapshots:
+        snapshots = [own]
+
+    merged = metrics.merge_snapshots(snapshots)
+    merged["gauges"].append(["metrics_workers_reporting", {}, len(snapshots)])
+    return metrics.render(merged)
+
+
+async def _push_loop() -> None:
+    while True:
+        started = time.monotonic()
+        try:
+            await call_redis(
+                lambda: _push_snapshot(_worker_snapshot()), family="metrics"
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось отправить метрики воркера в Redis: {e}")
+        await asyncio.sleep(
+            max(0.0, METRICS_PUSH_INTERVAL_SECONDS - (time.monotonic() - started))
+        )
+
+
+async def init_metrics_exporter():
+    global _push_task
+    if _push_task is None:
+        _push_task = asyncio.create_task(_push_loop())
+
+
+async def close_metrics_exporter():
+    global _push_task
+    if _push_task is not None:
+        _push_task.cancel()
+        try:
+            await _push_task
+        except asyncio.CancelledError:
+            pass
+        _push_task = None
+    await call_redis(
+        lambda: get_redis_client().srem(METRICS_WORKERS_KEY, WORKER_ID),
+        family="metrics",
+    )
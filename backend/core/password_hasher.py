@@ -0,0 +1,224 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Set
+
+from fastapi import HTTPException, status
+
+from backend.core.config import (
+    logger,
+    BCRYPT_ROUNDS,
+    BCRYPT_TARGET_MS,
+    BCRYPT_MIN_ROUNDS,
+    BCRYPT_MAX_ROUNDS,
+    BCRYPT_CALIBRATION_GROUP,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE,
+    PASSWORD_HASH_RETRY_AFTER,
+)
+from backend.core.redis_client import get_redis_client
+from backend.core import metrics
+from backend.core import password_worker
+from backend.models.user import User
+
+BCRYPT_ROUNDS_KEY = f"bcrypt_rounds:{BCRYPT_CALIBRATION_GROUP}"
+BCRYPT_ROUNDS_KEY_TTL = 24 * 3600
+
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight = 0
+_rejected = 0
+_rounds = BCRYPT_ROUNDS
+_rehash_tasks: Set[asyncio.Task] = set()
+
+metrics.describe(
+    "password_hash_seconds",
+    "histogram",
+    "Время хеширования и проверки паролей, включая ожидание в очереди пула",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+metrics.describe(
+    "password_hash_in_flight", "gauge", "Операций bcrypt в пуле и в очереди"
+)
+metrics.describe(
+    "password_hash_queue_depth", "gauge", "Операций bcrypt, ждущих свободный процесс"
+)
+metrics.describe(
+    "password_hash_rejected_total",
+    "counter",
+    "Операций bcrypt, отклоненных из-за переполненной очереди",
+)
+metrics.describe("password_hash_bcrypt_rounds", "gauge", "Текущая стоимость bcrypt")
+
+
+def get_bcrypt_rounds() -> int:
+    return _rounds
+
+
+async def calibrate_bcrypt_rounds() -> int:
+    """
+    Подбирает максимальную стоимость bcrypt, при которой хеширование на этом хосте
+    укладывается в BCRYPT_TARGET_MS. Каждый шаг удваивает время, поэтому
+    калибровка занимает порядка 2 * BCRYPT_TARGET_MS.
+    Результат публикуется в Redis под ключом группы BCRYPT_CALIBRATION_GROUP
+    (по умолчанию - хоста), чтобы воркеры одного хоста использовали одну
+    стоимость и не перехешировали пароли друг за другом, а хосты другой
+    мощности калибровались сами.
+    """
+    global _rounds
+    if _executor is None:
+        init_password_hasher()
+
+    redis_client = get_redis_client()
+    shared_rounds = await redis_client.get(BCRYPT_ROUNDS_KEY)
+    if shared_rounds:
+        _rounds = int(shared_rounds)
+        logger.info(f"Стоимость bcrypt взята из Redis: {_rounds}")
+        return _rounds
+
+    loop = asyncio.get_running_loop()
+    budget = BCRYPT_TARGET_MS / 1000
+    best = BCRYPT_MIN_ROUNDS
+    for rounds in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1):
+        elapsed = await loop.run_in_executor(
+            _executor, password_worker.measure_hash, rounds
+        )
+        logger.info(f"Калибровка bcrypt: cost={rounds}, {elapsed * 1000:.0f} мс")
+        if elapsed > budget and rounds > BCRYPT_MIN_ROUNDS:
+            break
+        best = rounds
+        if elapsed * 2 > budget:
+            break
+
+    await redis_client.set(BCRYPT_ROUNDS_KEY, best, ex=BCRYPT_ROUNDS_KEY_TTL, nx=True)
+    _rounds = int(await redis_client.get(BCRYPT_ROUNDS_KEY) or best)
+    logger.info(f"Выбрана стоимость bcrypt: {_rounds} (бюджет {BCRYPT_TARGET_MS} мс)")
+    return _rounds
+
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return get_hash_rounds(hashed_password) != _rounds
+
+
+async def _rehash_password(user_id, old_hash: str, password: str):
+    try:
+        new_hash = await hash_password(password)
+        # Обновляем только если пароль не успели сменить параллельно
+        await User.find_one({"_id": user_id, "password": old_hash}).update(
+            {"$set": {"password": new_hash}}
+        )
+        logger.info(
+            f"Пароль пользователя {user_id} перехеширован: "
+            f"cost {get_hash_rounds(old_hash)} -> {_rounds}"
+        )
+    except Exception as e:
+        logger.warning(f"Не удалось перехешировать пароль пользователя {user_id}: {e}")
+
+
+def schedule_rehash_if_needed(user: User, password: str) -> None:
+    if not needs_rehash(user.password):
+        return
+    task = asyncio.create_task(_rehash_password(user.id, user.password, password))
+    _rehash_tasks.add(task)
+    task.add_done_callback(_rehash_tasks.discard)
+
+
+def init_password_hasher():
+    global _executor
+    if _executor is None:
+        # Без fork: к этому моменту в процессе уже работают потоки Motor и
+        # redis, а их блокировки, скопированные fork, могут повесить процесс
+        # пула. forkserver один раз импортирует легкий password_worker,
+        # процессы пула порождаются от него без повторного импорта
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([password_worker.__name__])
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS, mp_context=context
+        )
+        logger.info(
+            f"Пул хеширования паролей запущен: {PASSWORD_HASH_WORKERS} процессов, "
+            f"очередь {PASSWORD_HASH_MAX_QUEUE}"
+        )
+
+
+def shutdown_password_hasher():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        logger.info("Пул хеширования паролей остановлен")
+
+
+async def _run(operation: str, func, *args):
+    global _in_flight, _rejected
+    if _in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        _rejected += 1
+        logger.warning("Очередь хеширования паролей переполнена, запрос отклонен")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, попробуйте позже",
+            headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+        )
+
+    if _executor is None:
+        init_password_hasher()
+
+    _in_flight += 1
+    started = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, func, *args)
+    finally:
+        _in_flight -= 1
+        metrics.observe(
+            "password_hash_seconds",
+            time.perf_counter() - started,
+            operation=operation,
+        )
+
+
+async def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    hashed = await _run(
+        "hash", password_worker.hashpw, password.encode("utf-8"), rounds or _rounds
+    )
+    return hashed.decode("utf-8")
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _run(
+        "verify",
+        password_worker.checkpw,
+        password.encode("utf-8"),
+        hashed_password.encode("utf-8"),
+    )
+
+
+def get_password_hasher_stats() -> Dict[str, Any]:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "bcrypt_rounds": _rounds,
+        "max_queue": PASSWORD_HASH_MAX_QUEUE,
+        "in_flight": _in_flight,
+        "queue_depth": max(0, _in_flight - PASSWORD_HASH_WORKERS),
+        "rejected": _rejected,
+    }
+
+
+def _password_hasher_samples():
+    stats = get_password_hasher_stats()
+    return [
+        ("password_hash_in_flight", {}, stats["in_flight"]),
+        ("password_hash_queue_depth", {}, stats["queue_depth"]),
+        ("password_hash_rejected_total", {}, stats["rejected"]),
+        ("password_hash_bcrypt_rounds", {}, stats["bcrypt_rounds"]),
+    ]
+
+
+metrics.register_collector(_password_hasher_samples)
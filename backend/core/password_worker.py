@@ -0,0 +1,21 @@
+import time
+
+import bcrypt
+
+# Функции, которые выполняются в процессах пула хеширования паролей
+# (backend.core.password_hasher). Модуль предзагружается forkserver'ом,
+# поэтому не импортирует ничего, кроме bcrypt.
+
+
+def hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def measure_hash(rounds: int) -> float:
+    started = time.perf_counter()
+    bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+    return time.perf_counter() - started
@@ -0,0 +1,333 @@
+import asyncio
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel, ConfigDict
+from pymongo.errors import OperationFailure
+from redis.client import NEVER_DECODE
+from redis.exceptions import WatchError
+
+from backend.core.config import logger
+from backend.core import metrics
+from backend.core.cache_codec import decode_value, encode_value
+from backend.core.redis_client import (
+    get_redis_client,
+    get_pubsub_client,
+    call_redis,
+    UNAVAILABLE,
+)
+from backend.models.subscription import SubscriptionPlan
+
+PLANS_CHANGED_CHANNEL = "plans:changed"
+# Все ключи каталога в одном слоте кластера (hash tag {plans}), чтобы снимок
+# и указатель писались одной транзакцией; при REDIS_CLUSTER_READ_FROM_REPLICAS
+# чтения горячего слота распределяются по репликам
+PLANS_VERSION_KEY = "{plans}:version"
+PLANS_SNAPSHOT_KEY = "{{plans}}:v:{version}"
+# Сколько секунд живет предыдущая версия снимка после публикации новой
+PLANS_SNAPSHOT_GRACE_SECONDS = 60
+
+
+class CatalogPlan(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: PydanticObjectId
+    name: str
+    price: float
+    renewalPeriod: int = 30
+    features: Tuple[str, ...] = ()
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+
+    @classmethod
+    def from_document(cls, plan: SubscriptionPlan) -> "CatalogPlan":
+        return cls(
+            id=plan.id,
+            name=plan.name,
+            price=plan.price,
+            renewalPeriod=plan.renewalPeriod,
+            features=tuple(plan.features),
+            createdAt=plan.createdAt,
+            updatedAt=plan.updatedAt,
+        )
+
+    def to_response_dict(self) -> Dict[str, Any]:
+        """Словарь в формате SubscriptionPlanResponse (`_id` строкой)."""
+        data = self.model_dump(mode="json")
+        data["_id"] = data.pop("id")
+        return data
+
+
+class PlanCatalog:
+    """
+    Неизменяемый снимок тарифных планов с номером версии. Воркер держит ссылку
+    на текущий снимок и при обновлении атомарно подменяет ее целиком, поэтому
+    читатели никогда не видят каталог наполовину обновленным.
+    """
+
+    __slots__ = ("version", "plans", "free_plan", "_by_id", "_by_name")
+
+    def __init__(self, version: int, plans: Iterable[CatalogPlan]):
+        self.version = version
+        self.plans: Tuple[CatalogPlan, ...] = tuple(
+            sorted(plans, key=lambda plan: plan.price)
+        )
+        self._by_id: Mapping[str, CatalogPlan] = MappingProxyType(
+            {str(plan.id): plan for plan in self.plans}
+        )
+        self._by_name: Mapping[str, CatalogPlan] = MappingProxyType(
+            {plan.name: plan for plan in self.plans}
+        )
+        self.free_plan: Optional[CatalogPlan] = next(
+            (plan for plan in self.plans if plan.price == 0), None
+        )
+
+    def get(self, plan_id: Union[str, PydanticObjectId, None]) -> Optional[CatalogPlan]:
+        if plan_id is None:
+            return None
+        return self._by_id.get(str(plan_id))
+
+    def get_by_name(self, name: str) -> Optional[CatalogPlan]:
+        return self._by_name.get(name)
+
+    def __len__(self) -> int:
+        return len(self.plans)
+
+
+_catalog = PlanCatalog(0, ())
+_refresh_lock = asyncio.Lock()
+_watch_task: Optional[asyncio.Task] = None
+
+
+def get_plan_catalog() -> PlanCatalog:
+    return _catalog
+
+
+metrics.describe(
+    "plan_catalog_version", "gauge", "Версия каталога тарифных планов воркера"
+)
+metrics.register_collector(
+    lambda: [("plan_catalog_version", {}, get_plan_catalog().version)]
+)
+
+
+def _snapshot_key(version: int) -> str:
+    return PLANS_SNAPSHOT_KEY.format(version=version)
+
+
+def _encode_snapshot(plans: Iterable[CatalogPlan]) -> Dict[str, bytes]:
+    return {str(plan.id): encode_value(plan.model_dump(mode="json")) for plan in plans}
+
+
+def _plan_fields(raw: Dict[bytes, bytes]) -> Dict[str, bytes]:
+    # Служебные поля снимка начинаются с "_", id планов - hex-строки
+    fields = {}
+    for field, value in raw.items():
+        field = field.decode() if isinstance(field, bytes) else field
+        if not field.startswith("_"):
+            fields[field] = value
+    return fields
+
+
+async def _read_snapshot() -> Optional[Tuple[int, List[CatalogPlan]]]:
+    """Текущий снимок из Redis или None, если он еще не опубликован."""
+    redis_client = get_redis_client()
+    # Указатель мог переключиться между GET и HGETALL, а старая версия
+    # истечь - тогда просто перечитываем указатель
+    for _ in range(3):
+        version = await redis_client.get(PLANS_VERSION_KEY)
+        if version is None:
+            return None
+        raw = await redis_client.execute_command(
+            "HGETALL", _snapshot_key(int(version)), **{NEVER_DECODE: True}
+        )
+        if raw:
+            plans = [
+                CatalogPlan.model_validate(decode_value(value))
+                for value in _plan_fields(raw).values()
+            ]
+            return int(version), plans
+    return None
+
+
+async def _publish_snapshot(plans: List[CatalogPlan]) -> int:
+    """
+    Публикует снимок планов новой версией: хэш `{plans}:v:{version}` и указатель
+    `{plans}:version` пишутся одной транзакцией MULTI под WATCH, поэтому читатели
+    видят либо старый каталог целиком, либо новый. Если текущий снимок уже
+    совпадает с `plans`, новая версия не создается (одно изменение в MongoDB
+    видят все воркеры). Возвращает версию снимка с этими планами.
+    """
+    redis_client = get_redis_client()
+    snapshot = _encode_snapshot(plans)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(PLANS_VERSION_KEY)
+                current = await pipe.get(PLANS_VERSION_KEY)
+                current = int(current) if current else 0
+                if current:
+                    raw = await pipe.execute_command(
+                        "HGETALL", _snapshot_key(current), **{NEVER_DECODE: True}
+                    )
+                    if raw and _plan_fields(raw) == snapshot:
+                        await pipe.unwatch()
+                        return current
+
+                version = current + 1
+                pipe.multi()
+                pipe.delete(_snapshot_key(version))
+                # Служебное поле, чтобы снимок без планов тоже существовал
+                pipe.hset(
+                    _snapshot_key(version),
+                    mapping={"_version": str(version), **snapshot},
+                )
+                pipe.set(PLANS_VERSION_KEY, version)
+                if current:
+                    # Предыдущая версия живет еще немного для читателей,
+                    # успевших прочитать старый указатель
+                    pipe.expire(_snapshot_key(current), PLANS_SNAPSHOT_GRACE_SECONDS)
+                await pipe.execute()
+                break
+            except WatchError:
+                # Другой воркер успел опубликовать версию - сравниваем заново
+                continue
+
+    if not current:
+        # Ключи прежнего формата (plan:{name} и флаг загрузки) лежат в других
+        # слотах кластера, поэтому удаляются вне транзакции и по одному
+        for key in ("subscription_plans_loaded", *(f"plan:{p.name}" for p in plans)):
+            await redis_client.delete(key)
+    return version
+
+
+def _swap(version: int, plans: Iterable[CatalogPlan]) -> PlanCatalog:
+    global _catalog
+    _catalog = PlanCatalog(version, plans)
+    logger.info(
+        f"Каталог тарифных планов обновлен: версия {_catalog.version}, "
+        f"планов {len(_catalog)}"
+    )
+    return _catalog
+
+
+async def refresh_plan_catalog(publish: bool = False) -> PlanCatalog:
+    """
+    Обновляет каталог воркера из снимка в Redis. Если снимка нет или
+    `publish=True`, планы читаются из MongoDB и публикуются новой версией.
+    Без Redis каталог строится из MongoDB с прежним номером версии.
+    """
+    async with _refresh_lock:
+        if not publish:
+            snapshot = await call_redis(_read_snapshot, family="plans")
+            if snapshot is not UNAVAILABLE and snapshot is not None:
+                version, plans = snapshot
+                if version != _catalog.version:
+                    _swap(version, plans)
+                return _catalog
+
+        plans = [
+            CatalogPlan.from_document(plan)
+            for plan in await SubscriptionPlan.find_all().to_list()
+        ]
+        version = await call_redis(lambda: _publish_snapshot(plans), family="plans")
+        if version is UNAVAILABLE:
+            logger.warning(
+                "Снимок тарифных планов не опубликован в Redis, "
+                "каталог воркера загружен из MongoDB"
+            )
+            version = _catalog.version
+        return _swap(version, plans)
+
+
+async def _refresh_quietly(publish: bool = False) -> None:
+    try:
+        await refresh_plan_catalog(publish=publish)
+    except Exception as e:
+        logger.error(f"Не удалось обновить каталог тарифных планов: {e}", exc_info=True)
+
+
+async def notify_plans_changed() -> None:
+    """
+    Вызывается после фиксации изменений планов: публикует новую версию
+    снимка в Redis и сообщает о ней остальным воркерам. Не бросает
+    исключений, так как изменение в MongoDB к этому моменту уже зафиксировано.
+    """
+    await _refresh_quietly(publish=True)
+    published = await call_redis(
+        lambda: get_redis_client().publish(PLANS_CHANGED_CHANNEL, _catalog.version),
+        family="pubsub",
+    )
+    if published is UNAVAILABLE:
+        logger.warning("Не удалось оповестить воркеры об изменении тарифных планов")
+
+
+async def _watch_change_stream() -> None:
+    collection = SubscriptionPlan.get_motor_collection()
+    async with collection.watch() as stream:
+        # Изменения между загрузкой и открытием потока могли быть пропущены.
+        # Каждый воркер сверяет снимок в Redis с MongoDB, но новую версию
+        # публикует только первый - остальные видят совпадающий снимок
+        await _refresh_quietly(publish=True)
+        async for _ in stream:
+            await _refresh_quietly(publish=True)
+
+
+async def _listen_pubsub() -> None:
+    pubsub = get_pubsub_client().pubsub(ignore_subscribe_messages=True)
+    try:
+        await pubsub.subscribe(PLANS_CHANGED_CHANNEL)
+        await _refresh_quietly()
+        async for message in pubsub.listen():
+            if message and message.get("type") == "message":
+                if str(_catalog.version) != message.get("data"):
+                    await _refresh_quietly()
+    finally:
+        await pubsub.aclose()
+
+
+async def _watch_plan_changes() -> None:
+    # Change stream ловит и изменения мимо API (миграции, ручные правки),
+    # но требует replica set; без него слушаем оповещения через Redis
+    use_change_stream = True
+    while True:
+        try:
+            if use_change_stream:
+                await _watch_change_stream()
+            else:
+                await _listen_pubsub()
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            if use_change_stream and e.code in (40573, 40324):
+                logger.warning(
+                    "Change stream недоступен (нужен replica set), "
+                    "каталог планов обновляется по оповещениям через Redis"
+                )
+                use_change_stream = False
+                continue
+            logger.warning(f"Отслеживание изменений тарифных планов прервано: {e}")
+            await asyncio.sleep(1)
+        except Exception as e:
+            logger.warning(f"Отслеживание изменений тарифных планов прервано: {e}")
+            await asyncio.sleep(1)
+
+
+async def init_plan_catalog():
+    global _watch_task
+    await refresh_plan_catalog()
+    if _watch_task is None:
+        _watch_task = asyncio.create_task(_watch_plan_changes())
+
+
+async def close_plan_catalog():
+    global _watch_task
+    if _watch_task is not None:
+        _watch_task.cancel()
+        try:
+            await _watch_task
+        except asyncio.CancelledError:
+            pass
+        _watch_task = None
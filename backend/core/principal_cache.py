@@ -0,0 +1,178 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
+
+from pydantic import BaseModel
+
+from backend.core.config import (
+    logger,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRINCIPAL_CACHE_MAX_SIZE,
+)
+from backend.core.redis_client import (
+    get_redis_client,
+    get_pubsub_client,
+    call_redis,
+    UNAVAILABLE,
+)
+from backend.core import metrics
+
+PRINCIPAL_INVALIDATION_CHANNEL = "principal_cache:invalidate"
+
+
+class PrincipalCache:
+    """
+    Ограниченный по размеру LRU-кэш пользователей с TTL, живущий в процессе воркера.
+    Используется в `get_current_user`, чтобы не ходить в MongoDB на каждый запрос.
+    Хранит неизменяемые проекции (backend.models.user_views), поэтому отдает их
+    без копирования; записывать пользователя из кэша через save() нельзя.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, BaseModel]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: str) -> Optional[BaseModel]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def set(self, user_id: str, user: BaseModel) -> None:
+        if not self.enabled:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        if self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+# Облегченные проекции (UserPrincipalView) для get_current_principal, когда
+# токен проверяется через MongoDB; инвалидируются вместе с principal_cache
+principal_view_cache = PrincipalCache(
+    PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+metrics.describe(
+    "principal_cache_events_total",
+    "counter",
+    "События кэша пользователей в get_current_user",
+)
+metrics.describe("principal_cache_entries", "gauge", "Пользователей в кэше воркера")
+
+
+def _principal_cache_samples():
+    stats = principal_cache.stats()
+    return [
+        ("principal_cache_entries", {}, stats["size"]),
+        *(
+            ("principal_cache_events_total", {"event": event}, stats[event])
+            for event in ("hits", "misses", "evictions", "invalidations")
+        ),
+    ]
+
+
+metrics.register_collector(_principal_cache_samples)
+_listener_task: Optional[asyncio.Task] = None
+
+
+async def invalidate_principal(user_id) -> None:
+    user_id = str(user_id)
+    principal_cache.invalidate(user_id)
+    principal_view_cache.invalidate(user_id)
+    published = await call_redis(
+        lambda: get_redis_client().publish(PRINCIPAL_INVALIDATION_CHANNEL, user_id),
+        family="pubsub",
+    )
+    if published is UNAVAILABLE:
+        logger.warning(f"Не удалось отправить инвалидацию кэша пользователя {user_id}")
+
+
+async def _listen_invalidations():
+    while True:
+        pubsub = None
+        try:
+            pubsub = get_pubsub_client().pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(PRINCIPAL_INVALIDATION_CHANNEL)
+            # После переподключения могли пропустить сообщения
+            principal_cache.clear()
+            principal_view_cache.clear()
+            async for message in pubsub.listen():
+                if message and message.get("type") == "message":
+                    principal_cache.invalidate(str(message["data"]))
+                    principal_view_cache.invalidate(str(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Подписка на инвалидацию кэша пользователей прервана: {e}")
+            principal_cache.clear()
+            principal_view_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+async def init_principal_cache():
+    global _listener_task
+    if not principal_cache.enabled:
+        logger.info("Кэш пользователей для аутентификации отключен")
+        return
+    if _listener_task is None:
+        _listener_task = asyncio.create_task(_listen_invalidations())
+        logger.info("Подписка на инвалидацию кэша пользователей запущена")
+
+
+async def close_principal_cache():
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
+    principal_cache.clear()
+    principal_view_cache.clear()
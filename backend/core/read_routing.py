@@ -0,0 +1,122 @@
+from typing import Any, Optional, Type, TypeVar, Union
+
+from beanie import Document, PydanticObjectId
+from beanie.odm.utils.projection import get_projection
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import BaseModel
+from pymongo.read_preferences import ReadPreference, SecondaryPreferred
+
+from backend.core.config import (
+    logger,
+    MONGO_READ_FROM_SECONDARIES,
+    MONGO_READ_MAX_STALENESS_SECONDS,
+    MONGO_READ_PIN_SECONDS,
+)
+from backend.core.redis_client import (
+    get_redis_client,
+    call_redis,
+    cache_key,
+    UNAVAILABLE,
+)
+from backend.core import metrics
+
+# Маршрутизация чтений без транзакций: промахи кэша читаются со вторичных
+# узлов с ограниченным отставанием. После записи пользователя в Redis ставится
+# маркер u:{<id>}:read_pin, и пока он жив, чтения этого пользователя идут
+# на первичный узел (read-your-writes). Если Redis недоступен, маркер
+# проверить нельзя - читаем с первичного. Транзакции всегда на первичном.
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+SECONDARY_READS = SecondaryPreferred(max_staleness=MONGO_READ_MAX_STALENESS_SECONDS)
+
+metrics.describe(
+    "mongo_read_routing_total",
+    "counter",
+    "Чтения MongoDB по маршрутам: primary, secondary, pinned",
+)
+
+
+async def pin_primary_reads(*user_ids: Any) -> None:
+    """
+    Вызывается после записи: чтения пользователей `user_ids` на
+    MONGO_READ_PIN_SECONDS закрепляются за первичным узлом. Не бросает исключений.
+    """
+    if not MONGO_READ_FROM_SECONDARIES or not user_ids:
+        return
+
+    async def _pin():
+        async with get_redis_client().pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.set(cache_key("read_pin", user_id), 1, ex=MONGO_READ_PIN_SECONDS)
+            await pipe.execute()
+
+    try:
+        pinned = await call_redis(_pin, family="read_pin")
+    except Exception as e:
+        pinned = UNAVAILABLE
+        logger.warning(f"Ошибка установки маркера чтения с первичного узла: {e}")
+    if pinned is UNAVAILABLE:
+        logger.warning(
+            "Маркер чтения с первичного узла не установлен, "
+            "пользователь может увидеть устаревшие данные"
+        )
+
+
+async def read_preference_for(user_id: Any = None):
+    """Read preference для чтения данных пользователя `user_id` (или общих данных)."""
+    if not MONGO_READ_FROM_SECONDARIES:
+        metrics.inc("mongo_read_routing_total", route="primary")
+        return ReadPreference.PRIMARY
+    if user_id is not None:
+        pinned = await call_redis(
+            lambda: get_redis_client().exists(cache_key("read_pin", user_id)),
+            family="read_pin",
+        )
+        if pinned is UNAVAILABLE or pinned:
+            metrics.inc("mongo_read_routing_total", route="pinned")
+            return ReadPreference.PRIMARY
+    metrics.inc("mongo_read_routing_total", route="secondary")
+    return SECONDARY_READS
+
+
+def routed_collection(
+    document: Type[Document], read_preference: Any
+) -> AsyncIOMotorCollection:
+    """Коллекция модели `document` с уже выбранным `read_preference`."""
+    collection = document.get_motor_collection()
+    if read_preference == collection.read_preference:
+        return collection
+    return collection.with_options(read_preference=read_preference)
+
+
+async def read_collection(
+    document: Type[Document], user_id: Optional[Any] = None
+) -> AsyncIOMotorCollection:
+    """
+    Коллекция модели `document` с read preference для чтения данных
+    пользователя `user_id`. Только для чтений вне транзакций.
+    """
+    return routed_collection(document, await read_preference_for(user_id))
+
+
+async def read_document(
+    document: Type[Document],
+    document_id: Any,
+    user_id: Optional[Any] = None,
+    projection_model: Optional[Type[ModelType]] = None,
+    read_preference: Any = None,
+) -> Optional[Union[Document, ModelType]]:
+    """
+    Аналог `document.get(document_id)` с маршрутизацией чтения. С
+    `projection_model` читаются только поля проекции (`Settings.projection`
+    или поля модели), а результат - модель проекции без state management.
+    Если `read_preference` уже выбран для запроса, маркер в Redis не проверяется.
+    """
+    if read_preference is None:
+        read_preference = await read_preference_for(user_id)
+    collection = routed_collection(document, read_preference)
+    model = projection_model or document
+    projection = get_projection(projection_model) if projection_model else None
+    raw = await collection.find_one({"_id": PydanticObjectId(document_id)}, projection)
+    return model.model_validate(raw) if raw else None
@@ -1,27 +1,419 @@
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
 import redis.asyncio as redis
-from backend.core.config import REDIS_URL, logger
-from backend.models import SubscriptionPlan
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialWithJitterBackoff
+from redis.client import NEVER_DECODE
+from redis.exceptions import (
+    ConnectionError as RedisConnectionError,
+    RedisError,
+    TimeoutError as RedisTimeoutError,
+)
+from backend.core.config import (
+    REDIS_URL,
+    REDIS_CONNECT_TIMEOUT_SECONDS,
+    REDIS_CLUSTER,
+    REDIS_CLUSTER_READ_FROM_REPLICAS,
+    REDIS_LEGACY_KEY_FALLBACK,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT_SECONDS,
+    REDIS_POOL_WARMUP_CONNECTIONS,
+    REDIS_SOCKET_TIMEOUT_SECONDS,
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+    REDIS_RETRIES,
+    REDIS_RETRY_BACKOFF_BASE_SECONDS,
+    REDIS_RETRY_BACKOFF_CAP_SECONDS,
+    REDIS_CALL_TIMEOUT_SECONDS,
+    REDIS_BREAKER_FAILURE_THRESHOLD,
+    REDIS_BREAKER_RESET_SECONDS,
+    REDIS_PENDING_INVALIDATIONS_MAX,
+    logger,
+)
+from backend.core.cache_codec import CacheDecodeError, decode_value, encode_value
+from backend.core import metrics
 
 redis_client = None
+# В режиме кластера pubsub идет через обычный клиент к одному из узлов:
+# PUBLISH в кластере рассылается всем узлам
+_pubsub_client = None
+
+# Ошибки недоступности Redis, которые учитывает circuit breaker. Ошибки
+# команды (ResponseError и др.) означают, что Redis отвечает, и на его
+# состояние не влияют
+REDIS_ERRORS = (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError)
+# Возвращается guarded-вызовом, если Redis недоступен или breaker открыт
+UNAVAILABLE = object()
+
+# Ключи одного пользователя помечены hash tag `{<id>}` и лежат в одном слоте
+# кластера, поэтому над ними работают пайплайны и Lua-скрипты:
+# user_data:<id> -> u:{<id>}:data
+USER_KEY_SUFFIXES = {
+    "user_data": "data",
+    "wallet_data": "wallet",
+    "user_subscription": "subscription",
+    "refresh_token": "refresh_token",
+    "token_version": "token_version",
+    "read_pin": "read_pin",
+}
+_USER_KEY_FAMILIES = {suffix: family for family, suffix in USER_KEY_SUFFIXES.items()}
+_USER_KEY_PATTERN = re.compile(r"^u:\{([^}]*)\}:(.+)$")
+
+
+def key_template(namespace: str) -> str:
+    """Шаблон str.format с полем `{id}` для ключей пространства `namespace`."""
+    suffix = USER_KEY_SUFFIXES.get(namespace)
+    if suffix is None:
+        return f"{namespace}:{{id}}"
+    return f"u:{{{{{{id}}}}}}:{suffix}"
+
+
+def cache_key(namespace: str, key_id: Any) -> str:
+    return key_template(namespace).format(id=key_id)
+
+
+def key_family(key: str) -> str:
+    """Семейство ключа для метрик: `u:{<id>}:data` -> `user_data`."""
+    match = _USER_KEY_PATTERN.match(key)
+    if match:
+        return _USER_KEY_FAMILIES.get(match.group(2), "user")
+    return key.split(":", 1)[0]
+
+
+def legacy_key(key: str) -> Optional[str]:
+    """Старое имя ключа пользователя, пока включен REDIS_LEGACY_KEY_FALLBACK."""
+    if not REDIS_LEGACY_KEY_FALLBACK:
+        return None
+    match = _USER_KEY_PATTERN.match(key)
+    if not match or match.group(2) not in _USER_KEY_FAMILIES:
+        return None
+    return f"{_USER_KEY_FAMILIES[match.group(2)]}:{match.group(1)}"
+
+
+def with_legacy_keys(keys: Iterable[str]) -> List[str]:
+    result = []
+    for key in keys:
+        result.append(key)
+        legacy = legacy_key(key)
+        if legacy:
+            result.append(legacy)
+    return result
+
+
+# Тег кэша -> шаблоны ключей, которые он покрывает. Пространства, закэшированные
+# через декоратор `cached(tags=...)`, добавляются сюда при импорте сервисов
+CACHE_TAGS = {
+    "user": (key_template("refresh_token"),),
+}
+
+
+def register_cache_tag(tag: str, template: str) -> None:
+    templates = CACHE_TAGS.get(tag, ())
+    if template not in templates:
+        CACHE_TAGS[tag] = templates + (template,)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker для операций кэша: после `failure_threshold` ошибок подряд
+    операции перестают отправляться в Redis на `reset_timeout` секунд, затем
+    один пробный вызов (half-open) либо закрывает breaker, либо снова открывает.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self.on_close: List[Callable[[], None]] = []
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Пробный вызов; следующая проба - не раньше чем через reset_timeout
+            self.state = "half_open"
+            self.opened_at = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.state != "closed":
+            self.state = "closed"
+            logger.info("Redis снова доступен, circuit breaker закрыт")
+            for callback in self.on_close:
+                callback()
+
+    def record_failure(self, error: BaseException) -> None:
+        self.failures += 1
+        if self.state == "half_open" or (
+            self.state == "closed" and self.failures >= self.failure_threshold
+        ):
+            if self.state == "closed":
+                self.times_opened += 1
+                logger.error(
+                    f"Redis недоступен ({error!r}), circuit breaker открыт: "
+                    f"кэш отключен на {self.reset_timeout} с"
+                )
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "pending_invalidations": len(_pending_invalidations),
+        }
+
+
+redis_breaker = CircuitBreaker(
+    REDIS_BREAKER_FAILURE_THRESHOLD, REDIS_BREAKER_RESET_SECONDS
+)
+# Ключи, которые не удалось инвалидировать, пока Redis был недоступен
+_pending_invalidations: Set[str] = set()
+_replay_tasks: Set[asyncio.Task] = set()
+
+
+metrics.describe(
+    "redis_commands_total",
+    "counter",
+    "Операции Redis по семействам ключей: ok, error или rejected (breaker открыт)",
+)
+metrics.describe(
+    "redis_command_duration_seconds",
+    "histogram",
+    "Время операций Redis по семействам ключей",
+)
+metrics.describe(
+    "redis_pool_connections", "gauge", "Соединения пула Redis: in_use и idle"
+)
+metrics.describe(
+    "redis_breaker_open", "gauge", "1, если circuit breaker Redis не закрыт"
+)
+metrics.describe(
+    "redis_breaker_opened_total", "counter", "Сколько раз открывался circuit breaker"
+)
+metrics.describe(
+    "redis_pending_invalidations",
+    "gauge",
+    "Ключи, ожидающие удаления после восстановления Redis",
+)
+
+
+async def call_redis(
+    operation: Callable[[], Awaitable[Any]], family: str = "other"
+) -> Any:
+    """
+    Выполняет операцию кэша с таймаутом через circuit breaker.
+    Возвращает UNAVAILABLE вместо исключения, если Redis недоступен.
+    `family` - семейство ключей для метрик (обычно префикс ключа).
+    """
+    if redis_client is None or not redis_breaker.allow():
+        metrics.inc("redis_commands_total", family=family, result="rejected")
+        return UNAVAILABLE
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(operation(), REDIS_CALL_TIMEOUT_SECONDS)
+    except REDIS_ERRORS as e:
+        redis_breaker.record_failure(e)
+        metrics.inc("redis_commands_total", family=family, result="error")
+        logger.warning(f"Ошибка операции Redis: {e!r}")
+        return UNAVAILABLE
+    except RedisError as e:
+        metrics.inc("redis_commands_total", family=family, result="error")
+        logger.error(f"Ошибка команды Redis: {e!r}")
+        return UNAVAILABLE
+    metrics.observe(
+        "redis_command_duration_seconds", time.perf_counter() - started, family=family
+    )
+    metrics.inc("redis_commands_total", family=family, result="ok")
+    redis_breaker.record_success()
+    return result
+
+
+def _pool_samples():
+    breaker = get_redis_breaker_stats()
+    samples = [
+        ("redis_breaker_open", {}, 0 if breaker["state"] == "closed" else 1),
+        ("redis_breaker_opened_total", {}, breaker["times_opened"]),
+        ("redis_pending_invalidations", {}, breaker["pending_invalidations"]),
+    ]
+    # У RedisCluster нет общего пула: пулы живут в узлах кластера
+    pool = getattr(redis_client, "connection_pool", None)
+    if pool is None:
+        return samples
+    return samples + [
+        (
+            "redis_pool_connections",
+            {"state": "in_use"},
+            len(getattr(pool, "_in_use_connections", ())),
+        ),
+        (
+            "redis_pool_connections",
+            {"state": "idle"},
+            len(getattr(pool, "_available_connections", ())),
+        ),
+    ]
+
+
+metrics.register_collector(_pool_samples)
+
+
+def get_redis_breaker_stats() -> Dict[str, Any]:
+    return redis_breaker.stats()
+
+
+def create_connection_pool(**overrides) -> redis.BlockingConnectionPool:
+    """
+    Ограниченный пул соединений Redis. Обрывы соединения и таймауты
+    повторяются с экспоненциальной задержкой, соединение, простоявшее
+    дольше `health_check_interval`, проверяется PING перед командой.
+    """
+    options = dict(
+        decode_responses=True,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT_SECONDS,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT_SECONDS,
+        socket_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_keepalive=True,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+        retry=Retry(
+            ExponentialWithJitterBackoff(
+                cap=REDIS_RETRY_BACKOFF_CAP_SECONDS,
+                base=REDIS_RETRY_BACKOFF_BASE_SECONDS,
+            ),
+            REDIS_RETRIES,
+        ),
+        retry_on_error=[RedisConnectionError, RedisTimeoutError],
+    )
+    options.update(overrides)
+    return redis.BlockingConnectionPool.from_url(REDIS_URL, **options)
+
+
+async def warmup_connection_pool(client: redis.Redis, connections: int) -> int:
+    """Заранее открывает `connections` соединений, чтобы первые запросы не ждали TCP."""
+    pool = client.connection_pool
+    connections = min(connections, pool.max_connections)
+    if connections <= 0:
+        return 0
+    acquired = await asyncio.gather(
+        *(pool.get_connection() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    opened = 0
+    for connection in acquired:
+        if isinstance(connection, BaseException):
+            logger.warning(f"Не удалось открыть соединение с Redis: {connection!r}")
+            continue
+        opened += 1
+        await pool.release(connection)
+    return opened
+
+
+def create_cluster_client() -> redis.RedisCluster:
+    """
+    Клиент Redis Cluster с теми же таймаутами и повторами, что и у пула.
+    `max_connections` действует на каждый узел.
+    """
+    return redis.RedisCluster.from_url(
+        REDIS_URL,
+        decode_responses=True,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT_SECONDS,
+        socket_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_keepalive=True,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+        retry=Retry(
+            ExponentialWithJitterBackoff(
+                cap=REDIS_RETRY_BACKOFF_CAP_SECONDS,
+                base=REDIS_RETRY_BACKOFF_BASE_SECONDS,
+            ),
+            REDIS_RETRIES,
+        ),
+        retry_on_error=[RedisConnectionError, RedisTimeoutError],
+        read_from_replicas=REDIS_CLUSTER_READ_FROM_REPLICAS,
+    )
+
+
+def is_cluster() -> bool:
+    return isinstance(redis_client, redis.RedisCluster)
 
 
 async def init_redis():
     global redis_client
     try:
-        redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+        if REDIS_CLUSTER:
+            redis_client = create_cluster_client()
+            await redis_client.initialize()
+            await redis_client.ping()
+            logger.info(
+                f"Успешное подключение к Redis Cluster "
+                f"({len(redis_client.get_nodes())} узлов)"
+            )
+            return
+
+        redis_client = redis.Redis(connection_pool=create_connection_pool())
         await redis_client.ping()
-        logger.info("Успешное подключение к Redis")
+        opened = await warmup_connection_pool(
+            redis_client, REDIS_POOL_WARMUP_CONNECTIONS
+        )
+        logger.info(
+            f"Успешное подключение к Redis (пул до {REDIS_MAX_CONNECTIONS} "
+            f"соединений, открыто заранее: {opened})"
+        )
     except Exception as e:
         logger.error(f"Ошибка подключения к Redis: {e}")
         raise
 
 
 async def close_redis():
+    global _pubsub_client
+    if _pubsub_client is not None:
+        await _pubsub_client.aclose()
+        _pubsub_client = None
     if redis_client:
-        await redis_client.close()
+        await redis_client.aclose()
+        if not is_cluster():
+            await redis_client.connection_pool.disconnect()
         logger.info("Соединение с Redis закрыто")
 
 
+def get_pubsub_client() -> redis.Redis:
+    """Клиент для SUBSCRIBE: в кластере - обычный клиент к одному из узлов."""
+    global _pubsub_client
+    client = get_redis_client()
+    if not is_cluster():
+        return client
+    if _pubsub_client is None:
+        node = client.get_default_node()
+        _pubsub_client = redis.Redis(
+            host=node.host,
+            port=node.port,
+            decode_responses=True,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT_SECONDS,
+            socket_keepalive=True,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+        )
+    return _pubsub_client
+
+
+async def read_key(key: str) -> Optional[str]:
+    """GET, в период миграции имен ключей - со старым именем при промахе."""
+    value = await redis_client.get(key)
+    legacy = legacy_key(key)
+    if value is None and legacy:
+        value = await redis_client.get(legacy)
+    return value
+
+
 def get_redis_client():
     if not redis_client:
         logger.error("Клиент Redis не инициализирован. Вызовите init_redis.")
@@ -29,23 +421,98 @@ def get_redis_client():
     return redis_client
 
 
-async def load_subscription_plans(redis_client_plan):
-    if await redis_client_plan.get("subscription_plans_loaded"):
-        return
+async def cache_get(key: str) -> Optional[Any]:
+    """
+    Читает значение кэша в байтах (в обход decode_responses) и декодирует его.
+    Нечитаемое значение и недоступный Redis считаются промахом.
+    """
+    raw = await call_redis(
+        lambda: redis_client.execute_command("GET", key, **{NEVER_DECODE: True}),
+        family=key_family(key),
+    )
+    if raw is UNAVAILABLE:
+        return None
+    return decode_cached(key, raw)
 
-    plans = await SubscriptionPlan.find_all().to_list()
 
-    if not plans:
-        return
+def decode_cached(key: str, raw: Optional[bytes]) -> Optional[Any]:
+    if raw is None:
+        return None
+    try:
+        return decode_value(raw)
+    except CacheDecodeError as e:
+        logger.warning(f"Значение ключа {key} не удалось декодировать: {e}")
+        return None
 
-    for plan in plans:
-        plan_name = str(plan.name)
-        await redis_client_plan.set(f"plan:{plan_name}", plan.model_dump_json())
 
-    await redis_client_plan.set("subscription_plans_loaded", "true")
+async def cache_set(key: str, value: Any, ex: Optional[int] = None) -> None:
+    # Пока Redis недоступен, запись в кэш просто пропускается
+    data = encode_value(value)
+    await call_redis(lambda: redis_client.set(key, data, ex=ex), family=key_family(key))
 
 
-async def delete_redis_cache(redis_key):
-    if redis_client:
-        if await redis_client.exists(redis_key):
-            await redis_client.delete(redis_key)
+def cache_keys_for_tag(tag: str) -> List[str]:
+    namespace, _, tag_id = tag.partition(":")
+    templates = CACHE_TAGS.get(namespace)
+    if not templates or not tag_id:
+        raise ValueError(f"Неизвестный тег кэша: {tag}")
+    return [template.format(id=tag_id) for template in templates]
+
+
+async def invalidate_cache(*keys: str, tags: Iterable[str] = ()) -> int:
+    """
+    Удаляет ключи и все ключи, покрытые тегами (например `user:{id}`),
+    одной командой UNLINK. Возвращает количество удаленных ключей.
+    Если Redis недоступен, ключи запоминаются и удаляются после восстановления,
+    чтобы не отдавать данные, устаревшие за время инцидента.
+    """
+    all_keys = list(keys)
+    for tag in tags:
+        all_keys.extend(cache_keys_for_tag(tag))
+    if not redis_client or not all_keys:
+        return 0
+    all_keys = list(dict.fromkeys(with_legacy_keys(all_keys)))
+    deleted = await call_redis(
+        lambda: redis_client.unlink(*all_keys), family="invalidation"
+    )
+    if deleted is UNAVAILABLE:
+        _remember_invalidations(all_keys)
+        return 0
+    return deleted
+
+
+def _remember_invalidations(keys: List[str]) -> None:
+    for key in keys:
+        if len(_pending_invalidations) >= REDIS_PENDING_INVALIDATIONS_MAX:
+            logger.error(
+                "Переполнен буфер отложенных инвалидаций кэша, "
+                "часть ключей может остаться устаревшей до истечения TTL"
+            )
+            return
+        _pending_invalidations.add(key)
+
+
+async def _replay_invalidations() -> None:
+    while _pending_invalidations:
+        batch = [
+            _pending_invalidations.pop()
+            for _ in range(min(500, len(_pending_invalidations)))
+        ]
+        deleted = await call_redis(
+            lambda: redis_client.unlink(*batch), family="invalidation"
+        )
+        if deleted is UNAVAILABLE:
+            _pending_invalidations.update(batch)
+            return
+    logger.info("Отложенные инвалидации кэша применены")
+
+
+def _schedule_replay() -> None:
+    if not _pending_invalidations:
+        return
+    task = asyncio.create_task(_replay_invalidations())
+    _replay_tasks.add(task)
+    task.add_done_callback(_replay_tasks.discard)
+
+
+redis_breaker.on_close.append(_schedule_replay)
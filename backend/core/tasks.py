@@ -9,6 +9,10 @@ from backend.models.subscription import SubscriptionPlan, SubscriptionHistory
 from backend.models.embedded.subscription import CurrentSubscriptionEmbedded
 
 from backend.core.database import get_motor_client
+from backend.core.principal_cache import invalidate_principal
+from backend.core.read_routing import pin_primary_reads
+from backend.core.redis_client import cache_key, invalidate_cache
+from backend.core.plan_catalog import get_plan_catalog, notify_plans_changed
 
 scheduler: AsyncIOScheduler = None
 
@@ -84,6 +88,8 @@ async def initSubscriptionPlans():
                 )
                 await session.commit_transaction()
 
+        await notify_plans_changed()
+
     except Exception as e:
         if "session" in locals() and session.in_transaction:
             await session.abort_transaction()
@@ -117,9 +123,7 @@ async def checkAndUpdateSubscriptions():
                     f"Найдено {len(users_to_update)} пользователей для обновления"
                 )
 
-                basic_plan = await SubscriptionPlan.find_one(
-                    SubscriptionPlan.price == 0, session=session
-                )
+                basic_plan = get_plan_catalog().free_plan
                 if not basic_plan:
                     raise Exception("Базовый тарифный план не найден")
 
@@ -151,6 +155,21 @@ async def checkAndUpdateSubscriptions():
                     logger.info(f"Пользователь {user.id} переведен на базовый тариф")
 
                 await session.commit_transaction()
+                await pin_primary_reads(*[user.id for user in users_to_update])
+                for user in users_to_update:
+                    await invalidate_principal(user.id)
+                try:
+                    await invalidate_cache(
+                        *[
+                            cache_key("user_subscription", user.id)
+                            for user in users_to_update
+                        ],
+                        *[cache_key("user_data", user.id) for user in users_to_update],
+                    )
+                except Exception as cache_err:
+                    logger.warning(
+                        f"Не удалось очистить кэш после проверки подписок: {cache_err}"
+                    )
                 logger.info("Проверка подписок завершена успешно")
 
             except Exception as error:
@@ -0,0 +1,100 @@
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+from beanie import PydanticObjectId
+
+from backend.core.config import logger
+from backend.core import metrics
+from backend.models.user_trigram import (
+    UserTrigram,
+    normalize_search_value,
+    search_trigrams,
+)
+
+# Поиск пользователей в админке. Все режимы работают по нормализованным
+# полям usernameLower/emailLower (заполняются при записи пользователя):
+#   prefix   - якорный ^-regex, диапазон по индексам usernameLower_1/emailLower_1;
+#   contains - подстрока, как раньше: проход по всему индексу, медленно на
+#              больших коллекциях;
+#   fuzzy    - поиск с опечатками по коллекции usertrigrams.
+
+# Доля триграмм запроса, которая должна совпасть у кандидата
+FUZZY_MIN_SIMILARITY = 0.5
+# Сколько лучших кандидатов возвращает поиск с опечатками
+FUZZY_MAX_CANDIDATES = 500
+
+metrics.describe(
+    "user_search_total",
+    "counter",
+    "Поиски пользователей в админке по режимам",
+)
+
+
+def search_query(search: str, mode: str = "prefix") -> Dict[str, Any]:
+    """Фильтр users для режимов prefix и contains."""
+    term = re.escape(normalize_search_value(search) or "")
+    if mode == "prefix":
+        term = f"^{term}"
+    return {
+        "$or": [
+            {"emailLower": {"$regex": term}},
+            {"usernameLower": {"$regex": term}},
+        ]
+    }
+
+
+async def fuzzy_user_ids(search: str) -> List[PydanticObjectId]:
+    """
+    Id пользователей, похожих на `search`, от более похожих к менее похожим
+    (не больше FUZZY_MAX_CANDIDATES).
+    """
+    grams = search_trigrams(search)
+    if not grams:
+        return []
+    min_hits = max(1, math.ceil(len(grams) * FUZZY_MIN_SIMILARITY))
+    pipeline = [
+        {"$match": {"trigram": {"$in": sorted(grams)}}},
+        {"$group": {"_id": "$userId", "hits": {"$sum": 1}}},
+        {"$match": {"hits": {"$gte": min_hits}}},
+        {"$sort": {"hits": -1, "_id": 1}},
+        {"$limit": FUZZY_MAX_CANDIDATES},
+    ]
+    candidates = (
+        await UserTrigram.get_motor_collection()
+        .aggregate(pipeline)
+        .to_list(length=FUZZY_MAX_CANDIDATES)
+    )
+    return [candidate["_id"] for candidate in candidates]
+
+
+async def index_user_trigrams(
+    user_id: Any, username: Optional[str], email: Optional[str]
+) -> None:
+    """
+    Перестраивает триграммы пользователя после записи username/email.
+    Не бросает исключений: устаревшие триграммы влияют только на поиск с
+    опечатками и исправляются `python -m backend.tools.build_user_search`.
+    """
+    user_id = PydanticObjectId(user_id)
+    try:
+        collection = UserTrigram.get_motor_collection()
+        await collection.delete_many({"userId": user_id})
+        grams = search_trigrams(username, email)
+        if grams:
+            await collection.insert_many(
+                [{"userId": user_id, "trigram": gram} for gram in grams],
+                ordered=False,
+            )
+    except Exception as e:
+        logger.warning(f"Не удалось обновить триграммы пользователя {user_id}: {e}")
+
+
+async def remove_user_trigrams(user_id: Any) -> None:
+    """Удаляет триграммы удаленного пользователя. Не бросает исключений."""
+    try:
+        await UserTrigram.get_motor_collection().delete_many(
+            {"userId": PydanticObjectId(user_id)}
+        )
+    except Exception as e:
+        logger.warning(f"Не удалось удалить триграммы пользователя {user_id}: {e}")
@@ -1,16 +1,33 @@
 from __future__ import annotations
-from backend.core.config import logger, PORT, PUBLIC_DIR
+import time
+from backend.core.config import (
+    logger,
+    PORT,
+    PUBLIC_DIR,
+    BCRYPT_AUTO_CALIBRATE,
+    CACHE_BYPASS_ENABLED,
+    METRICS_ENABLED,
+)
 from backend.core.database import init_db
-from backend.core.redis_client import (
-    init_redis,
-    close_redis,
-    get_redis_client,
-    load_subscription_plans,
+from backend.core.redis_client import init_redis, close_redis
+from backend.core.principal_cache import init_principal_cache, close_principal_cache
+from backend.core.local_cache import init_local_cache, close_local_cache
+from backend.core.plan_catalog import init_plan_catalog, close_plan_catalog
+from backend.core.metrics_exporter import (
+    init_metrics_exporter,
+    close_metrics_exporter,
+    observe_request,
+)
+from backend.core.password_hasher import (
+    init_password_hasher,
+    calibrate_bcrypt_rounds,
+    shutdown_password_hasher,
 )
+from backend.core.cache import cache_bypass, CACHE_BYPASS_HEADER
 from backend.core.tasks import init_scheduler
 from contextlib import asynccontextmanager
 from typing import AsyncContextManager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from beanie import PydanticObjectId
@@ -53,6 +70,7 @@ from backend.routers.subscription_router import router as subscription_router
 from backend.routers.admin_auth_router import router as admin_auth_router
 from backend.routers.admin_user_router import router as admin_user_router
 from backend.routers.admin_plan_router import router as admin_plan_router
+from backend.routers.metrics_router import router as metrics_router
 
 
 @asynccontextmanager
@@ -63,10 +81,22 @@ async def lifespan(app: FastAPI) -> AsyncContextManager[None]:
         logger.info("Database initialized successfully.")
         await init_redis()
         logger.info("Redis client initialized successfully.")
-        await load_subscription_plans(get_redis_client())
-        logger.info("Subscription plans loaded into Redis.")
+        await init_principal_cache()
+        logger.info("Principal cache initialized successfully.")
+        await init_local_cache()
+        logger.info("Local cache initialized successfully.")
+        await init_plan_catalog()
+        logger.info("Plan catalog initialized successfully.")
+        init_password_hasher()
+        logger.info("Password hasher pool initialized successfully.")
+        if BCRYPT_AUTO_CALIBRATE:
+            await calibrate_bcrypt_rounds()
+            logger.info("Bcrypt cost calibrated successfully.")
         await init_scheduler()
         logger.info("Scheduler initialized successfully.")
+        if METRICS_ENABLED:
+            await init_metrics_exporter()
+            logger.info("Metrics exporter initialized successfully.")
     except Exception as e:
         logger.critical(f"Failed to initialize application: {e}", exc_info=True)
         raise
@@ -74,6 +104,12 @@ async def lifespan(app: FastAPI) -> AsyncContextManager[None]:
     yield
 
     logger.info("Shutting down application...")
+    if METRICS_ENABLED:
+        await close_metrics_exporter()
+    await close_plan_catalog()
+    await close_principal_cache()
+    await close_local_cache()
+    shutdown_password_hasher()
     await close_redis()
     logger.info("Redis client connection closed.")
 
@@ -91,6 +127,39 @@ app.add_middleware(
 app.json_encoders = {PydanticObjectId: str}
 
 
+if CACHE_BYPASS_ENABLED:
+
+    @app.middleware("http")
+    async def cache_bypass_middleware(request: Request, call_next):
+        token = cache_bypass.set(request.headers.get(CACHE_BYPASS_HEADER) == "1")
+        try:
+            return await call_next(request)
+        finally:
+            cache_bypass.reset(token)
+
+
+if METRICS_ENABLED:
+
+    @app.middleware("http")
+    async def request_metrics_middleware(request: Request, call_next):
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            # Шаблон маршрута (/api/plans/{planId}), а не фактический путь,
+            # чтобы число серий не зависело от id в URL
+            route = request.scope.get("route")
+            observe_request(
+                request.method,
+                getattr(route, "path", "unmatched"),
+                status_code,
+                time.perf_counter() - started,
+            )
+
+
 SubscriptionPlanResponse.model_rebuild()
 SubscriptionHistoryEmbedded.model_rebuild()
 CurrentSubscriptionEmbedded.model_rebuild()
@@ -110,6 +179,8 @@ app.include_router(subscription_router)
 app.include_router(admin_auth_router)
 app.include_router(admin_user_router)
 app.include_router(admin_plan_router)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
 @app.get("/")
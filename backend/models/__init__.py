@@ -3,6 +3,7 @@ from .admin import AdminAction
 from .subscription import SubscriptionPlan, SubscriptionHistory
 from .transaction import Transaction
 from .user import User
+from .user_trigram import UserTrigram
 
 
 __all__ = [
@@ -11,4 +12,5 @@ __all__ = [
     "SubscriptionHistory",
     "Transaction",
     "User",
+    "UserTrigram",
 ]
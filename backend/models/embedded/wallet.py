@@ -7,11 +7,14 @@ from beanie import PydanticObjectId
 
 class WalletEmbedded(BaseModel):
     balance: float = Field(default=0.0, ge=0)
+    # Устарело: транзакции читаются из коллекции transactions по userId, новые
+    # id сюда не добавляются. Массив удаляется миграцией
+    # backend.tools.migrate_wallet_ledger --drop-array
     transactionIds: List[PydanticObjectId] = []
     model_config = ConfigDict(
-        arbitrary_types_allowed=True, 
+        arbitrary_types_allowed=True,
         json_encoders={
             datetime: lambda v: v.isoformat() if v else None,
-            PydanticObjectId: str
-        }
-    )
\ No newline at end of file
+            PydanticObjectId: str,
+        },
+    )
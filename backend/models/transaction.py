@@ -34,10 +34,11 @@ class Transaction(Document):
     class Settings:
         name = "transactions"
         indexes = [
-            IndexModel([("userId", 1)], name="userId_1", background=True),
+            # Покрывает и выборки по одному userId; прежние userId_1 и
+            # userId_1_createdAt_-1 удаляет backend.tools.migrate_wallet_ledger
             IndexModel(
-                [("userId", 1), ("createdAt", -1)],
-                name="userId_1_createdAt_-1",
+                [("userId", 1), ("createdAt", -1), ("_id", -1)],
+                name="userId_1_createdAt_-1__id_-1",
                 background=True,
             ),
             IndexModel(
@@ -2,13 +2,14 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import List, Optional
 from pydantic import Field, ConfigDict
-from beanie import Document, PydanticObjectId
+from beanie import Document, PydanticObjectId, Insert, Replace, Save, before_event
 from pymongo import IndexModel
 
 from backend.models.embedded.notification import NotificationsEmbedded
 from backend.models.embedded.wallet import WalletEmbedded
 from backend.models.embedded.subscription import CurrentSubscriptionEmbedded
 from backend.models.embedded.token import RefreshTokenEmbedded
+from backend.models.user_trigram import normalize_search_value
 
 
 class User(Document):
@@ -25,6 +26,10 @@ class User(Document):
         default="user", description="User role", examples=["user", "admin"]
     )
     refreshTokens: List[RefreshTokenEmbedded] = Field(default_factory=list)
+    tokenVersion: int = 0
+    # Нормализованные копии для поиска по префиксу (индексы ниже)
+    usernameLower: Optional[str] = None
+    emailLower: Optional[str] = None
     createdAt: Optional[datetime] = None
     updatedAt: Optional[datetime] = None
 
@@ -47,6 +52,13 @@ class User(Document):
                 name="refreshTokens_token_1",
                 background=True,
             ),
+            IndexModel([("usernameLower", 1)], name="usernameLower_1", background=True),
+            IndexModel([("emailLower", 1)], name="emailLower_1", background=True),
+            IndexModel(
+                [("createdAt", -1), ("_id", -1)],
+                name="createdAt_-1__id_-1",
+                background=True,
+            ),
         ]
         use_state_management = True
 
@@ -57,3 +69,8 @@ class User(Document):
             if self.createdAt is None:
                 self.createdAt = datetime.now(timezone.utc)
         self.updatedAt = datetime.now(timezone.utc)
+
+    @before_event(Insert, Replace, Save)
+    def normalize_search_fields(self):
+        self.usernameLower = normalize_search_value(self.username)
+        self.emailLower = normalize_search_value(self.email)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Optional, Set
+from beanie import Document, PydanticObjectId
+from pymongo import IndexModel
+
+
+def normalize_search_value(value: Optional[str]) -> Optional[str]:
+    """Значение для поиска без учета регистра: usernameLower, emailLower."""
+    if value is None:
+        return None
+    return value.strip().casefold()
+
+
+def search_trigrams(*values: Optional[str]) -> Set[str]:
+    """
+    Триграммы нормализованных значений, как в pg_trgm: слово дополняется двумя
+    пробелами слева и одним справа. У email берется только часть до @ -
+    триграммы домена есть почти у всех пользователей и ничего не отбирают.
+    """
+    grams = set()
+    for value in values:
+        value = normalize_search_value(value)
+        if not value:
+            continue
+        padded = f"  {value.split('@', 1)[0]} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class UserTrigram(Document):
+    """Триграмма username/email пользователя для поиска с опечатками."""
+
+    userId: PydanticObjectId
+    trigram: str
+
+    class Settings:
+        name = "usertrigrams"
+        indexes = [
+            IndexModel(
+                [("trigram", 1), ("userId", 1)],
+                name="trigram_1_userId_1",
+                unique=True,
+                background=True,
+            ),
+            IndexModel([("userId", 1)], name="userId_1", background=True),
+        ]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from beanie import PydanticObjectId
+
+# Облегченные проекции документа пользователя для горячих путей чтения.
+# Читают из MongoDB только нужные поля (без пароля, refreshTokens и
+# устаревшего массива wallet.transactionIds) и, в отличие от User, не хранят
+# копию состояния для state management. Только для чтения - сохранять их нельзя.
+
+# Сколько последних транзакций показывается в кошельке и данных пользователя
+WALLET_TRANSACTIONS_LIMIT = 50
+
+
+class _View(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
+
+
+class SubscriptionStateView(_View):
+    planId: Optional[PydanticObjectId] = None
+    startDate: Optional[datetime] = None
+    endDate: Optional[datetime] = None
+    isActive: bool = True
+    autoRenew: bool = True
+
+
+class WalletBalanceView(_View):
+    balance: float = 0.0
+
+
+class UserTokenVersionView(_View):
+    id: PydanticObjectId = Field(alias="_id")
+    tokenVersion: int = 0
+
+    class Settings:
+        projection = {"_id": 1, "tokenVersion": 1}
+
+
+class UserPrincipalView(_View):
+    """Поля для TokenPrincipal при проверке токена через MongoDB."""
+
+    id: PydanticObjectId = Field(alias="_id")
+    role: str = "user"
+    tokenVersion: int = 0
+
+    class Settings:
+        projection = {"_id": 1, "role": 1, "tokenVersion": 1}
+
+
+class UserAccountView(_View):
+    """
+    Пользователь для get_current_user и principal_cache: поля, которые читают
+    обработчики. Изменения пишутся точечным $set по id, а не через save().
+    """
+
+    id: PydanticObjectId = Field(alias="_id")
+    username: str
+    email: str
+    password: str
+    avatar: str = "/defaults/default-avatar.png"
+    role: str = "user"
+    currentSubscription: Optional[SubscriptionStateView] = None
+    tokenVersion: int = 0
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "username": 1,
+            "email": 1,
+            "password": 1,
+            "avatar": 1,
+            "role": 1,
+            "tokenVersion": 1,
+            "currentSubscription.planId": 1,
+            "currentSubscription.startDate": 1,
+            "currentSubscription.endDate": 1,
+            "currentSubscription.isActive": 1,
+            "currentSubscription.autoRenew": 1,
+        }
+
+
+class UserWalletView(_View):
+    id: PydanticObjectId = Field(alias="_id")
+    wallet: WalletBalanceView = Field(default_factory=WalletBalanceView)
+
+    class Settings:
+        projection = {"_id": 1, "wallet.balance": 1}
+
+
+class UserSubscriptionView(_View):
+    id: PydanticObjectId = Field(alias="_id")
+    currentSubscription: Optional[SubscriptionStateView] = None
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "currentSubscription.planId": 1,
+            "currentSubscription.startDate": 1,
+            "currentSubscription.endDate": 1,
+            "currentSubscription.isActive": 1,
+            "currentSubscription.autoRenew": 1,
+        }
+
+
+class UserProfileView(_View):
+    id: PydanticObjectId = Field(alias="_id")
+    username: str
+    email: str
+    avatar: str = "/defaults/default-avatar.png"
+    createdAt: Optional[datetime] = None
+    wallet: WalletBalanceView = Field(default_factory=WalletBalanceView)
+    currentSubscription: Optional[SubscriptionStateView] = None
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "username": 1,
+            "email": 1,
+            "avatar": 1,
+            "createdAt": 1,
+            **UserWalletView.Settings.projection,
+            **UserSubscriptionView.Settings.projection,
+        }
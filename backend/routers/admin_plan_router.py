@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Request
 from beanie import PydanticObjectId
-from backend.models.user import User
+from backend.models.user_views import UserAccountView
 from backend.schemas.admin import AdminChangePlanRequest
 from backend.services.admin_plan_service import AdminPlanService
 from backend.core.dependencies import get_admin_user
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/api/admin", tags=["Admin_Plans"])
 async def create_plan_route(
     request_data: AdminChangePlanRequest,
     request: Request,
-    admin_user: User = Depends(get_admin_user),
+    admin_user: UserAccountView = Depends(get_admin_user),
 ):
     """
     **Эндпоинт для создания нового тарифного плана.**
@@ -33,7 +33,7 @@ async def change_plan_route(
     planId: PydanticObjectId,
     request_data: AdminChangePlanRequest,
     request: Request,
-    admin_user: User = Depends(get_admin_user),
+    admin_user: UserAccountView = Depends(get_admin_user),
 ):
     """
     **Эндпоинт для изменения существующего тарифного плана.**
@@ -56,7 +56,7 @@ async def change_plan_route(
 async def delete_plan_route(
     planId: PydanticObjectId,
     request: Request,
-    admin_user: User = Depends(get_admin_user),
+    admin_user: UserAccountView = Depends(get_admin_user),
 ):
     """
     **Эндпоинт для удаления тарифного плана.**
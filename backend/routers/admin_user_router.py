@@ -1,45 +1,101 @@
+from typing import Literal, Optional
 from fastapi import APIRouter, Depends, Request, Query
+from fastapi.responses import StreamingResponse
 from beanie import PydanticObjectId
 
-from backend.models.user import User
+from backend.models.user_views import UserAccountView
 from backend.schemas.admin import AdminChangeUserRequest
-from backend.services.admin_user_service import AdminUserService
+from backend.services.admin_user_service import (
+    AdminUserService,
+    ADMIN_USERS_PAGE_MAX_LIMIT,
+)
 from backend.core.dependencies import get_admin_user
 
 
 router = APIRouter(prefix="/api/admin", tags=["Admin_Users"])
 
 
-@router.get(
-    "/users",
-    dependencies=[Depends(get_admin_user)],
-    summary="Получить список пользователей",
-)
+@router.get("/users", summary="Получить список пользователей")
 async def get_users_route(
-    page: int = Query(1, ge=1, description="Номер страницы"),
+    page: int = Query(1, ge=1, description="Номер страницы (для mode=fuzzy)"),
     limit: int = Query(
-        25, ge=0, description="Количество пользователей на странице (0 для всех)"
+        25,
+        ge=1,
+        le=ADMIN_USERS_PAGE_MAX_LIMIT,
+        description="Количество пользователей на странице",
+    ),
+    before: Optional[str] = Query(
+        None, description="Курсор nextCursor предыдущей страницы"
     ),
     search: str = Query("", alias="search", description="Поиск по email или username"),
+    mode: Literal["prefix", "contains", "fuzzy"] = Query(
+        "contains",
+        description="Режим поиска: по подстроке, по началу строки или с опечатками",
+    ),
+    admin_user: UserAccountView = Depends(get_admin_user),
 ):
     """
     **Эндпоинт для получения списка пользователей.**
 
-    Принимает номер страницы и количество пользователей на странице.
-    Возвращает список пользователей с их данными.
+    Принимает курсор и количество пользователей на странице.
+    Возвращает список пользователей с их данными от новых к старым.
+    Для выгрузки всех пользователей без сборки ответа в памяти -
+    `GET /api/admin/users/export`.
 
     **Параметры:**
 
-    - `page`: Номер страницы (по умолчанию 1).
-    - `limit`: Количество пользователей на странице (по умолчанию 25, 0 для всех).
+    - `page`: Номер страницы для `mode=fuzzy` (по умолчанию 1).
+    - `limit`: Количество пользователей на странице (по умолчанию 25, от 1 до 100).
+    - `before`: Курсор `nextCursor` предыдущей страницы.
     - `search`: Поиск по email или username (по умолчанию пустая строка).
+    - `mode`: Режим поиска: `contains` (по умолчанию, как раньше), `prefix`
+      (быстрый, по индексу) или `fuzzy`.
 
     **Возвращает:**
 
     - `users`: Список пользователей с их данными.
+    - `total`: Количество пользователей (не считается на страницах с курсором).
+    - `nextCursor`: Курсор следующей страницы.
 
     """
-    return await AdminUserService.get_admin_users(page=page, limit=limit, search=search)
+    return await AdminUserService.get_admin_users(
+        page=page,
+        limit=limit,
+        search=search,
+        admin_id=admin_user.id,
+        mode=mode,
+        before=before,
+    )
+
+
+@router.get("/users/export", summary="Выгрузить список пользователей")
+async def export_users_route(
+    search: str = Query("", alias="search", description="Поиск по email или username"),
+    mode: Literal["prefix", "contains", "fuzzy"] = Query(
+        "contains",
+        description="Режим поиска: по подстроке, по началу строки или с опечатками",
+    ),
+    admin_user: UserAccountView = Depends(get_admin_user),
+):
+    """
+    **Эндпоинт для выгрузки всех пользователей.**
+
+    Отдает пользователей списка от новых к старым потоком в формате NDJSON
+    (`application/x-ndjson`, один пользователь в строке, поля как в
+    `GET /api/admin/users`).
+
+    **Параметры:**
+
+    - `search`: Поиск по email или username (по умолчанию пустая строка).
+    - `mode`: Режим поиска, как в `GET /api/admin/users`.
+
+    """
+    return StreamingResponse(
+        AdminUserService.export_admin_users(
+            search=search, admin_id=admin_user.id, mode=mode
+        ),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.put("/user/change/{userId}", summary="Изменить данные пользователя")
@@ -47,7 +103,7 @@ async def change_user_route(
     userId: PydanticObjectId,
     request_data: AdminChangeUserRequest,
     request: Request,
-    admin_user: User = Depends(get_admin_user),
+    admin_user: UserAccountView = Depends(get_admin_user),
 ):
     """
     **Эндпоинт для изменения данных пользователя.**
@@ -70,7 +126,7 @@ async def change_user_route(
 async def delete_user_route(
     userId: PydanticObjectId,
     request: Request,
-    admin_user: User = Depends(get_admin_user),
+    admin_user: UserAccountView = Depends(get_admin_user),
 ):
     """
     **Эндпоинт для удаления пользователя.**
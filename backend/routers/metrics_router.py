@@ -0,0 +1,35 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from backend.core.config import METRICS_TOKEN
+from backend.core.metrics import CONTENT_TYPE
+from backend.core.metrics_exporter import collect_metrics
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+def verify_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    if not METRICS_TOKEN:
+        return
+    expected = f"Bearer {METRICS_TOKEN}".encode("utf-8")
+    if not secrets.compare_digest((authorization or "").encode("utf-8"), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get(
+    "/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_token)]
+)
+async def metrics_route():
+    """
+    **Эндпоинт для Prometheus.**
+    Возвращает метрики кэша, пулов соединений Redis и MongoDB и задержек
+    маршрутов, сложенные по всем воркерам.
+    """
+    return Response(content=await collect_metrics(), media_type=CONTENT_TYPE)
@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Union
 
 from fastapi import APIRouter, Depends
 
-from backend.models.user import User
-from backend.core.dependencies import get_current_user
+from backend.models.user_views import UserAccountView
+from backend.core.dependencies import get_current_user, get_read_only_user
+from backend.schemas.token import TokenPrincipal
 
 from backend.services.subscription_service import SubscriptionService
 from backend.schemas.subscription import (
@@ -44,7 +45,7 @@ async def get_plan_by_id_route(planId: str):
 @router.post("/subscriptions/purchase", response_model=PurchaseSubscriptionResponse)
 async def purchase_subscription_route(
     request_data: PurchaseSubscriptionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserAccountView = Depends(get_current_user),
 ):
     """
     **Эндпоинт для покупки подписки.**
@@ -60,7 +61,7 @@ async def purchase_subscription_route(
 
 @router.get("/subscriptions/current", response_model=CurrentSubscriptionEmbedded)
 async def get_current_subscription_route(
-    current_user: User = Depends(get_current_user),
+    current_user: Union[UserAccountView, TokenPrincipal] = Depends(get_read_only_user),
 ):
     """
     **Эндпоинт для получения текущей подписки пользователя.**
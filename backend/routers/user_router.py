@@ -7,7 +7,7 @@ from backend.schemas.user import (
     LoginUserRequest,
     UpdateUserRequest,
 )
-from backend.models.user import User
+from backend.models.user_views import UserAccountView
 from backend.schemas.token import RefreshTokenRequest
 
 router = APIRouter(prefix="/api", tags=["User"])
@@ -39,7 +39,9 @@ async def login_user_route(request_data: LoginUserRequest):
 
 
 @router.get("/user/data")
-async def get_user_data_route(current_user: User = Depends(get_current_user)):
+async def get_user_data_route(
+    current_user: UserAccountView = Depends(get_current_user),
+):
     """
     **Эндпоинт для получения данных о текущем пользователе.**
     Возвращает информацию о текущем пользователе.
@@ -51,7 +53,8 @@ async def get_user_data_route(current_user: User = Depends(get_current_user)):
 
 @router.put("/update/user")
 async def update_user_route(
-    request_data: UpdateUserRequest, current_user: User = Depends(get_current_user)
+    request_data: UpdateUserRequest,
+    current_user: UserAccountView = Depends(get_current_user),
 ):
     """
     **Эндпоинт для обновления данных пользователя.**
@@ -68,7 +71,7 @@ async def update_user_route(
 
 @router.post("/logout")
 async def logout_user_route(
-    request: Request, current_user: User = Depends(get_current_user)
+    request: Request, current_user: UserAccountView = Depends(get_current_user)
 ):
     """
     **Эндпоинт для выхода пользователя из системы.**
@@ -94,7 +97,8 @@ async def refresh_access_token_route(request_data: RefreshTokenRequest):
 
 @router.post("/user/avatar")
 async def upload_avatar_route(
-    avatar: UploadFile = File(...), current_user: User = Depends(get_current_user)
+    avatar: UploadFile = File(...),
+    current_user: UserAccountView = Depends(get_current_user),
 ):
     """
     **Эндпоинт для загрузки аватара пользователя.**
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends
-from typing import Dict, Any
-from backend.core.dependencies import get_current_user
-from backend.models.user import User
+from fastapi import APIRouter, Depends, Query
+from typing import Dict, Any, Optional, Union
+from backend.core.dependencies import get_current_user, get_read_only_user
+from backend.schemas.token import TokenPrincipal
 
-from backend.services.wallet_service import WalletService
+from backend.models.user_views import UserAccountView, WALLET_TRANSACTIONS_LIMIT
+from backend.services.wallet_service import (
+    WalletService,
+    TRANSACTIONS_PAGE_MAX_LIMIT,
+)
 
 from backend.schemas.wallet import DepositWalletRequest, WithdrawWalletRequest
 
@@ -12,7 +16,7 @@ router = APIRouter(prefix="/api", tags=["Wallet"])
 
 @router.get("/wallet")
 async def get_wallet_data_route(
-    current_user: User = Depends(get_current_user),
+    current_user: Union[UserAccountView, TokenPrincipal] = Depends(get_read_only_user),
 ) -> Dict[str, Any]:
     """
     **Эндпоинт для получения данных о кошельке пользователя.**
@@ -23,9 +27,37 @@ async def get_wallet_data_route(
     return await WalletService.get_wallet_data(current_user)
 
 
+@router.get("/wallet/transactions")
+async def get_wallet_transactions_route(
+    before: Optional[str] = Query(
+        None, description="Курсор nextCursor предыдущей страницы"
+    ),
+    limit: int = Query(
+        WALLET_TRANSACTIONS_LIMIT,
+        ge=1,
+        le=TRANSACTIONS_PAGE_MAX_LIMIT,
+        description="Количество транзакций на странице",
+    ),
+    type: Optional[str] = Query(None, description="Тип транзакции"),
+    status: Optional[str] = Query(None, description="Статус транзакции"),
+    current_user: Union[UserAccountView, TokenPrincipal] = Depends(get_read_only_user),
+) -> Dict[str, Any]:
+    """
+    **Эндпоинт для получения истории транзакций пользователя.**
+    Возвращает транзакции от новых к старым страницами по курсору.
+    **Возвращает:**
+    - `transactions`: Транзакции страницы.
+    - `nextCursor`: Курсор следующей страницы (None на последней).
+    """
+    return await WalletService.get_transactions(
+        current_user, before=before, limit=limit, type=type, status=status
+    )
+
+
 @router.post("/wallet/deposit")
 async def deposit_wallet_route(
-    request_data: DepositWalletRequest, current_user: User = Depends(get_current_user)
+    request_data: DepositWalletRequest,
+    current_user: UserAccountView = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """
     **Эндпоинт для пополнения кошелька пользователя.**
@@ -41,7 +73,8 @@ async def deposit_wallet_route(
 
 @router.post("/wallet/withdraw")
 async def withdraw_wallet_route(
-    request_data: WithdrawWalletRequest, current_user: User = Depends(get_current_user)
+    request_data: WithdrawWalletRequest,
+    current_user: UserAccountView = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """
     **Эндпоинт для вывода средств из кошелька пользователя.**
@@ -8,7 +8,7 @@ from .subscription import (
 )
 from .transaction import TransactionResponse
 from .user import UserResponseBase, CreateUserRequest, LoginUserRequest, UpdateUserRequest
-from .token import RefreshTokenRequest
+from .token import RefreshTokenRequest, TokenPrincipal
 from .wallet import DepositWalletRequest, WithdrawWalletRequest
 
 
@@ -26,6 +26,7 @@ __all__ = [
     'LoginUserRequest',
     'UpdateUserRequest',
     'RefreshTokenRequest',
+    'TokenPrincipal',
     'DepositWalletRequest',
     'WithdrawWalletRequest'
 ]
\ No newline at end of file
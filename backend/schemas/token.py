@@ -1,6 +1,13 @@
 from __future__ import annotations
 from pydantic import BaseModel
+from beanie import PydanticObjectId
 
 
 class RefreshTokenRequest(BaseModel):
     refreshToken: str
+
+
+class TokenPrincipal(BaseModel):
+    id: PydanticObjectId
+    role: str = "user"
+    tokenVersion: int = 0
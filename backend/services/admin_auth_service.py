@@ -1,4 +1,3 @@
-import bcrypt  # Для хеширования и проверки паролей
 from jose import JWTError, jwt
 from fastapi import (
     HTTPException,
@@ -18,7 +17,12 @@ from backend.core.dependencies import (
     get_admin_user,
     generate_tokens,
 )  # Зависимость для получения администратора
+from backend.core.password_hasher import (
+    verify_password,
+    schedule_rehash_if_needed,
+)  # Проверка пароля в отдельном пуле процессов
 from backend.models.user import User  # Модель пользователя
+from backend.models.user_views import UserAccountView  # Текущий администратор
 from backend.schemas.token import (
     RefreshTokenRequest,
 )  # Схема для запроса refresh-токена
@@ -30,7 +34,7 @@ from backend.models.embedded import (
 
 class AdminAuthService:
     @staticmethod
-    async def admin_check(admin_user: User = Depends(get_admin_user)):
+    async def admin_check(admin_user: UserAccountView = Depends(get_admin_user)):
         return {"isAuthenticated": True}
 
     @staticmethod
@@ -50,14 +54,13 @@ class AdminAuthService:
                     detail="Неверные учетные данные или недостаточно прав",
                 )
 
-            is_match = bcrypt.checkpw(
-                request_data.password.encode("utf-8"), admin.password.encode("utf-8")
-            )
+            is_match = await verify_password(request_data.password, admin.password)
             if not is_match:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Неверные учетные данные",
                 )
+            schedule_rehash_if_needed(admin, request_data.password)
 
             tokens = await generate_tokens(admin)
             admin_agent = request.headers.get("user-agent", "Unknown")
@@ -80,6 +83,8 @@ class AdminAuthService:
                 },
             }
 
+        except HTTPException:
+            raise
         except Exception as err:
             logger.error(f"Ошибка при логине администратора: {err}", exc_info=True)
             raise HTTPException(
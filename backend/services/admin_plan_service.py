@@ -10,7 +10,8 @@ from pymongo.errors import (
     DuplicateKeyError,
 )  # Для перехвата ошибки дублирования ключа при создании плана
 
-from backend.models.user import User  # Модель пользователя (для admin_user)
+from backend.models.user import User  # Модель пользователя
+from backend.models.user_views import UserAccountView  # Текущий администратор
 from backend.models.subscription import SubscriptionPlan  # Модель тарифного плана
 from backend.schemas.admin import (
     AdminChangePlanRequest,
@@ -25,6 +26,9 @@ from backend.core.dependencies import (
     get_admin_user,
 )  # Ваша зависимость для получения администратора
 from backend.core.config import logger  # Логгер для записи ошибок и информации
+from backend.core.plan_catalog import (
+    notify_plans_changed,
+)  # Обновление каталога планов во всех воркерах
 
 
 class AdminPlanService:
@@ -33,7 +37,7 @@ class AdminPlanService:
         planId: PydanticObjectId,
         request_data: AdminChangePlanRequest,
         request: Request,
-        admin_user: User = Depends(get_admin_user),
+        admin_user: UserAccountView = Depends(get_admin_user),
     ):
         """
         **Метод для изменения существующего тарифного плана.**
@@ -140,6 +144,7 @@ class AdminPlanService:
                         )
 
                     await session.commit_transaction()
+                    await notify_plans_changed()
 
                     plan_data = updated_plan.model_dump(by_alias=True)
                     plan_data["_id"] = str(plan_data["_id"])
@@ -166,7 +171,7 @@ class AdminPlanService:
     async def admin_create_plan(
         request_data: AdminChangePlanRequest,
         request: Request,
-        admin_user: User = Depends(get_admin_user),
+        admin_user: UserAccountView = Depends(get_admin_user),
     ):
         """
         **Метод для создания нового тарифного плана.**
@@ -214,6 +219,7 @@ class AdminPlanService:
             )
 
             await new_plan.insert()
+            await notify_plans_changed()
 
             await log_admin_action(
                 admin_user,
@@ -244,7 +250,7 @@ class AdminPlanService:
     async def admin_delete_plan(
         planId: PydanticObjectId,
         request: Request,
-        admin_user: User = Depends(get_admin_user),
+        admin_user: UserAccountView = Depends(get_admin_user),
     ):
         """
         **Метод для удаления тарифного плана.**
@@ -301,6 +307,7 @@ class AdminPlanService:
                     )
 
                     await session.commit_transaction()
+                    await notify_plans_changed()
 
                     return {"success": True, "message": "Тарифный план успешно удален"}
 
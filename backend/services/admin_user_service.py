@@ -1,161 +1,233 @@
+import asyncio
+import json
 import math
+from typing import AsyncIterator, Optional
 from beanie import PydanticObjectId, exceptions as beanie_exceptions
-from fastapi import HTTPException, status, Query, Request
+from fastapi import HTTPException, status, Request
 from pydantic import BaseModel, EmailStr, ValidationError
 
 from backend.models.user import User
-from backend.models.subscription import SubscriptionPlan
+from backend.models.user_views import UserAccountView
 from backend.schemas.admin import AdminChangeUserRequest
-from backend.core.dependencies import log_admin_action
+from backend.core.dependencies import log_admin_action, revoke_user_tokens
 from backend.core.database import get_motor_client
 from backend.core.config import logger
+from backend.core.redis_client import cache_key, invalidate_cache, cache_keys_for_tag
+from backend.core.principal_cache import invalidate_principal
+from backend.core.read_routing import pin_primary_reads, read_collection
+from backend.core.plan_catalog import PlanCatalog, get_plan_catalog
+from backend.core.keyset import KEYSET_SORT, after_cursor, encode_cursor
+from backend.core.user_search import (
+    fuzzy_user_ids,
+    index_user_trigrams,
+    remove_user_trigrams,
+    search_query,
+)
+from backend.core import metrics
+from backend.models.user_trigram import normalize_search_value
+
+
+# Поля пользователя для строки списка админки. План подписки берется не
+# $lookup в subscriptionplans, а из каталога планов в памяти процесса
+ADMIN_USER_STAGES = [
+    {
+        "$project": {
+            "_id": 1,
+            "username": 1,
+            "email": 1,
+            "currentSubscription.planId": 1,
+            "currentSubscription.startDate": 1,
+            "currentSubscription.endDate": 1,
+            "currentSubscription.isActive": 1,
+            "currentSubscription.autoRenew": 1,
+            "currentSubscription.adminNote": 1,
+            "wallet.balance": 1,
+            "createdAt": 1,
+        }
+    },
+]
+
+# Максимальный размер страницы списка; всех пользователей отдает
+# export_admin_users
+ADMIN_USERS_PAGE_MAX_LIMIT = 100
+# До скольких пользователей считается `total` списка с поиском
+ADMIN_USERS_COUNT_CAP = 10000
+# Размер пачки курсора MongoDB при выгрузке всех пользователей
+ADMIN_USERS_EXPORT_BATCH = 1000
+
+
+def _admin_user_dict(user: dict, catalog: PlanCatalog) -> dict:
+    user_data = {
+        "_id": str(user["_id"]),
+        "username": user.get("username"),
+        "email": user.get("email"),
+        "wallet": {"balance": user.get("wallet", {}).get("balance", 0)},
+        "createdAt": (
+            user.get("createdAt").isoformat() if user.get("createdAt") else None
+        ),
+        "currentSubscription": None,
+    }
+
+    if user.get("currentSubscription"):
+        sub_data = user["currentSubscription"]
+        plan_id_str = str(sub_data["planId"]) if sub_data.get("planId") else None
+
+        user_data["currentSubscription"] = {
+            "planId": plan_id_str,
+            "startDate": (
+                sub_data.get("startDate").isoformat()
+                if sub_data.get("startDate")
+                else None
+            ),
+            "endDate": (
+                sub_data.get("endDate").isoformat() if sub_data.get("endDate") else None
+            ),
+            "isActive": sub_data.get("isActive", False),
+            "autoRenew": sub_data.get("autoRenew", False),
+            "adminNote": sub_data.get("adminNote"),
+            "plan": None,
+        }
+
+        plan = catalog.get(sub_data.get("planId"))
+        if plan:
+            user_data["currentSubscription"]["plan"] = {
+                "_id": str(plan.id),
+                "name": plan.name,
+                "price": plan.price,
+                "features": list(plan.features),
+            }
+    return user_data
+
+
+async def _search_filter(search: str, mode: str) -> dict:
+    """Фильтр users для строки поиска; для fuzzy - по найденным кандидатам."""
+    if not search:
+        return {}
+    metrics.inc("user_search_total", mode=mode)
+    if mode == "fuzzy":
+        return {"_id": {"$in": await fuzzy_user_ids(search)}}
+    return search_query(search, mode)
 
 
 class AdminUserService:
     @staticmethod
     async def get_admin_users(
-        page: int = Query(1, ge=1),
-        limit: int = Query(25, ge=0),
-        search: str = Query("", alias="search"),
+        page: int = 1,
+        limit: int = 25,
+        search: str = "",
+        admin_id: Optional[PydanticObjectId] = None,
+        mode: str = "contains",
+        before: Optional[str] = None,
     ):
         """
         **Метод для получения списка пользователей.**
-        Возвращает список пользователей с возможностью фильтрации по email или username.
+        Возвращает список пользователей от новых к старым с возможностью
+        фильтрации по email или username. Следующая страница запрашивается
+        курсором `nextCursor` (диапазон по индексу createdAt_-1__id_-1, без
+        skip); в режиме `fuzzy` пользователи упорядочены по похожести и
+        страницы задаются номером `page`.
         **Параметры:**
-        - `page`: Номер страницы (по умолчанию 1).
-        - `limit`: Количество пользователей на странице (по умолчанию 25, 0 - все).
+        - `page`: Номер страницы, только для `mode=fuzzy` (по умолчанию 1).
+        - `limit`: Количество пользователей на странице (по умолчанию 25, не
+          больше ADMIN_USERS_PAGE_MAX_LIMIT; всех - `export_admin_users`).
         - `search`: Строка для поиска по email или username (по умолчанию пустая строка).
+        - `admin_id`: ID администратора: после его изменений список читается
+          с первичного узла MongoDB.
+        - `mode`: Режим поиска: `contains` (подстрока, по умолчанию; проход по
+          всему индексу), `prefix` (по началу строки, диапазон по индексу) или
+          `fuzzy` (с опечатками, по триграммам).
+        - `before`: Курсор `nextCursor` предыдущей страницы.
         **Возвращает:**
         - `success`: Успех операции.
         - `users`: Список пользователей с их данными.
-        - `total`: Общее количество пользователей.
+        - `total`: Количество пользователей: без поиска - оценка по метаданным
+          коллекции, с поиском - точное до ADMIN_USERS_COUNT_CAP
+          (`totalCapped`), на страницах с курсором не считается (None).
         - `page`: Номер текущей страницы.
-        - `pages`: Общее количество страниц.
+        - `pages`: Количество страниц (None, если `total` не считался).
+        - `nextCursor`: Курсор следующей страницы или None, если она последняя.
         """
 
         try:
-            skip = (page - 1) * limit
-
-            query = {}
-            if search:
-                query["$or"] = [
-                    {"email": {"$regex": search, "$options": "i"}},
-                    {"username": {"$regex": search, "$options": "i"}},
-                ]
-
-            total = await User.find(query).count()
-
-            pipeline = [
-                {"$match": query},
-            ]
-            if limit > 0:
-                pipeline.append({"$skip": skip})
-                pipeline.append({"$limit": limit})
-
-            pipeline.extend(
-                [
-                    {
-                        "$lookup": {
-                            "from": "subscriptionplans",
-                            "localField": "currentSubscription.planId",
-                            "foreignField": "_id",
-                            "as": "currentSubscription.plan",
-                        }
-                    },
-                    {
-                        "$addFields": {
-                            "currentSubscription.plan": {
-                                "$cond": {
-                                    "if": {"$isArray": "$currentSubscription.plan"},
-                                    "then": {
-                                        "$arrayElemAt": ["$currentSubscription.plan", 0]
-                                    },
-                                    "else": None,
+            users = await read_collection(User, admin_id)
+
+            if search and mode == "fuzzy":
+                # Кандидаты уже упорядочены по похожести - страница режется здесь
+                ranked_ids = await fuzzy_user_ids(search)
+                metrics.inc("user_search_total", mode=mode)
+                skip = (page - 1) * limit
+                page_ids = ranked_ids[skip : skip + limit]
+                users_list = await users.aggregate(
+                    [{"$match": {"_id": {"$in": page_ids}}}, *ADMIN_USER_STAGES]
+                ).to_list(length=None)
+                rank = {user_id: index for index, user_id in enumerate(page_ids)}
+                users_list.sort(key=lambda user: rank[user["_id"]])
+                total, total_capped, next_cursor = len(ranked_ids), False, None
+            else:
+                query = await _search_filter(search, mode)
+                match = query
+                if before:
+                    cursor_filter = after_cursor(before)
+                    match = {"$and": [query, cursor_filter]} if query else cursor_filter
+                # Лишняя запись показывает, есть ли следующая страница
+                page_stages = [{"$limit": limit + 1}, *ADMIN_USER_STAGES]
+                sort_stage = {"$sort": dict(KEYSET_SORT)}
+
+                total, total_capped = None, False
+                if not query:
+                    total, users_list = await asyncio.gather(
+                        users.estimated_document_count(),
+                        users.aggregate(
+                            [{"$match": match}, sort_stage, *page_stages]
+                        ).to_list(length=None),
+                    )
+                elif before:
+                    users_list = await users.aggregate(
+                        [{"$match": match}, sort_stage, *page_stages]
+                    ).to_list(length=None)
+                else:
+                    # Страница и ограниченный подсчет за один запрос: $limit
+                    # перед $facet ограничивает и сортировку, и подсчет
+                    result = await users.aggregate(
+                        [
+                            {"$match": match},
+                            sort_stage,
+                            {"$limit": ADMIN_USERS_COUNT_CAP},
+                            {
+                                "$facet": {
+                                    "users": page_stages,
+                                    "total": [{"$count": "count"}],
                                 }
                             },
-                            "wallet": {
-                                "$ifNull": [
-                                    "$wallet",
-                                    {"balance": 0, "transactions": []},
-                                ]
-                            },
-                        }
-                    },
-                    {
-                        "$project": {
-                            "_id": 1,
-                            "username": 1,
-                            "email": 1,
-                            "currentSubscription": 1,
-                            "wallet.balance": 1,
-                            "createdAt": 1,
-                        }
-                    },
-                ]
-            )
-
-            users_cursor = User.aggregate(pipeline)
-            users_list = await users_cursor.to_list()
-
-            populated_users = []
-            for user in users_list:
-                user_data = {
-                    "_id": str(user["_id"]),
-                    "username": user.get("username"),
-                    "email": user.get("email"),
-                    "wallet": {"balance": user.get("wallet", {}).get("balance", 0)},
-                    "createdAt": (
-                        user.get("createdAt").isoformat()
-                        if user.get("createdAt")
-                        else None
-                    ),
-                    "currentSubscription": None,
-                }
-
-                if user.get("currentSubscription"):
-                    sub_data = user["currentSubscription"]
-                    plan_id_str = (
-                        str(sub_data["planId"]) if sub_data.get("planId") else None
-                    )
-
-                    user_data["currentSubscription"] = {
-                        "planId": plan_id_str,
-                        "startDate": (
-                            sub_data.get("startDate").isoformat()
-                            if sub_data.get("startDate")
-                            else None
-                        ),
-                        "endDate": (
-                            sub_data.get("endDate").isoformat()
-                            if sub_data.get("endDate")
-                            else None
-                        ),
-                        "isActive": sub_data.get("isActive", False),
-                        "autoRenew": sub_data.get("autoRenew", False),
-                        "adminNote": sub_data.get("adminNote"),
-                        "plan": None,
-                    }
-
-                    if sub_data.get("plan"):
-                        user_data["currentSubscription"]["plan"] = {
-                            "_id": str(sub_data["plan"]["_id"]),
-                            "name": sub_data["plan"].get("name"),
-                            "price": sub_data["plan"].get("price"),
-                            "features": sub_data["plan"].get("features", []),
-                        }
-
-                populated_users.append(user_data)
-
-            pages = math.ceil(total / limit) if limit > 0 else (1 if total > 0 else 0)
+                        ]
+                    ).to_list(length=1)
+                    users_list = result[0]["users"]
+                    counted = result[0]["total"]
+                    total = counted[0]["count"] if counted else 0
+                    total_capped = total >= ADMIN_USERS_COUNT_CAP
+
+                next_cursor = None
+                if len(users_list) > limit:
+                    users_list = users_list[:limit]
+                    last = users_list[-1]
+                    next_cursor = encode_cursor(last.get("createdAt"), last["_id"])
+
+            catalog = get_plan_catalog()
+            populated_users = [_admin_user_dict(user, catalog) for user in users_list]
+            pages = math.ceil(total / limit) if total is not None else None
 
             return {
                 "success": True,
                 "users": populated_users,
                 "total": total,
+                "totalCapped": total_capped,
                 "page": page,
                 "pages": pages,
+                "nextCursor": next_cursor,
             }
 
+        except HTTPException:
+            raise
         except Exception as err:
             logger.error(
                 f"Ошибка при получении списка пользователей: {err}", exc_info=True
@@ -165,12 +237,45 @@ class AdminUserService:
                 detail="Ошибка сервера при получении списка пользователей",
             )
 
+    @staticmethod
+    async def export_admin_users(
+        search: str = "",
+        admin_id: Optional[PydanticObjectId] = None,
+        mode: str = "contains",
+    ) -> AsyncIterator[str]:
+        """
+        **Выгрузка всех пользователей списка админки в формате NDJSON.**
+        Пользователи читаются курсором MongoDB пачками по
+        ADMIN_USERS_EXPORT_BATCH и отдаются по одной JSON-строке, не
+        собираясь в памяти целиком.
+        **Параметры:**
+        - `search`, `mode`: Как в `get_admin_users`.
+        - `admin_id`: ID администратора для маршрутизации чтения.
+        """
+        users = await read_collection(User, admin_id)
+        query = await _search_filter(search, mode)
+        cursor = users.aggregate(
+            [{"$match": query}, {"$sort": dict(KEYSET_SORT)}, *ADMIN_USER_STAGES],
+            batchSize=ADMIN_USERS_EXPORT_BATCH,
+        )
+        catalog = get_plan_catalog()
+        try:
+            async for user in cursor:
+                yield json.dumps(
+                    _admin_user_dict(user, catalog), ensure_ascii=False
+                ) + "\n"
+        except Exception as err:
+            logger.error(f"Ошибка при выгрузке пользователей: {err}", exc_info=True)
+            raise
+        finally:
+            await cursor.close()
+
     @staticmethod
     async def admin_change_user(
         userId: PydanticObjectId,
         request_data: AdminChangeUserRequest,
         request: Request,
-        admin_user: User,
+        admin_user: UserAccountView,
     ):
         """
         **Метод для изменения данных пользователя администратором.**
@@ -212,6 +317,9 @@ class AdminUserService:
                                 status_code=400, detail="Username too short"
                             )
                         update_fields["username"] = request_data.username
+                        update_fields["usernameLower"] = normalize_search_value(
+                            request_data.username
+                        )
                         changes["username"] = {
                             "old": user.username,
                             "new": request_data.username,
@@ -238,6 +346,9 @@ class AdminUserService:
                                 )
 
                             update_fields["email"] = request_data.email
+                            update_fields["emailLower"] = normalize_search_value(
+                                request_data.email
+                            )
                             changes["email"] = {
                                 "old": user.email,
                                 "new": request_data.email,
@@ -281,9 +392,7 @@ class AdminUserService:
                             else:
                                 try:
                                     plan_id = PydanticObjectId(sub_data["planId"])
-                                    plan = await SubscriptionPlan.get(
-                                        plan_id, session=session
-                                    )
+                                    plan = get_plan_catalog().get(plan_id)
                                     if not plan:
                                         raise HTTPException(
                                             status_code=404,
@@ -360,6 +469,17 @@ class AdminUserService:
                         )
 
                     await session.commit_transaction()
+                    await pin_primary_reads(userId, admin_user.id)
+                    if "username" in changes or "email" in changes:
+                        await index_user_trigrams(
+                            userId, updated_user.username, updated_user.email
+                        )
+                    await invalidate_principal(userId)
+                    await invalidate_cache(
+                        cache_key("user_data", userId),
+                        cache_key("wallet_data", userId),
+                        cache_key("user_subscription", userId),
+                    )
 
                     user_data = updated_user.model_dump(by_alias=True)
                     user_data["_id"] = str(user_data["_id"])
@@ -384,7 +504,7 @@ class AdminUserService:
 
     @staticmethod
     async def admin_delete_user(
-        userId: PydanticObjectId, request: Request, admin_user: User
+        userId: PydanticObjectId, request: Request, admin_user: UserAccountView
     ):
         """
         **Метод для удаления пользователя администратором.**
@@ -427,6 +547,18 @@ class AdminUserService:
                     await User.find_one({"_id": userId}).delete(session=session)
 
                     await session.commit_transaction()
+                    await pin_primary_reads(admin_user.id)
+                    await remove_user_trigrams(userId)
+                    try:
+                        await invalidate_principal(userId)
+                        await revoke_user_tokens(
+                            userId, *cache_keys_for_tag(f"user:{userId}")
+                        )
+                    except Exception as e:
+                        logger.error(
+                            f"Токены удаленного пользователя {userId} не отозваны: {e}",
+                            exc_info=True,
+                        )
 
                     return {"success": True, "message": "User deleted successfully"}
 
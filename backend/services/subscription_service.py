@@ -1,14 +1,19 @@
-import json
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from fastapi import HTTPException, status, Depends
 from beanie.odm.fields import PydanticObjectId
 from backend.core.dependencies import get_current_user
-from backend.core.redis_client import get_redis_client, delete_redis_cache
+from backend.core.redis_client import cache_key, invalidate_cache
+from backend.core.cache import cached
+from backend.core.plan_catalog import get_plan_catalog
+from backend.core.principal_cache import invalidate_principal
+from backend.core.read_routing import pin_primary_reads, read_document
+from backend.services.wallet_service import WalletService, latest_transaction_id
 from backend.models.user import User
+from backend.models.user_views import UserAccountView, UserSubscriptionView
 from backend.models.transaction import Transaction
-from backend.models.subscription import SubscriptionPlan, SubscriptionHistory
+from backend.models.subscription import SubscriptionHistory
 from backend.core.database import get_motor_client
 from backend.core.config import logger
 from backend.schemas.subscription import (
@@ -18,6 +23,7 @@ from backend.schemas.subscription import (
     SubscriptionHistoryResponse,
 )
 from backend.schemas.transaction import TransactionResponse
+from backend.schemas.token import TokenPrincipal
 from backend.models.embedded.subscription import CurrentSubscriptionEmbedded
 
 
@@ -31,27 +37,10 @@ class SubscriptionService:
         - `plans`: Список тарифных планов с их данными.
         """
         try:
-            plans_key = "all_subscriptions_plans"
-            redis_client = get_redis_client()
-            if redis_client:
-                cached_plans = await redis_client.get(plans_key)
-                if cached_plans:
-                    logger.info("Тарифные планы взяты из Redis.")
-                    plans_data = json.loads(cached_plans)
-                    return [SubscriptionPlanResponse(**plan) for plan in plans_data]
-
-            plans = await SubscriptionPlan.find().sort("price").to_list()
-
-            response = []
-            for plan in plans:
-                plan_dict = plan.model_dump(by_alias=True, mode="json")
-                plan_dict["_id"] = str(plan_dict["_id"])
-                response.append(plan_dict)
-            if redis_client:
-                await redis_client.set(plans_key, json.dumps(response), ex=3600)
-                logger.info("Тарифные планы взяты из MongoDB и сохранены в Redis.")
-
-            return [SubscriptionPlanResponse(**plan) for plan in response]
+            return [
+                SubscriptionPlanResponse(**plan.to_response_dict())
+                for plan in get_plan_catalog().plans
+            ]
 
         except Exception as err:
             logger.error(
@@ -73,17 +62,14 @@ class SubscriptionService:
         - `plan`: Объект тарифного плана с его данными.
         """
         try:
-            plan = await SubscriptionPlan.get(planId)
+            plan = get_plan_catalog().get(planId)
             if not plan:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Тарифный план не найден",
                 )
 
-            plan_data_dict = plan.model_dump(by_alias=True)
-            plan_data_dict["_id"] = str(plan_data_dict["_id"])
-            plan_response_instance = SubscriptionPlanResponse(**plan_data_dict)
-            return plan_response_instance
+            return SubscriptionPlanResponse(**plan.to_response_dict())
 
         except Exception as err:
             logger.error(
@@ -98,7 +84,7 @@ class SubscriptionService:
     @staticmethod
     async def purchase_subscription(
         request_data: PurchaseSubscriptionRequest,
-        current_user: User = Depends(get_current_user),
+        current_user: UserAccountView = Depends(get_current_user),
     ) -> PurchaseSubscriptionResponse:
         """
         **Метод для покупки подписки.**
@@ -129,9 +115,7 @@ class SubscriptionService:
                         ID {current_user.id} и плана с ID {request_data.planId} в БД."
                     )
                     user = await User.get(current_user.id, session=session)
-                    plan = await SubscriptionPlan.get(
-                        request_data.planId, session=session
-                    )
+                    plan = get_plan_catalog().get(request_data.planId)
 
                     if not user:
                         logger.error(
@@ -210,13 +194,15 @@ class SubscriptionService:
                             createdAt=now,
                             updatedAt=now,
                         )
+                        previous_transaction_id = await latest_transaction_id(
+                            user.id, session=session
+                        )
                         await transaction.insert(session=session)
                         logger.debug(
                             f"purchase_subscription: Транзакция {transaction.id} успешно создана."
                         )
 
                         user.wallet.balance -= plan.price
-                        user.wallet.transactionIds.append(transaction.id)
                         logger.debug(
                             f"purchase_subscription: Баланс \
                             пользователя {user.id} обновлен до {user.wallet.balance}."
@@ -271,7 +257,7 @@ class SubscriptionService:
                             name=plan.name,
                             price=plan.price,
                             renewalPeriod=plan.renewalPeriod,
-                            features=plan.features,
+                            features=list(plan.features),
                             createdAt=plan.createdAt,
                             updatedAt=plan.updatedAt,
                         ),
@@ -300,7 +286,7 @@ class SubscriptionService:
                                 name=plan.name,
                                 price=plan.price,
                                 renewalPeriod=plan.renewalPeriod,
-                                features=plan.features,
+                                features=list(plan.features),
                                 createdAt=plan.createdAt,
                                 updatedAt=plan.updatedAt,
                             ),
@@ -317,7 +303,30 @@ class SubscriptionService:
 
                     await session.commit_transaction()
 
-                    await delete_redis_cache(f"user_subscription:{current_user.id}")
+                    await pin_primary_reads(current_user.id)
+                    # Покупка уже зафиксирована: ошибка обновления кэша не должна
+                    # превращаться в 500 и откат уже завершенной транзакции
+                    try:
+                        await invalidate_principal(current_user.id)
+                        # user_data содержит и подписку, поэтому удаляется целиком,
+                        # а кошелек обновляется на месте
+                        await invalidate_cache(
+                            cache_key("user_subscription", current_user.id),
+                            cache_key("user_data", current_user.id),
+                        )
+                        if transaction:
+                            await WalletService.update_cached_wallet(
+                                user,
+                                transaction,
+                                previous_transaction_id,
+                                include_user_data=False,
+                            )
+                    except Exception as cache_err:
+                        logger.warning(
+                            f"purchase_subscription: Не удалось обновить кэш \
+                            пользователя {current_user.id}: {cache_err}",
+                            exc_info=True,
+                        )
                     logger.info(
                         f"purchase_subscription: Транзакция подписки для пользователя {user.id} \
                         успешно завершена. Возврат ответа."
@@ -348,8 +357,13 @@ class SubscriptionService:
                 )
 
     @staticmethod
+    @cached(
+        namespace="user_subscription", key="{current_user.id}", ttl=600, tags=("user",)
+    )
     async def get_current_subscription(
-        current_user: User = Depends(get_current_user),
+        current_user: Union[UserAccountView, TokenPrincipal] = Depends(
+            get_current_user
+        ),
     ) -> Dict[str, Any]:
         """
         **Метод для получения текущей подписки пользователя.**
@@ -360,22 +374,17 @@ class SubscriptionService:
         - `subscription`: Объект подписки с ее данными.
         """
         try:
-            redis_client = get_redis_client()
-            user_sub_key = f"user_subscription:{current_user.id}"
-
-            cached_sub = await redis_client.get(user_sub_key)
-            if cached_sub:
-                logger.info(f"Подписка пользователя {current_user.id} взята из Redis")
-                return json.loads(cached_sub)
-
-            user = await User.get(current_user.id)
+            user = await read_document(
+                User,
+                current_user.id,
+                current_user.id,
+                projection_model=UserSubscriptionView,
+            )
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
 
             if not user.currentSubscription or not user.currentSubscription.planId:
-                basic_plan = await SubscriptionPlan.find_one(
-                    SubscriptionPlan.price == 0
-                )
+                basic_plan = get_plan_catalog().free_plan
                 if not basic_plan:
                     raise HTTPException(status_code=500, detail="Basic plan not found")
 
@@ -390,12 +399,12 @@ class SubscriptionService:
                         "id": str(basic_plan.id),
                         "name": basic_plan.name,
                         "price": basic_plan.price,
-                        "features": basic_plan.features,
+                        "features": list(basic_plan.features),
                         "renewalPeriod": basic_plan.renewalPeriod,
                     },
                 }
 
-            plan = await SubscriptionPlan.get(user.currentSubscription.planId)
+            plan = get_plan_catalog().get(user.currentSubscription.planId)
             if not plan:
                 raise HTTPException(
                     status_code=404, detail="Subscription plan not found"
@@ -420,16 +429,15 @@ class SubscriptionService:
                     "id": str(plan.id),
                     "name": plan.name,
                     "price": plan.price,
-                    "features": plan.features,
+                    "features": list(plan.features),
                     "renewalPeriod": plan.renewalPeriod,
                 },
             }
 
-            await redis_client.set(user_sub_key, json.dumps(subscription_data), ex=600)
-            logger.info(f"Подписка пользователя {current_user.id} сохранена в Redis")
-
             return subscription_data
 
+        except HTTPException:
+            raise
         except Exception as err:
             logger.error(f"Error getting current subscription: {err}", exc_info=True)
             raise HTTPException(
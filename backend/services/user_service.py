@@ -1,11 +1,8 @@
-import asyncio
-import json
 import os
 import uuid
 import aiofiles
 import aiofiles.os
 from datetime import datetime, timezone
-import bcrypt
 from backend.core.config import (
     PUBLIC_DIR,
     AVATAR_UPLOAD_DIR,
@@ -19,12 +16,43 @@ from jose import JWTError, jwt
 from jose.exceptions import ExpiredSignatureError
 from pathlib import Path
 from beanie.odm.fields import PydanticObjectId
-from backend.core.config import logger, BCRYPT_ROUNDS
-from backend.core.dependencies import generate_tokens, get_current_user
-from backend.core.redis_client import get_redis_client, delete_redis_cache
+from beanie.odm.queries.update import UpdateResponse
+from backend.core.config import logger
+from backend.core.dependencies import (
+    generate_tokens,
+    get_current_user,
+    revoke_user_tokens,
+)
+from backend.core.redis_client import (
+    cache_key,
+    invalidate_cache,
+    cache_keys_for_tag,
+    read_key,
+)
+from backend.core.cache import cached
+from backend.core.plan_catalog import get_plan_catalog
+from backend.core.principal_cache import invalidate_principal
+from backend.core.user_search import index_user_trigrams
+from backend.core.read_routing import (
+    pin_primary_reads,
+    read_document,
+    read_preference_for,
+    routed_collection,
+)
+from backend.core.password_hasher import (
+    hash_password,
+    verify_password,
+    schedule_rehash_if_needed,
+)
 from backend.models.user import User
-from backend.models.subscription import SubscriptionPlan, SubscriptionHistory
+from backend.models.user_views import (
+    UserAccountView,
+    UserProfileView,
+    WALLET_TRANSACTIONS_LIMIT,
+)
+from backend.models.subscription import SubscriptionHistory
 from backend.models.transaction import Transaction
+from backend.services.wallet_service import LEDGER_SORT, ledger_filter
 from backend.models.embedded import CurrentSubscriptionEmbedded
 from backend.models.embedded import NotificationsEmbedded
 from backend.models.embedded import WalletEmbedded
@@ -37,6 +65,18 @@ from backend.schemas.user import (
 )
 
 
+async def _set_user_fields(user_id, updates: Dict[str, Any]) -> User:
+    """Точечный $set полей пользователя; возвращает документ после записи."""
+    user = await User.find_one(User.id == user_id).update(
+        {"$set": updates}, response_type=UpdateResponse.NEW_DOCUMENT
+    )
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден"
+        )
+    return user
+
+
 class UserService:
     @staticmethod
     async def create_user(request_data: CreateUserRequest) -> Dict[str, Any]:
@@ -49,43 +89,19 @@ class UserService:
         - `user`: Объект созданного пользователя с его данными.
         """
         try:
-            redis_client = get_redis_client()
-            basic_plan = await redis_client.get("plan:Базовый")
-            if basic_plan:
-                plan_data_redis = json.loads(basic_plan)
-                logger.info("Базовый план взят из Redis")
-            else:
-                basic_plan_from_db = await SubscriptionPlan.find_one({"price": 0})
-                if not basic_plan_from_db:
-                    logger.error("Базовый тарифный план не найден при регистрации")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Ошибка сервера: Базовый тарифный план не найден",
-                    )
-                await redis_client.set(
-                    "plan:Базовый", basic_plan_from_db.model_dump_json()
-                )
-                logger.info("Базовый план взят из MongoDB и сохранен в Redis")
+            hashed_password_str = await hash_password(request_data.password)
 
-                plan_data_redis = basic_plan_from_db.model_dump(by_alias=True)
-
-            hashed_password_bytes = await asyncio.to_thread(
-                bcrypt.hashpw,
-                request_data.password.encode("utf-8"),
-                bcrypt.gensalt(rounds=BCRYPT_ROUNDS),
-            )
-            hashed_password_str = hashed_password_bytes.decode("utf-8")
+            basic_plan = get_plan_catalog().free_plan
+            if not basic_plan:
+                logger.error("Базовый тарифный план не найден при регистрации")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Ошибка сервера при создании пользователя",
+                )
 
             now = datetime.now(timezone.utc)
-            plan_data = {
-                "id": str(plan_data_redis.get("_id", plan_data_redis.get("id"))),
-                "name": plan_data_redis["name"],
-                "price": plan_data_redis["price"],
-                "features": plan_data_redis["features"],
-                "renewalPeriod": plan_data_redis["renewalPeriod"],
-                "createdAt": plan_data_redis.get("createdAt"),
-                "updatedAt": plan_data_redis.get("updatedAt"),
-            }
+            plan_data = basic_plan.model_dump(mode="json")
+            plan_data["id"] = str(basic_plan.id)
 
             user = User(
                 username=request_data.username,
@@ -93,20 +109,22 @@ class UserService:
                 password=hashed_password_str,
                 notifications=request_data.notifications or NotificationsEmbedded(),
                 currentSubscription=CurrentSubscriptionEmbedded(
-                    planId=plan_data_redis.get("id") or str(plan_data_redis.get("_id")),
+                    planId=basic_plan.id,
                     startDate=now,
                     endDate=None,
                     isActive=True,
                     autoRenew=False,
                     plan=plan_data,
                 ),
-                wallet=WalletEmbedded(balance=0.0, transactionIds=[]),
+                wallet=WalletEmbedded(balance=0.0),
                 role="user",
                 createdAt=now,
                 updatedAt=now,
             )
 
             await user.insert()
+            await pin_primary_reads(user.id)
+            await index_user_trigrams(user.id, user.username, user.email)
             tokens = await generate_tokens(user)
 
             response_data = {
@@ -138,6 +156,8 @@ class UserService:
 
             return response_data
 
+        except HTTPException:
+            raise
         except DuplicateKeyError:
             logger.warning(
                 f"Попытка создания пользователя с существующим email: {request_data.email}"
@@ -169,13 +189,12 @@ class UserService:
                     detail="Invalid email or password",
                 )
 
-            if not bcrypt.checkpw(
-                request_data.password.encode("utf-8"), user.password.encode("utf-8")
-            ):
+            if not await verify_password(request_data.password, user.password):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid email or password",
                 )
+            schedule_rehash_if_needed(user, request_data.password)
 
             tokens = await generate_tokens(user)
 
@@ -200,7 +219,8 @@ class UserService:
             )
 
     @staticmethod
-    async def get_user_data(current_user: User) -> Dict[str, Any]:
+    @cached(namespace="user_data", key="{current_user.id}", ttl=3600, tags=("user",))
+    async def get_user_data(current_user: UserAccountView) -> Dict[str, Any]:
         """
         **Метод для получения данных пользователя.**
         Принимает объект пользователя и возвращает его данные.
@@ -210,20 +230,20 @@ class UserService:
         - `user`: Объект пользователя с его данными.
         """
         try:
-            redis_client = get_redis_client()
-            user_data_key = f"user_data:{current_user.id}"
-            user_in_redis = await redis_client.get(user_data_key)
-            if user_in_redis:
-                logger.info("Данные взяты из Redis")
-                return json.loads(user_in_redis)
-
-            user = await User.get(current_user.id)
+            # Маркер read-your-writes проверяется один раз на все чтения запроса
+            read_preference = await read_preference_for(current_user.id)
+            user = await read_document(
+                User,
+                current_user.id,
+                projection_model=UserProfileView,
+                read_preference=read_preference,
+            )
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
 
             current_subscription = None
             if user.currentSubscription and user.currentSubscription.planId:
-                plan = await SubscriptionPlan.get(user.currentSubscription.planId)
+                plan = get_plan_catalog().get(user.currentSubscription.planId)
                 current_subscription = {
                     "planId": str(user.currentSubscription.planId),
                     "startDate": (
@@ -243,37 +263,38 @@ class UserService:
                             "id": str(plan.id),
                             "name": plan.name,
                             "price": plan.price,
-                            "features": plan.features,
+                            "features": list(plan.features),
                         }
                         if plan
                         else None
                     ),
                 }
 
-            transactions = []
-            if user.wallet.transactionIds:
-                transactions = (
-                    await Transaction.find({"_id": {"$in": user.wallet.transactionIds}})
-                    .sort(-Transaction.date)
-                    .limit(50)
-                    .to_list()
+            transactions_collection = routed_collection(Transaction, read_preference)
+            transactions = [
+                Transaction.model_validate(raw)
+                async for raw in transactions_collection.find(ledger_filter(user.id))
+                .sort(LEDGER_SORT)
+                .limit(WALLET_TRANSACTIONS_LIMIT)
+            ]
+            transactions = [
+                {
+                    "id": str(tx.id),
+                    "amount": tx.amount,
+                    "type": tx.type,
+                    "date": tx.date.isoformat(),
+                    "description": tx.description,
+                }
+                for tx in transactions
+            ]
+
+            history_collection = routed_collection(SubscriptionHistory, read_preference)
+            subscription_history = [
+                SubscriptionHistory.model_validate(raw)
+                async for raw in history_collection.find({"userId": user.id}).sort(
+                    "startDate", -1
                 )
-                transactions = [
-                    {
-                        "id": str(tx.id),
-                        "amount": tx.amount,
-                        "type": tx.type,
-                        "date": tx.date.isoformat(),
-                        "description": tx.description,
-                    }
-                    for tx in transactions
-                ]
-
-            subscription_history = (
-                await SubscriptionHistory.find(SubscriptionHistory.userId == user.id)
-                .sort(-SubscriptionHistory.startDate)
-                .to_list()
-            )
+            ]
             subscription_history = [
                 {
                     "id": str(sh.id),
@@ -303,18 +324,17 @@ class UserService:
                     },
                 }
             }
-
-            await redis_client.set(user_data_key, json.dumps(response_data), ex=3600)
-
             return response_data
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error getting user data: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
     @staticmethod
     async def update_user(
-        request_data: UpdateUserRequest, current_user: User
+        request_data: UpdateUserRequest, current_user: UserAccountView
     ) -> Dict[str, Any]:
         """
         **Метод для обновления данных пользователя.**
@@ -325,9 +345,8 @@ class UserService:
         **Возвращает:**
         - `user`: Объект обновленного пользователя с его данными.
         """
-        is_match = bcrypt.checkpw(
-            request_data.currentPassword.encode("utf-8"),
-            current_user.password.encode("utf-8"),
+        is_match = await verify_password(
+            request_data.currentPassword, current_user.password
         )
         if not is_match:
             raise HTTPException(
@@ -345,22 +364,34 @@ class UserService:
                     detail="Email уже используется",
                 )
 
+        # current_user может быть из principal_cache, поэтому пишутся только
+        # измененные поля: save() затер бы баланс и подписку из других запросов
+        updates: Dict[str, Any] = {"updatedAt": datetime.now(timezone.utc)}
         if request_data.username is not None:
-            current_user.username = request_data.username
+            updates["username"] = request_data.username
         if request_data.email is not None:
-            current_user.email = request_data.email
+            updates["email"] = request_data.email
         if request_data.newPassword is not None:
-            hashed_new_password_bytes = bcrypt.hashpw(
-                request_data.newPassword.encode("utf-8"), bcrypt.gensalt()
-            )
-            current_user.password = hashed_new_password_bytes.decode("utf-8")
+            updates["password"] = await hash_password(request_data.newPassword)
 
         try:
-            await current_user.save()
-            user_data_key = f"user_data:{current_user.id}"
-            await delete_redis_cache(user_data_key)
+            if (
+                request_data.newPassword is not None
+                and request_data.newPassword != request_data.currentPassword
+            ):
+                # Токены отзываются до записи пароля: если отзыв не удался,
+                # пароль остается прежним и запрос завершается ошибкой
+                await revoke_user_tokens(current_user.id)
+            updated_user = await _set_user_fields(current_user.id, updates)
+            await pin_primary_reads(current_user.id)
+            if request_data.username is not None or request_data.email is not None:
+                await index_user_trigrams(
+                    current_user.id, current_user.username, current_user.email
+                )
+            await invalidate_principal(current_user.id)
+            await invalidate_cache(cache_key("user_data", current_user.id))
 
-            user_data_dict = current_user.model_dump(by_alias=True)
+            user_data_dict = updated_user.model_dump(by_alias=True)
             user_data_dict["_id"] = str(user_data_dict["_id"])
             user_response_instance = UserResponseBase(**user_data_dict)
             final_user_response_dict = user_response_instance.model_dump(by_alias=True)
@@ -371,6 +402,8 @@ class UserService:
                 "user": final_user_response_dict,
             }
 
+        except HTTPException:
+            raise
         except DuplicateKeyError:
             logger.warning(
                 f"Попытка обновления пользователя с существующим email: {request_data.email}"
@@ -387,7 +420,7 @@ class UserService:
 
     @staticmethod
     async def logout_user(
-        request: Request, current_user: User = Depends(get_current_user)
+        request: Request, current_user: UserAccountView = Depends(get_current_user)
     ) -> Dict[str, Any]:
         """
         **Метод для выхода пользователя из системы.**
@@ -396,9 +429,10 @@ class UserService:
         - `message`: Сообщение об успешном выходе.
         """
         try:
-            await delete_redis_cache(f"refresh_token:{current_user.id}")
-            await delete_redis_cache(f"user_data:{current_user.id}")
-            await delete_redis_cache(f"wallet_data:{current_user.id}")
+            # Отзыв токенов и очистка кэша пользователя - один запрос в Redis
+            await revoke_user_tokens(
+                current_user.id, *cache_keys_for_tag(f"user:{current_user.id}")
+            )
 
             return {"success": True, "message": "Logout successful"}
 
@@ -447,8 +481,7 @@ class UserService:
                     detail="Invalid refresh token",
                 )
 
-            redis_client = get_redis_client()
-            stored_token = await redis_client.get(f"refresh_token:{user_id}")
+            stored_token = await read_key(cache_key("refresh_token", user_id))
             if not stored_token or stored_token != refresh_token:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -480,7 +513,8 @@ class UserService:
 
     @staticmethod
     async def upload_avatar(
-        avatar: UploadFile = File(...), current_user: User = Depends(get_current_user)
+        avatar: UploadFile = File(...),
+        current_user: UserAccountView = Depends(get_current_user),
     ) -> Dict[str, Any]:
         """
         **Метод для загрузки аватара пользователя.**
@@ -572,12 +606,16 @@ class UserService:
                             exc_info=True,
                         )
 
-            current_user.avatar = avatar_url
-            await current_user.save()
+            updated_user = await _set_user_fields(
+                current_user.id,
+                {"avatar": avatar_url, "updatedAt": datetime.now(timezone.utc)},
+            )
+            await pin_primary_reads(current_user.id)
+            await invalidate_principal(current_user.id)
 
-            await delete_redis_cache(f"user_data:{current_user.id}")
+            await invalidate_cache(cache_key("user_data", current_user.id))
 
-            user_data_dict = current_user.model_dump(by_alias=True)
+            user_data_dict = updated_user.model_dump(by_alias=True)
             user_data_dict["_id"] = str(user_data_dict["_id"])
             user_response_instance = UserResponseBase(**user_data_dict)
             final_user_response_dict = user_response_instance.model_dump(by_alias=True)
@@ -588,6 +626,8 @@ class UserService:
                 "user": final_user_response_dict,
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Ошибка при загрузке аватара: {e}", exc_info=True)
             raise HTTPException(
@@ -1,22 +1,111 @@
 import asyncio
-import json
+import math
 from pymongo.errors import OperationFailure
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Union
 from fastapi import HTTPException, status, Depends
-from backend.core.redis_client import get_redis_client, delete_redis_cache
+from beanie import PydanticObjectId
+from backend.core.principal_cache import invalidate_principal
+from backend.core.cache import cached, patch_cached
+from backend.core.keyset import KEYSET_SORT, after_cursor, encode_cursor
+from backend.core.read_routing import (
+    pin_primary_reads,
+    read_collection,
+    read_document,
+    read_preference_for,
+    routed_collection,
+)
+from backend.core.redis_client import cache_key
 from backend.models.user import User
+from backend.models.user_views import (
+    UserAccountView,
+    UserWalletView,
+    WALLET_TRANSACTIONS_LIMIT,
+)
 from backend.models.transaction import Transaction
 from backend.core.database import get_motor_client
 from backend.core.config import logger
 from backend.schemas.wallet import DepositWalletRequest
+from backend.schemas.token import TokenPrincipal
 from backend.core.dependencies import get_current_user
 
 
+def _as_stored(dt: datetime) -> datetime:
+    """Дата в том виде, в каком ее вернет MongoDB: naive UTC с точностью до мс."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.replace(microsecond=dt.microsecond // 1000 * 1000)
+
+
+MONGO_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%LZ"
+
+
+def _format_mongo_date(dt: Optional[datetime]) -> Optional[str]:
+    # Тот же формат, что дает $dateToString с MONGO_DATE_FORMAT
+    if dt is None:
+        return None
+    dt = _as_stored(dt)
+    return f"{dt.strftime('%Y-%m-%dT%H:%M:%S')}.{dt.microsecond // 1000:03d}Z"
+
+
+def _matches_previous_state(
+    balance: float,
+    transactions: list,
+    id_field: str,
+    expected_balance: float,
+    previous_transaction_id: Optional[str],
+) -> bool:
+    """
+    Проверка версии закэшированного кошелька: он должен отражать состояние
+    ровно до записи - баланс до операции и последняя транзакция перед ней.
+    """
+    if not math.isclose(balance, expected_balance, rel_tol=1e-9, abs_tol=1e-6):
+        return False
+    head = transactions[0][id_field] if transactions else None
+    return head == previous_transaction_id
+
+
+def ledger_filter(user_id: Any) -> Dict[str, Any]:
+    """Транзакции пользователя; вместе с LEDGER_SORT использует индекс userId_1_createdAt_-1__id_-1."""
+    return {"userId": PydanticObjectId(user_id)}
+
+
+# _id разводит транзакции с одинаковым createdAt, порядок полностью определен
+LEDGER_SORT = KEYSET_SORT
+
+TRANSACTION_PROJECTION = {
+    "_id": {"$toString": "$_id"},
+    "userId": {"$toString": "$userId"},
+    "amount": 1,
+    "type": 1,
+    "status": 1,
+    "description": 1,
+    "paymentMethod": 1,
+    "currency": 1,
+    "date": {"$dateToString": {"format": MONGO_DATE_FORMAT, "date": "$date"}},
+    "createdAt": {"$dateToString": {"format": MONGO_DATE_FORMAT, "date": "$createdAt"}},
+    "updatedAt": {"$dateToString": {"format": MONGO_DATE_FORMAT, "date": "$updatedAt"}},
+}
+
+# Максимальный размер страницы истории транзакций
+TRANSACTIONS_PAGE_MAX_LIMIT = 100
+
+
+async def latest_transaction_id(user_id: Any, session=None) -> Optional[str]:
+    """Id последней транзакции пользователя (внутри транзакции - с `session`)."""
+    latest = await Transaction.get_motor_collection().find_one(
+        ledger_filter(user_id), {"_id": 1}, sort=LEDGER_SORT, session=session
+    )
+    return str(latest["_id"]) if latest else None
+
+
 class WalletService:
     @staticmethod
+    @cached(namespace="wallet_data", key="{current_user.id}", ttl=3600, tags=("user",))
     async def get_wallet_data(
-        current_user: User = Depends(get_current_user),
+        current_user: Union[UserAccountView, TokenPrincipal] = Depends(
+            get_current_user
+        ),
     ) -> Dict[str, Any]:
         """
         **Эндпоинт для получения данных о кошельке пользователя.**
@@ -25,77 +114,199 @@ class WalletService:
         - `wallet`: Объект кошелька с его данными.
         """
         try:
-            redis_client = get_redis_client()
-            wallet_key = f"wallet_data:{current_user.id}"
-            wallet_data_redis = await redis_client.get(wallet_key)
-            if wallet_data_redis:
-                logger.info("Данные кошелька взяты из Redis")
-                return json.loads(wallet_data_redis)
-
-            user = await User.get(current_user.id)
+            pipeline = [
+                {"$match": ledger_filter(current_user.id)},
+                {"$sort": dict(LEDGER_SORT)},
+                {"$limit": WALLET_TRANSACTIONS_LIMIT},
+                {"$project": TRANSACTION_PROJECTION},
+            ]
+
+            read_preference = await read_preference_for(current_user.id)
+            transactions_collection = routed_collection(Transaction, read_preference)
+            # Баланс и последние транзакции не зависят друг от друга
+            user, transactions = await asyncio.gather(
+                read_document(
+                    User,
+                    current_user.id,
+                    projection_model=UserWalletView,
+                    read_preference=read_preference,
+                ),
+                transactions_collection.aggregate(pipeline).to_list(
+                    length=WALLET_TRANSACTIONS_LIMIT
+                ),
+            )
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
 
-            transactions = []
-            if user.wallet.transactionIds:
-                pipeline = [
-                    {"$match": {"_id": {"$in": user.wallet.transactionIds}}},
-                    {"$sort": {"date": -1}},
-                    {"$limit": 50},
-                    {
-                        "$project": {
-                            "_id": {"$toString": "$_id"},
-                            "userId": {"$toString": "$userId"},
-                            "amount": 1,
-                            "type": 1,
-                            "status": 1,
-                            "description": 1,
-                            "paymentMethod": 1,
-                            "currency": 1,
-                            "date": {
-                                "$dateToString": {
-                                    "format": "%Y-%m-%dT%H:%M:%S.%LZ",
-                                    "date": "$date",
-                                }
-                            },
-                            "createdAt": {
-                                "$dateToString": {
-                                    "format": "%Y-%m-%dT%H:%M:%S.%LZ",
-                                    "date": "$createdAt",
-                                }
-                            },
-                            "updatedAt": {
-                                "$dateToString": {
-                                    "format": "%Y-%m-%dT%H:%M:%S.%LZ",
-                                    "date": "$updatedAt",
-                                }
-                            },
-                        }
-                    },
-                ]
-
-                transactions_cursor = Transaction.aggregate(pipeline)
-                transactions = await transactions_cursor.to_list(length=50)
-
             response_data = {
                 "success": True,
                 "balance": user.wallet.balance,
                 "transactions": transactions,
             }
-
-            await redis_client.set(wallet_key, json.dumps(response_data), ex=3600)
-            logger.info("Данные кошелька сохранены в Redis")
-
             return response_data
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error getting wallet data: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
 
+    @staticmethod
+    async def get_transactions(
+        current_user: Union[UserAccountView, TokenPrincipal],
+        before: Optional[str] = None,
+        limit: int = WALLET_TRANSACTIONS_LIMIT,
+        type: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        **История транзакций пользователя постранично.**
+        Страницы отсчитываются курсором (createdAt, _id) по индексу
+        userId_1_createdAt_-1__id_-1, поэтому время ответа не зависит от глубины.
+        **Параметры:**
+        - `before`: Курсор `nextCursor` предыдущей страницы (без него - первая).
+        - `limit`: Размер страницы.
+        - `type`, `status`: Необязательные фильтры по типу и статусу.
+        **Возвращает:**
+        - `transactions`: Транзакции от новых к старым.
+        - `nextCursor`: Курсор следующей страницы или None, если она последняя.
+        """
+        query = ledger_filter(current_user.id)
+        if before:
+            query.update(after_cursor(before))
+        if type:
+            query["type"] = type
+        if status:
+            query["status"] = status
+        try:
+            collection = await read_collection(Transaction, current_user.id)
+            # Лишняя запись показывает, есть ли следующая страница
+            transactions = await collection.aggregate(
+                [
+                    {"$match": query},
+                    {"$sort": dict(LEDGER_SORT)},
+                    {"$limit": limit + 1},
+                    {"$project": TRANSACTION_PROJECTION},
+                ]
+            ).to_list(length=limit + 1)
+        except Exception as e:
+            logger.error(f"Error getting transactions: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            last = transactions[-1]
+            # createdAt пуст у старых транзакций, не прошедших миграцию
+            created_at = (
+                datetime.strptime(last["createdAt"], "%Y-%m-%dT%H:%M:%S.%fZ")
+                if last.get("createdAt")
+                else None
+            )
+            next_cursor = encode_cursor(created_at, last["_id"])
+        return {
+            "success": True,
+            "transactions": transactions,
+            "nextCursor": next_cursor,
+        }
+
+    @staticmethod
+    async def update_cached_wallet(
+        user: User,
+        transaction: Transaction,
+        previous_transaction_id: Optional[str],
+        include_user_data: bool = True,
+    ) -> None:
+        """
+        **Write-through обновление кэша кошелька после зафиксированной операции.**
+        Вместо удаления `wallet_data:{id}` (и `user_data:{id}`) в закэшированный
+        ответ подставляется новый баланс, транзакция добавляется в начало
+        списка, список обрезается до 50 записей. Если кэш не соответствует
+        состоянию до операции, ключ удаляется.
+        **Параметры:**
+        - `user`: Пользователь после операции (нужен баланс).
+        - `transaction`: Созданная транзакция.
+        - `previous_transaction_id`: Последняя транзакция пользователя до операции.
+        - `include_user_data`: Обновлять ли также `user_data:{id}`.
+        """
+        previous_id = previous_transaction_id
+        balance = user.wallet.balance
+        expected_balance = balance - transaction.amount
+
+        wallet_entry = {
+            "_id": str(transaction.id),
+            "userId": str(transaction.userId),
+            "amount": transaction.amount,
+            "type": transaction.type,
+            "status": transaction.status,
+            "description": transaction.description,
+            "paymentMethod": transaction.paymentMethod,
+            "currency": transaction.currency,
+            "date": _format_mongo_date(transaction.date),
+            "createdAt": _format_mongo_date(transaction.createdAt),
+            "updatedAt": _format_mongo_date(transaction.updatedAt),
+        }
+
+        def patch_wallet(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            transactions = data.get("transactions", [])
+            if not _matches_previous_state(
+                data.get("balance", 0),
+                transactions,
+                "_id",
+                expected_balance,
+                previous_id,
+            ):
+                return None
+            return {
+                **data,
+                "balance": balance,
+                "transactions": [wallet_entry, *transactions][
+                    :WALLET_TRANSACTIONS_LIMIT
+                ],
+            }
+
+        def patch_user(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            wallet = data.get("user", {}).get("wallet")
+            if wallet is None:
+                return None
+            transactions = wallet.get("transactions", [])
+            if not _matches_previous_state(
+                wallet.get("balance", 0),
+                transactions,
+                "id",
+                expected_balance,
+                previous_id,
+            ):
+                return None
+            entry = {
+                "id": str(transaction.id),
+                "amount": transaction.amount,
+                "type": transaction.type,
+                "date": _as_stored(transaction.date).isoformat(),
+                "description": transaction.description,
+            }
+            return {
+                **data,
+                "user": {
+                    **data["user"],
+                    "wallet": {
+                        **wallet,
+                        "balance": balance,
+                        "transactions": [entry, *transactions][
+                            :WALLET_TRANSACTIONS_LIMIT
+                        ],
+                    },
+                },
+            }
+
+        await patch_cached(cache_key("wallet_data", user.id), patch_wallet)
+        if include_user_data:
+            await patch_cached(cache_key("user_data", user.id), patch_user)
+
     @staticmethod
     async def deposit_wallet(
         request_data: DepositWalletRequest,
-        current_user: User = Depends(get_current_user),
+        current_user: UserAccountView = Depends(get_current_user),
     ) -> Dict[str, Any]:
         """
         **Эндпоинт для пополнения кошелька пользователя.**
@@ -136,17 +347,15 @@ class WalletService:
                             updatedAt=now_utc,
                         )
 
+                        previous_transaction_id = await latest_transaction_id(
+                            current_user.id, session=session
+                        )
                         inserted_transaction = await Transaction.insert_one(
                             transaction_data, session=session
                         )
 
                         await User.find_one(User.id == current_user.id).update(
-                            {
-                                "$inc": {"wallet.balance": request_data.amount},
-                                "$push": {
-                                    "wallet.transactionIds": inserted_transaction.id
-                                },
-                            },
+                            {"$inc": {"wallet.balance": request_data.amount}},
                             session=session,
                         )
 
@@ -222,11 +431,14 @@ class WalletService:
                             status_code=status.HTTP_400_BAD_REQUEST, detail=str(err)
                         )
             try:
-                await delete_redis_cache(f"wallet_data:{current_user.id}")
-                await delete_redis_cache(f"user_data:{current_user.id}")
+                await pin_primary_reads(current_user.id)
+                await invalidate_principal(current_user.id)
+                await WalletService.update_cached_wallet(
+                    updated_user, inserted_transaction, previous_transaction_id
+                )
             except Exception as cache_err:
                 logger.warning(
-                    f"Failed to delete Redis cache for user {current_user.id}: {cache_err}",
+                    f"Failed to update Redis cache for user {current_user.id}: {cache_err}",
                     exc_info=True,
                 )
             return {
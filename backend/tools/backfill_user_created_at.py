@@ -0,0 +1,95 @@
+"""
+Заполнение createdAt у старых пользователей для списка пользователей админки:
+страницы списка - диапазоны по индексу createdAt_-1__id_-1 (backend.core.keyset),
+и пользователи без createdAt иначе оказываются в конце списка, вне порядка
+регистрации.
+
+Шаги (каждый идет пачками по _id и запоминает прогресс в коллекции
+migrations, поэтому прерванную миграцию можно просто запустить снова):
+  index     - создает индекс createdAt_-1__id_-1, если его нет;
+  backfill  - заполняет пустой createdAt временем создания _id
+              (ObjectId.generation_time), пустой updatedAt - тем же значением.
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend):
+    python -m backend.tools.backfill_user_created_at [--batch 1000] [--rebuild]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from backend.core.config import MONGO_URI, MONGO_DB_NAME, logger
+from backend.core.database import mongo_client_options
+from backend.models.user import User
+from backend.tools.checkpoints import in_batches, reset_step
+
+MIGRATION_ID = "user_created_at"
+USERS_LIST_INDEX = "createdAt_-1__id_-1"
+
+
+async def ensure_index(db: AsyncIOMotorDatabase) -> None:
+    await db.users.create_indexes(
+        [
+            index
+            for index in User.Settings.indexes
+            if index.document["name"] == USERS_LIST_INDEX
+        ]
+    )
+    logger.info(f"index: {USERS_LIST_INDEX} на месте")
+
+
+async def backfill_created_at(db: AsyncIOMotorDatabase, batch: int) -> int:
+    async def apply(docs):
+        updates = []
+        for doc in docs:
+            created_at = doc["_id"].generation_time
+            fields = {"createdAt": created_at}
+            if doc.get("updatedAt") is None:
+                fields["updatedAt"] = created_at
+            updates.append(
+                UpdateOne({"_id": doc["_id"], "createdAt": None}, {"$set": fields})
+            )
+        if updates:
+            await db.users.bulk_write(updates, ordered=False)
+
+    return await in_batches(
+        db,
+        MIGRATION_ID,
+        "backfill",
+        db.users,
+        {"createdAt": None},
+        {"updatedAt": 1},
+        batch,
+        apply,
+    )
+
+
+async def main(args) -> int:
+    client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options(minPoolSize=0))
+    db = client[args.database]
+    try:
+        if args.rebuild:
+            await reset_step(db, MIGRATION_ID, "backfill")
+        await ensure_index(db)
+        fixed = await backfill_created_at(db, args.batch)
+        logger.info(f"backfill: пользователей обработано {fixed}")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--database", default=MONGO_DB_NAME)
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="пройти пользователей без createdAt заново, не продолжая прошлый запуск",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
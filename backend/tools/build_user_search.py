@@ -0,0 +1,130 @@
+"""
+Подготовка поиска пользователей в админке (backend.core.user_search) для уже
+существующих пользователей. Новые и измененные пользователи попадают в поиск
+при записи, этот инструмент нужен один раз после выкатки и для перестройки.
+
+Шаги (каждый идет пачками по _id и запоминает прогресс в коллекции
+migrations, поэтому прерванный запуск можно просто повторить):
+  index      - создает индексы usernameLower_1, emailLower_1 и индексы
+               коллекции usertrigrams;
+  normalize  - заполняет usernameLower/emailLower;
+  trigrams   - перестраивает триграммы пользователей в usertrigrams.
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend):
+    python -m backend.tools.build_user_search [--batch 1000] [--rebuild]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from backend.core.config import MONGO_URI, MONGO_DB_NAME, logger
+from backend.core.database import mongo_client_options
+from backend.models.user import User
+from backend.models.user_trigram import (
+    UserTrigram,
+    normalize_search_value,
+    search_trigrams,
+)
+from backend.tools.checkpoints import in_batches, reset_step
+
+MIGRATION_ID = "user_search"
+STEPS = ("normalize", "trigrams")
+USER_SEARCH_INDEXES = ("usernameLower_1", "emailLower_1")
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    await db.users.create_indexes(
+        [
+            index
+            for index in User.Settings.indexes
+            if index.document["name"] in USER_SEARCH_INDEXES
+        ]
+    )
+    await db[UserTrigram.Settings.name].create_indexes(UserTrigram.Settings.indexes)
+    logger.info("index: индексы поиска пользователей на месте")
+
+
+async def normalize_users(db: AsyncIOMotorDatabase, batch: int) -> int:
+    async def apply(docs):
+        updates = []
+        for doc in docs:
+            fields = {
+                "usernameLower": normalize_search_value(doc.get("username")),
+                "emailLower": normalize_search_value(doc.get("email")),
+            }
+            if any(doc.get(name) != value for name, value in fields.items()):
+                updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        if updates:
+            await db.users.bulk_write(updates, ordered=False)
+
+    return await in_batches(
+        db,
+        MIGRATION_ID,
+        "normalize",
+        db.users,
+        {},
+        {"username": 1, "email": 1, "usernameLower": 1, "emailLower": 1},
+        batch,
+        apply,
+    )
+
+
+async def build_trigrams(db: AsyncIOMotorDatabase, batch: int) -> int:
+    trigrams = db[UserTrigram.Settings.name]
+
+    async def apply(docs):
+        # Удаление перед вставкой делает пачку идемпотентной при повторе
+        await trigrams.delete_many({"userId": {"$in": [doc["_id"] for doc in docs]}})
+        rows = [
+            {"userId": doc["_id"], "trigram": gram}
+            for doc in docs
+            for gram in search_trigrams(doc.get("username"), doc.get("email"))
+        ]
+        if rows:
+            await trigrams.insert_many(rows, ordered=False)
+
+    return await in_batches(
+        db,
+        MIGRATION_ID,
+        "trigrams",
+        db.users,
+        {},
+        {"username": 1, "email": 1},
+        batch,
+        apply,
+    )
+
+
+async def main(args) -> int:
+    client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options(minPoolSize=0))
+    db = client[args.database]
+    try:
+        if args.rebuild:
+            for step in STEPS:
+                await reset_step(db, MIGRATION_ID, step)
+        await ensure_indexes(db)
+        normalized = await normalize_users(db, args.batch)
+        logger.info(f"normalize: пользователей обработано {normalized}")
+        indexed = await build_trigrams(db, args.batch)
+        logger.info(f"trigrams: пользователей обработано {indexed}")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--database", default=MONGO_DB_NAME)
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="пройти всех пользователей заново, не продолжая прошлый запуск",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
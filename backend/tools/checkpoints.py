@@ -0,0 +1,85 @@
+"""
+Пакетный проход по коллекции с сохранением прогресса в коллекции migrations:
+прерванную миграцию можно запустить снова, и она продолжит с последней пачки.
+"""
+
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from backend.core.config import logger
+
+
+async def _step_state(db: AsyncIOMotorDatabase, migration_id: str, step: str) -> dict:
+    state = await db.migrations.find_one({"_id": migration_id}) or {}
+    return state.get("steps", {}).get(step, {})
+
+
+async def _save_checkpoint(
+    db: AsyncIOMotorDatabase,
+    migration_id: str,
+    step: str,
+    last_id: Optional[ObjectId],
+    done: bool,
+) -> None:
+    await db.migrations.update_one(
+        {"_id": migration_id},
+        {
+            "$set": {
+                f"steps.{step}.lastId": last_id,
+                f"steps.{step}.done": done,
+                "updatedAt": datetime.now(timezone.utc),
+            }
+        },
+        upsert=True,
+    )
+
+
+async def reset_step(db: AsyncIOMotorDatabase, migration_id: str, step: str) -> None:
+    """Сбрасывает прогресс шага, чтобы пройти коллекцию заново."""
+    await db.migrations.update_one(
+        {"_id": migration_id}, {"$unset": {f"steps.{step}": ""}}
+    )
+
+
+async def in_batches(
+    db: AsyncIOMotorDatabase,
+    migration_id: str,
+    step: str,
+    collection: AsyncIOMotorCollection,
+    query: dict,
+    projection: dict,
+    batch: int,
+    apply: Callable[[List[dict]], Awaitable[None]],
+) -> int:
+    """
+    Проходит документы `query` по возрастанию _id пачками по `batch`, вызывает
+    `apply(docs)` и после каждой пачки сохраняет последний _id.
+    """
+    state = await _step_state(db, migration_id, step)
+    if state.get("done"):
+        logger.info(f"{step}: уже выполнен")
+        return 0
+    last_id = state.get("lastId")
+    processed = 0
+    while True:
+        page_query = dict(query)
+        if last_id is not None:
+            page_query["_id"] = {"$gt": last_id}
+        docs = (
+            await collection.find(page_query, projection)
+            .sort("_id", 1)
+            .limit(batch)
+            .to_list(length=batch)
+        )
+        if not docs:
+            break
+        await apply(docs)
+        last_id = docs[-1]["_id"]
+        processed += len(docs)
+        await _save_checkpoint(db, migration_id, step, last_id, done=False)
+        logger.info(f"{step}: обработано {processed}, последний _id {last_id}")
+    await _save_checkpoint(db, migration_id, step, last_id, done=True)
+    return processed
@@ -0,0 +1,141 @@
+"""
+Миграция кошелька на журнал транзакций: последние транзакции пользователя
+читаются из коллекции transactions по индексу userId_1_createdAt_-1__id_-1,
+а не по массиву User.wallet.transactionIds.
+
+Шаги (каждый идет пачками по _id и запоминает прогресс в коллекции
+migrations, поэтому прерванную миграцию можно просто запустить снова):
+  index       - создает индекс userId_1_createdAt_-1__id_-1, если его нет, и
+                удаляет ставшие лишними префиксные индексы userId_1 и
+                userId_1_createdAt_-1 (под любым именем);
+  backfill    - приводит userId транзакций к ObjectId и заполняет пустой
+                createdAt значением date, чтобы транзакция попала в индекс;
+  drop-array  - удаляет wallet.transactionIds у пользователей (только с
+                флагом --drop-array, после выкатки кода, не читающего массив).
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend):
+    python -m backend.tools.migrate_wallet_ledger [--batch 1000] [--drop-array]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import IndexModel, UpdateOne
+
+from backend.core.config import MONGO_URI, MONGO_DB_NAME, logger
+from backend.core.database import mongo_client_options
+from backend.tools.checkpoints import in_batches
+
+MIGRATION_ID = "wallet_ledger"
+LEDGER_INDEX = IndexModel(
+    [("userId", 1), ("createdAt", -1), ("_id", -1)],
+    name="userId_1_createdAt_-1__id_-1",
+    background=True,
+)
+# Префиксы LEDGER_INDEX: после его создания только замедляют запись
+REDUNDANT_INDEX_KEYS = (
+    [("userId", 1)],
+    [("userId", 1), ("createdAt", -1)],
+)
+
+
+async def ensure_index(db: AsyncIOMotorDatabase) -> None:
+    await db.transactions.create_indexes([LEDGER_INDEX])
+    logger.info("index: userId_1_createdAt_-1__id_-1 на месте")
+    existing = await db.transactions.index_information()
+    for name, info in existing.items():
+        if list(info["key"]) in REDUNDANT_INDEX_KEYS and not info.get("unique"):
+            await db.transactions.drop_index(name)
+            logger.info(f"index: лишний индекс {name} удален")
+
+
+async def backfill_transactions(db: AsyncIOMotorDatabase, batch: int) -> int:
+    async def apply(docs):
+        updates = []
+        for doc in docs:
+            fields = {}
+            user_id = doc.get("userId")
+            if isinstance(user_id, str):
+                if not ObjectId.is_valid(user_id):
+                    logger.warning(
+                        f"backfill: транзакция {doc['_id']} с некорректным "
+                        f"userId {user_id!r} пропущена"
+                    )
+                else:
+                    fields["userId"] = ObjectId(user_id)
+            if doc.get("createdAt") is None and doc.get("date") is not None:
+                fields["createdAt"] = doc["date"]
+            if fields:
+                updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        if updates:
+            await db.transactions.bulk_write(updates, ordered=False)
+
+    return await in_batches(
+        db,
+        MIGRATION_ID,
+        "backfill",
+        db.transactions,
+        {"$or": [{"userId": {"$type": "string"}}, {"createdAt": None}]},
+        {"userId": 1, "date": 1, "createdAt": 1},
+        batch,
+        apply,
+    )
+
+
+async def drop_transaction_ids(db: AsyncIOMotorDatabase, batch: int) -> int:
+    async def apply(docs):
+        await db.users.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in docs]}},
+            {"$unset": {"wallet.transactionIds": ""}},
+        )
+
+    return await in_batches(
+        db,
+        MIGRATION_ID,
+        "drop-array",
+        db.users,
+        {"wallet.transactionIds": {"$exists": True}},
+        {"_id": 1},
+        batch,
+        apply,
+    )
+
+
+async def main(args) -> int:
+    client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options(minPoolSize=0))
+    db = client[args.database]
+    try:
+        await ensure_index(db)
+        fixed = await backfill_transactions(db, args.batch)
+        logger.info(f"backfill: транзакций обработано {fixed}")
+        if args.drop_array:
+            dropped = await drop_transaction_ids(db, args.batch)
+            logger.info(f"drop-array: пользователей обработано {dropped}")
+        else:
+            left = await db.users.count_documents(
+                {"wallet.transactionIds": {"$exists": True}}
+            )
+            logger.info(
+                f"drop-array пропущен: массив wallet.transactionIds есть у {left} "
+                "пользователей, запустите с --drop-array после выкатки"
+            )
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--database", default=MONGO_DB_NAME)
+    parser.add_argument(
+        "--drop-array",
+        action="store_true",
+        help="удалить wallet.transactionIds у пользователей",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
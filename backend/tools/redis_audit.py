@@ -0,0 +1,217 @@
+"""
+Аудит пространства ключей Redis: проходит ключи через SCAN пачками,
+группирует их по пространствам имен сервисов и выводит количество ключей,
+суммарный и p50/p99 объем памяти (MEMORY USAGE), распределение TTL
+и ключи без TTL. Нужен для оценки размера инстанса и поиска
+"протекающих" пространств до того, как Redis упрется в maxmemory.
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend):
+    python -m backend.tools.redis_audit [--match 'u:*'] [--batch 1000] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict, List, Optional
+
+import redis.asyncio as redis
+
+from backend.core.config import REDIS_URL, REDIS_CLUSTER
+from backend.core.redis_client import (
+    USER_KEY_SUFFIXES,
+    create_cluster_client,
+    key_family,
+)
+
+# Верхние границы корзин TTL в секундах
+TTL_BUCKETS = (
+    ("<1m", 60),
+    ("1m-10m", 600),
+    ("10m-1h", 3600),
+    ("1h-1d", 86400),
+    (">1d", None),
+)
+NO_TTL = "no ttl"
+# Сколько ключей без TTL показывать примерами для каждого пространства
+NO_TTL_EXAMPLES = 5
+
+
+def key_namespace(key: str) -> str:
+    """
+    Пространство имен ключа: `u:{<id>}:data` -> `user_data`,
+    `{plans}:v:3` -> `{plans}`, `lock:u:{<id>}:data` -> `lock:user_data`.
+    Ключи пользователя в старом формате (`user_data:<id>`) выделяются
+    отдельно, чтобы было видно, сколько их осталось после миграции имен.
+    """
+    if key.startswith("lock:"):
+        return f"lock:{key_namespace(key[len('lock:'):])}"
+    family = key_family(key)
+    if family in USER_KEY_SUFFIXES and not key.startswith("u:"):
+        return f"{family} (legacy)"
+    return family
+
+
+def _ttl_bucket(pttl_ms: int) -> str:
+    if pttl_ms < 0:
+        return NO_TTL
+    for label, bound in TTL_BUCKETS:
+        if bound is None or pttl_ms < bound * 1000:
+            return label
+    return TTL_BUCKETS[-1][0]
+
+
+def _percentile(values: List[int], percent: float) -> int:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class NamespaceStats:
+    __slots__ = ("keys", "memory", "ttl", "no_ttl_examples")
+
+    def __init__(self):
+        self.keys = 0
+        self.memory: List[int] = []
+        self.ttl: Dict[str, int] = {}
+        self.no_ttl_examples: List[str] = []
+
+    def add(self, key: str, memory: Optional[int], pttl_ms: int) -> None:
+        self.keys += 1
+        if memory is not None:
+            self.memory.append(memory)
+        bucket = _ttl_bucket(pttl_ms)
+        self.ttl[bucket] = self.ttl.get(bucket, 0) + 1
+        if bucket == NO_TTL and len(self.no_ttl_examples) < NO_TTL_EXAMPLES:
+            self.no_ttl_examples.append(key)
+
+    def to_dict(self) -> dict:
+        return {
+            "keys": self.keys,
+            "memory_bytes": sum(self.memory),
+            "memory_p50_bytes": _percentile(self.memory, 50),
+            "memory_p99_bytes": _percentile(self.memory, 99),
+            "ttl": {
+                label: self.ttl.get(label, 0)
+                for label in [label for label, _ in TTL_BUCKETS] + [NO_TTL]
+            },
+            "no_ttl_keys": self.ttl.get(NO_TTL, 0),
+            "no_ttl_examples": self.no_ttl_examples,
+        }
+
+
+async def _inspect_batch(client, keys: List[str], stats: Dict[str, NamespaceStats]):
+    async with client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.memory_usage(key)
+            pipe.pttl(key)
+        results = await pipe.execute(raise_on_error=False)
+
+    for index, key in enumerate(keys):
+        memory, pttl = results[2 * index], results[2 * index + 1]
+        # Ключ истек или удален между SCAN и проверкой
+        if isinstance(pttl, Exception) or pttl == -2:
+            continue
+        if isinstance(memory, Exception):
+            memory = None
+        stats.setdefault(key_namespace(key), NamespaceStats()).add(key, memory, pttl)
+
+
+async def audit(
+    client, match: Optional[str], batch: int, pause: float
+) -> Dict[str, dict]:
+    stats: Dict[str, NamespaceStats] = {}
+    keys: List[str] = []
+    async for key in client.scan_iter(match=match, count=batch):
+        keys.append(key)
+        if len(keys) >= batch:
+            await _inspect_batch(client, keys, stats)
+            keys = []
+            if pause:
+                await asyncio.sleep(pause)
+    if keys:
+        await _inspect_batch(client, keys, stats)
+
+    return {
+        namespace: data.to_dict()
+        for namespace, data in sorted(
+            stats.items(), key=lambda item: sum(item[1].memory), reverse=True
+        )
+    }
+
+
+def _format_bytes(value: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GiB"
+
+
+def print_table(report: Dict[str, dict]) -> None:
+    ttl_labels = [label for label, _ in TTL_BUCKETS] + [NO_TTL]
+    header = (
+        f"{'пространство':<28} {'ключей':>8} {'память':>10} {'p50':>9} {'p99':>9} "
+        + " ".join(f"{label:>8}" for label in ttl_labels)
+    )
+    print(header)
+    print("-" * len(header))
+    for namespace, data in report.items():
+        print(
+            f"{namespace:<28} {data['keys']:>8} "
+            f"{_format_bytes(data['memory_bytes']):>10} "
+            f"{_format_bytes(data['memory_p50_bytes']):>9} "
+            f"{_format_bytes(data['memory_p99_bytes']):>9} "
+            + " ".join(f"{data['ttl'][label]:>8}" for label in ttl_labels)
+        )
+    print("-" * len(header))
+    print(
+        f"{'всего':<28} {sum(d['keys'] for d in report.values()):>8} "
+        f"{_format_bytes(sum(d['memory_bytes'] for d in report.values())):>10}"
+    )
+
+    leaking = {ns: d for ns, d in report.items() if d["no_ttl_keys"]}
+    if leaking:
+        print("\nКлючи без TTL:")
+        for namespace, data in leaking.items():
+            examples = ", ".join(data["no_ttl_examples"])
+            print(f"  {namespace}: {data['no_ttl_keys']} (например: {examples})")
+
+
+async def main(args) -> int:
+    if REDIS_CLUSTER:
+        client = create_cluster_client()
+        await client.initialize()
+    else:
+        client = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        report = await audit(client, args.match, args.batch, args.pause)
+    finally:
+        await client.aclose()
+
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_table(report)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--match", default=None, help="шаблон ключей для SCAN MATCH")
+    parser.add_argument(
+        "--batch", type=int, default=1000, help="ключей за один SCAN и pipeline"
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=0.0,
+        help="пауза между пачками в секундах, чтобы не нагружать инстанс",
+    )
+    parser.add_argument("--json", action="store_true", help="вывод в JSON")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,184 @@
+"""
+Поиск пользователей в админке до и после нормализованных полей:
+  до       - $regex с $options "i" по email и username (подсчет и страница);
+  prefix   - AdminUserService.get_admin_users(mode="prefix");
+  contains - AdminUserService.get_admin_users(mode="contains");
+  fuzzy    - AdminUserService.get_admin_users(mode="fuzzy"), запрос с опечаткой.
+Для regex-запросов печатает просмотренные ключи и документы (explain), для
+всех - задержки p50/p99.
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend). Данные
+создаются в отдельной базе `<MONGO_DB_NAME>_benchmark` и удаляются после
+замера; заполнение 5M пользователей занимает время:
+    python -m benchmarks.admin_search [--users 5000000] [--iterations 50]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+import bson
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core.config import MONGO_URI, MONGO_DB_NAME
+from backend.core.database import mongo_client_options
+from backend.core.user_search import search_query
+from backend.models.user import User
+from backend.models.user_trigram import (
+    UserTrigram,
+    normalize_search_value,
+    search_trigrams,
+)
+from backend.services.admin_user_service import AdminUserService
+
+INSERT_BATCH = 10000
+PAGE_LIMIT = 25
+# fmt: off
+SYLLABLES = (
+    "al", "ek", "san", "dr", "bo", "ris", "vla", "di", "mir", "ka", "te", "ri",
+    "na", "ol", "ga", "ser", "gei", "ma", "sha", "pa", "vel", "yu", "lia", "an",
+)
+# fmt: on
+
+
+def _percentile(values: list, percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+async def _seed(db, users: int, rng: random.Random) -> tuple:
+    now = datetime.now(timezone.utc)
+    first_id = last_id = None
+    names = []
+    for offset in range(0, users, INSERT_BATCH):
+        batch, grams = [], []
+        for index in range(offset, min(offset + INSERT_BATCH, users)):
+            name = _name(rng)
+            email = f"{name}{index}@example.com"
+            user_id = bson.ObjectId()
+            batch.append(
+                {
+                    "_id": user_id,
+                    "username": name.capitalize(),
+                    "email": email,
+                    "usernameLower": normalize_search_value(name),
+                    "emailLower": normalize_search_value(email),
+                    "password": "x",
+                    "role": "user",
+                    "wallet": {"balance": 0.0},
+                    "createdAt": now,
+                    "updatedAt": now,
+                }
+            )
+            grams.extend(
+                {"userId": user_id, "trigram": gram}
+                for gram in search_trigrams(name, email)
+            )
+            if len(names) < 100:
+                names.append(name)
+        await db.users.insert_many(batch, ordered=False)
+        await db.usertrigrams.insert_many(grams, ordered=False)
+        first_id = first_id or batch[0]["_id"]
+        last_id = batch[-1]["_id"]
+    return first_id, last_id, names
+
+
+def _legacy_query(search: str) -> dict:
+    return {
+        "$or": [
+            {"email": {"$regex": search, "$options": "i"}},
+            {"username": {"$regex": search, "$options": "i"}},
+        ]
+    }
+
+
+async def _explain(db, query: dict) -> dict:
+    explained = await db.command(
+        "explain",
+        {"find": "users", "filter": query, "limit": PAGE_LIMIT},
+        verbosity="executionStats",
+    )
+    stats = explained.get("executionStats", {})
+    return {
+        "keys": stats.get("totalKeysExamined", "-"),
+        "docs": stats.get("totalDocsExamined", "-"),
+    }
+
+
+async def main(users: int, iterations: int, database: str) -> None:
+    client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options(minPoolSize=0))
+    db = client[database]
+    await init_beanie(database=db, document_models=[User, UserTrigram])
+    rng = random.Random(42)
+    first_id, last_id, names = await _seed(db, users, rng)
+
+    target = rng.choice(names)
+    typo = target[:2] + target[3] + target[2] + target[4:]
+    middle = target[1:4]
+
+    async def legacy():
+        query = _legacy_query(target[:4].upper())
+        return await asyncio.gather(
+            db.users.count_documents(query),
+            db.users.find(query).limit(PAGE_LIMIT).to_list(length=PAGE_LIMIT),
+        )
+
+    def service(search: str, mode: str):
+        return lambda: AdminUserService.get_admin_users(
+            page=1, limit=PAGE_LIMIT, search=search, mode=mode
+        )
+
+    scenarios = [
+        ("до ($regex i)", legacy, _legacy_query(target[:4].upper())),
+        ("prefix", service(target[:4].upper(), "prefix"), search_query(target[:4])),
+        ("contains", service(middle, "contains"), search_query(middle, "contains")),
+        ("fuzzy", service(typo, "fuzzy"), None),
+    ]
+    header = (
+        f"{'поиск':<16} {'ключей':>10} {'докум.':>10} {'p50, мс':>8} {'p99, мс':>8}"
+    )
+    print(f"users={users}, iterations={iterations}, запрос={target!r}")
+    print(header)
+    print("-" * len(header))
+    try:
+        for label, fetch, query in scenarios:
+            explained = (
+                await _explain(db, query) if query else {"keys": "-", "docs": "-"}
+            )
+            await fetch()
+            latencies = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                await fetch()
+                latencies.append(time.perf_counter() - started)
+            print(
+                f"{label:<16} {explained['keys']:>10} {explained['docs']:>10} "
+                f"{statistics.median(latencies) * 1000:>8.2f} "
+                f"{_percentile(latencies, 99) * 1000:>8.2f}"
+            )
+    finally:
+        if first_id is not None:
+            ids = {"$gte": first_id, "$lte": last_id}
+            await db.usertrigrams.delete_many({"userId": ids})
+            await db.users.delete_many({"_id": ids})
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=5000000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--database", default=f"{MONGO_DB_NAME or 'test'}_benchmark")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.iterations, args.database))
@@ -0,0 +1,208 @@
+"""
+Список пользователей админки до и после отказа от $lookup:
+  до    - $lookup в subscriptionplans для каждого пользователя, $addFields с
+          $arrayElemAt и план из результата агрегации;
+  после - только $project нужных полей и план из каталога в памяти процесса
+          (backend.services.admin_user_service.ADMIN_USER_STAGES).
+Замеряются страница списка (--page) и выгрузка (--rows) от новых к старым:
+байты ответа MongoDB на строку и задержки p50/p99.
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend). Данные
+создаются в отдельной базе `<MONGO_DB_NAME>_benchmark` и удаляются после замера:
+    python -m benchmarks.admin_user_list [--users 1000000] [--iterations 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core.config import MONGO_URI, MONGO_DB_NAME
+from backend.core.database import mongo_client_options
+from backend.core.keyset import KEYSET_SORT
+from backend.core.plan_catalog import CatalogPlan, PlanCatalog
+from backend.services.admin_user_service import ADMIN_USER_STAGES, _admin_user_dict
+
+INSERT_BATCH = 10000
+PLANS = (("Базовый", 0), ("Стандарт", 399), ("Популярный", 899), ("Про", 1499))
+
+LEGACY_STAGES = [
+    {
+        "$lookup": {
+            "from": "subscriptionplans",
+            "localField": "currentSubscription.planId",
+            "foreignField": "_id",
+            "as": "currentSubscription.plan",
+        }
+    },
+    {
+        "$addFields": {
+            "currentSubscription.plan": {
+                "$cond": {
+                    "if": {"$isArray": "$currentSubscription.plan"},
+                    "then": {"$arrayElemAt": ["$currentSubscription.plan", 0]},
+                    "else": None,
+                }
+            },
+            "wallet": {"$ifNull": ["$wallet", {"balance": 0, "transactions": []}]},
+        }
+    },
+    {
+        "$project": {
+            "_id": 1,
+            "username": 1,
+            "email": 1,
+            "currentSubscription": 1,
+            "wallet.balance": 1,
+            "createdAt": 1,
+        }
+    },
+]
+EMPTY_CATALOG = PlanCatalog(0, ())
+
+
+def _legacy_row(user: dict) -> dict:
+    row = _admin_user_dict(user, EMPTY_CATALOG)
+    plan = (user.get("currentSubscription") or {}).get("plan")
+    if row["currentSubscription"] and plan:
+        row["currentSubscription"]["plan"] = {
+            "_id": str(plan["_id"]),
+            "name": plan.get("name"),
+            "price": plan.get("price"),
+            "features": plan.get("features", []),
+        }
+    return row
+
+
+def _percentile(values: list, percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _seed(db, users: int) -> tuple:
+    now = datetime.now(timezone.utc)
+    plans = [
+        {
+            "_id": bson.ObjectId(),
+            "name": name,
+            "price": price,
+            "renewalPeriod": 30,
+            "features": [f"{name}: возможность {i}" for i in range(5)],
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        for name, price in PLANS
+    ]
+    await db.subscriptionplans.insert_many(plans)
+    first_id = last_id = None
+    for offset in range(0, users, INSERT_BATCH):
+        batch = []
+        for index in range(offset, min(offset + INSERT_BATCH, users)):
+            created = now - timedelta(seconds=users - index)
+            batch.append(
+                {
+                    "_id": bson.ObjectId(),
+                    "username": f"user{index}",
+                    "email": f"user{index}@example.com",
+                    "password": "$2b$12$" + "x" * 53,
+                    "role": "user",
+                    "currentSubscription": {
+                        "planId": plans[index % len(plans)]["_id"],
+                        "startDate": created,
+                        "endDate": created + timedelta(days=30),
+                        "isActive": True,
+                        "autoRenew": True,
+                    },
+                    "wallet": {"balance": float(index % 1000)},
+                    "createdAt": created,
+                    "updatedAt": created,
+                }
+            )
+        await db.users.insert_many(batch, ordered=False)
+        first_id = first_id or batch[0]["_id"]
+        last_id = batch[-1]["_id"]
+    catalog = PlanCatalog(
+        1,
+        [
+            CatalogPlan(
+                id=plan["_id"],
+                name=plan["name"],
+                price=plan["price"],
+                features=tuple(plan["features"]),
+            )
+            for plan in plans
+        ],
+    )
+    return first_id, last_id, [plan["_id"] for plan in plans], catalog
+
+
+async def main(users: int, iterations: int, page: int, rows: int, database: str):
+    client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options(minPoolSize=0))
+    db = client[database]
+    await db.users.create_index(
+        [("createdAt", -1), ("_id", -1)], name="createdAt_-1__id_-1"
+    )
+    first_id, last_id, plan_ids, catalog = await _seed(db, users)
+
+    def reader(stages, transform, limit):
+        async def read():
+            docs = await db.users.aggregate(
+                [{"$sort": dict(KEYSET_SORT)}, {"$limit": limit}, *stages]
+            ).to_list(length=None)
+            return docs, [transform(doc) for doc in docs]
+
+        return read
+
+    def enrich(user):
+        return _admin_user_dict(user, catalog)
+
+    scenarios = [
+        (f"до, {page} строк", reader(LEGACY_STAGES, _legacy_row, page)),
+        (f"после, {page} строк", reader(ADMIN_USER_STAGES, enrich, page)),
+        (f"до, {rows} строк", reader(LEGACY_STAGES, _legacy_row, rows)),
+        (f"после, {rows} строк", reader(ADMIN_USER_STAGES, enrich, rows)),
+    ]
+    header = f"{'список':<22} {'байт/строку':>12} {'p50, мс':>10} {'p99, мс':>10}"
+    print(f"users={users}, iterations={iterations}")
+    print(header)
+    print("-" * len(header))
+    try:
+        _, legacy_rows = await scenarios[0][1]()
+        _, rows_after = await scenarios[1][1]()
+        assert legacy_rows == rows_after, "строки списка до и после отличаются"
+        for label, read in scenarios:
+            docs, _ = await read()
+            latencies = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                await read()
+                latencies.append(time.perf_counter() - started)
+            per_row = sum(len(bson.encode(doc)) for doc in docs) / max(len(docs), 1)
+            print(
+                f"{label:<22} {per_row:>12.0f} "
+                f"{statistics.median(latencies) * 1000:>10.2f} "
+                f"{_percentile(latencies, 99) * 1000:>10.2f}"
+            )
+    finally:
+        ids = {"$gte": first_id, "$lte": last_id}
+        await db.users.delete_many({"_id": ids})
+        await db.subscriptionplans.delete_many({"_id": {"$in": plan_ids}})
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--page", type=int, default=25)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--database", default=f"{MONGO_DB_NAME or 'test'}_benchmark")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.iterations, args.page, args.rows, args.database))
@@ -0,0 +1,164 @@
+"""
+Сравнение кодеков кэша: размер значения и время кодирования/декодирования
+для типичных payload'ов (user_data, wallet_data, user_subscription,
+all_subscriptions_plans, plan:*).
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend):
+    python -m benchmarks.cache_codec [--iterations 2000]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from backend.core import cache_codec
+from backend.core.cache_codec import decode_value, encode_value
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _plan(name: str, price: float) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "_id": str(ObjectId()),
+        "name": name,
+        "price": price,
+        "renewalPeriod": 30,
+        "features": [f"Возможность {i} тарифа {name}" for i in range(6)],
+        "createdAt": _iso(now - timedelta(days=300)),
+        "updatedAt": _iso(now),
+    }
+
+
+def _transactions(count: int = 50) -> list:
+    now = datetime.now(timezone.utc)
+    user_id = str(ObjectId())
+    return [
+        {
+            "_id": str(ObjectId()),
+            "userId": user_id,
+            "amount": 100.0 + i,
+            "type": "deposit" if i % 3 else "subscription_purchase",
+            "status": "completed",
+            "description": f"Пополнение баланса на {100 + i} RUB",
+            "paymentMethod": "card",
+            "currency": "RUB",
+            "date": _iso(now - timedelta(hours=i)),
+            "createdAt": _iso(now - timedelta(hours=i)),
+            "updatedAt": _iso(now - timedelta(hours=i)),
+        }
+        for i in range(count)
+    ]
+
+
+def build_payloads() -> dict:
+    plans = [
+        _plan("Базовый", 0),
+        _plan("Популярный", 899),
+        _plan("Премиум", 1499),
+        _plan("Семейный", 1999),
+    ]
+    transactions = _transactions()
+    now = datetime.now(timezone.utc)
+    subscription = {
+        "planId": plans[1]["_id"],
+        "name": plans[1]["name"],
+        "startDate": now.isoformat(),
+        "endDate": (now + timedelta(days=30)).isoformat(),
+        "isActive": True,
+        "autoRenew": True,
+        "plan": {
+            "id": plans[1]["_id"],
+            "name": plans[1]["name"],
+            "price": plans[1]["price"],
+            "features": plans[1]["features"],
+            "renewalPeriod": 30,
+        },
+    }
+    return {
+        "user_data": {
+            "user": {
+                "id": str(ObjectId()),
+                "username": "user1",
+                "email": "user1@example.com",
+                "avatar": "/uploads/avatars/default.png",
+                "createdAt": now.isoformat(),
+                "wallet": {
+                    "balance": 1000.0,
+                    "transactions": [
+                        {
+                            "id": tx["_id"],
+                            "amount": tx["amount"],
+                            "type": tx["type"],
+                            "date": tx["date"],
+                            "description": tx["description"],
+                        }
+                        for tx in transactions
+                    ],
+                },
+                "subscription": {"currentPlan": subscription, "history": []},
+            }
+        },
+        "wallet_data": {
+            "success": True,
+            "balance": 1000.0,
+            "transactions": transactions,
+        },
+        "user_subscription": subscription,
+        "all_subscriptions_plans": plans,
+        "plan:*": plans[1],
+    }
+
+
+def _variants() -> list:
+    variants = [("stdlib json", None, None)]
+    codecs = ["json"] + (["msgpack"] if cache_codec.msgpack else [])
+    compressions = ["none", "zlib"] + (["zstd"] if cache_codec.zstandard else [])
+    for codec in codecs:
+        for compression in compressions:
+            variants.append((f"{codec}+{compression}", codec, compression))
+    return variants
+
+
+def run(iterations: int) -> None:
+    print(
+        f"orjson: {'да' if cache_codec.orjson else 'нет'}, "
+        f"msgpack: {'да' if cache_codec.msgpack else 'нет'}, "
+        f"zstandard: {'да' if cache_codec.zstandard else 'нет'}"
+    )
+    header = f"{'payload':<24} {'кодек':<16} {'байт':>8} {'encode, мкс':>12} {'decode, мкс':>12}"
+    print(header)
+    print("-" * len(header))
+
+    for name, value in build_payloads().items():
+        for label, codec, compression in _variants():
+            if codec is None:
+                data = json.dumps(value).encode("utf-8")
+                encode = lambda: json.dumps(value)  # noqa: E731
+                decode = lambda: json.loads(data)  # noqa: E731
+            else:
+                data = encode_value(value, codec=codec, compression=compression)
+                encode = lambda: encode_value(  # noqa: E731
+                    value, codec=codec, compression=compression
+                )
+                decode = lambda: decode_value(data)  # noqa: E731
+                assert decode() == value
+
+            encode_us = timeit.timeit(encode, number=iterations) / iterations * 1e6
+            decode_us = timeit.timeit(decode, number=iterations) / iterations * 1e6
+            print(
+                f"{name:<24} {label:<16} {len(data):>8} "
+                f"{encode_us:>12.1f} {decode_us:>12.1f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    run(parser.parse_args().iterations)
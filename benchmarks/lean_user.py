@@ -0,0 +1,136 @@
+"""
+Сравнение полного чтения пользователя (`User.get` со state management) и
+облегченных проекций из backend.models.user_views для пользователя с большим
+кошельком: байты ответа MongoDB, выделенная память на запрос (tracemalloc),
+память, удерживаемая результатом, и задержка.
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend). Тестовый
+пользователь создается в отдельной базе `<MONGO_DB_NAME>_benchmark` и
+удаляется после замера:
+    python -m benchmarks.lean_user [--transactions 10000] [--iterations 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import bson
+from beanie import init_beanie
+from beanie.odm.utils.projection import get_projection
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core.config import MONGO_URI, MONGO_DB_NAME
+from backend.core.database import mongo_client_options
+from backend.core.read_routing import read_document
+from backend.models.user import User
+from backend.models.user_views import (
+    UserPrincipalView,
+    UserProfileView,
+    UserSubscriptionView,
+    UserWalletView,
+)
+
+
+def _synthetic_user(transactions: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "username": "benchmark",
+        "email": f"benchmark-{bson.ObjectId()}@example.com",
+        "password": "$2b$12$" + "x" * 53,
+        "role": "user",
+        "currentSubscription": {
+            "planId": bson.ObjectId(),
+            "startDate": now,
+            "endDate": now,
+            "isActive": True,
+            "autoRenew": True,
+        },
+        "wallet": {
+            "balance": 100.0,
+            "transactionIds": [bson.ObjectId() for _ in range(transactions)],
+        },
+        "refreshTokens": [
+            {"token": "x" * 200, "createdAt": now, "expiresAt": now} for _ in range(5)
+        ],
+        "createdAt": now,
+        "updatedAt": now,
+    }
+
+
+async def _measure(fetch, iterations: int) -> dict:
+    await fetch()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await fetch()
+        latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = await fetch()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        "peak": peak - before,
+        "retained": retained - before,
+        "p50": statistics.median(latencies),
+    }
+
+
+async def main(transactions: int, iterations: int, database: str) -> None:
+    client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options(minPoolSize=0))
+    await init_beanie(database=client[database], document_models=[User])
+    collection = User.get_motor_collection()
+    user_id = (await collection.insert_one(_synthetic_user(transactions))).inserted_id
+
+    scenarios = [
+        ("User.get (полный)", None),
+        ("UserPrincipalView", UserPrincipalView),
+        ("UserWalletView", UserWalletView),
+        ("UserSubscriptionView", UserSubscriptionView),
+        ("UserProfileView", UserProfileView),
+    ]
+    header = (
+        f"{'чтение':<22} {'байт ответа':>12} {'пик, КиБ':>10} "
+        f"{'удерживает, КиБ':>16} {'p50, мс':>8}"
+    )
+    print(f"transactions={transactions}, iterations={iterations}")
+    print(header)
+    print("-" * len(header))
+    try:
+        for label, view in scenarios:
+            projection = get_projection(view) if view else None
+            raw = await collection.find_one({"_id": user_id}, projection)
+            if view is None:
+                fetch = lambda: User.get(user_id)  # noqa: E731
+            else:
+                fetch = lambda view=view: read_document(  # noqa: E731
+                    User, user_id, projection_model=view
+                )
+            result = await _measure(fetch, iterations)
+            print(
+                f"{label:<22} {len(bson.encode(raw)):>12} "
+                f"{result['peak'] / 1024:>10.1f} {result['retained'] / 1024:>16.1f} "
+                f"{result['p50'] * 1000:>8.2f}"
+            )
+    finally:
+        await collection.delete_one({"_id": user_id})
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--transactions", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--database", default=f"{MONGO_DB_NAME or 'test'}_benchmark")
+    args = parser.parse_args()
+    asyncio.run(main(args.transactions, args.iterations, args.database))
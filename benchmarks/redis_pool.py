@@ -0,0 +1,121 @@
+"""
+Нагрузочный тест пула соединений Redis: хвостовые задержки GET при пачках
+одновременных запросов для пула по умолчанию (неограниченный ConnectionPool)
+и для BlockingConnectionPool из backend.core.redis_client, с прогревом и без.
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend):
+    python -m benchmarks.redis_pool [--concurrency 500] [--bursts 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import redis.asyncio as redis
+
+from backend.core.config import REDIS_URL, REDIS_POOL_WARMUP_CONNECTIONS
+from backend.core.redis_client import create_connection_pool, warmup_connection_pool
+
+KEY = "benchmark:redis_pool"
+
+
+def _percentile(values: list, percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _timed_get(client: redis.Redis, latencies: list, errors: list) -> None:
+    started = time.perf_counter()
+    try:
+        await client.get(KEY)
+    except Exception as e:
+        errors.append(e)
+        return
+    latencies.append(time.perf_counter() - started)
+
+
+async def _run(client: redis.Redis, concurrency: int, bursts: int) -> dict:
+    latencies: list = []
+    errors: list = []
+    first_burst: list = []
+    for burst in range(bursts):
+        target = first_burst if burst == 0 else latencies
+        await asyncio.gather(
+            *(_timed_get(client, target, errors) for _ in range(concurrency))
+        )
+    pool = client.connection_pool
+    return {
+        "latencies": latencies,
+        "first_burst": first_burst,
+        "errors": len(errors),
+        "connections": len(pool._available_connections) + len(pool._in_use_connections),
+    }
+
+
+async def _scenario(label: str, pool, concurrency: int, bursts: int, warmup: int):
+    client = redis.Redis(connection_pool=pool)
+    try:
+        if warmup:
+            await warmup_connection_pool(client, warmup)
+        result = await _run(client, concurrency, bursts)
+    finally:
+        await client.aclose()
+        await pool.disconnect()
+
+    latencies = result["latencies"] or [0.0]
+    first = result["first_burst"] or [0.0]
+    print(
+        f"{label:<28} {result['connections']:>6} {result['errors']:>7} "
+        f"{_percentile(first, 99) * 1000:>12.2f} "
+        f"{statistics.median(latencies) * 1000:>8.2f} "
+        f"{_percentile(latencies, 95) * 1000:>8.2f} "
+        f"{_percentile(latencies, 99) * 1000:>8.2f} "
+        f"{max(latencies) * 1000:>8.2f}"
+    )
+
+
+async def main(concurrency: int, bursts: int, max_connections: int) -> None:
+    setup = redis.from_url(REDIS_URL)
+    await setup.set(KEY, "x" * 512)
+    await setup.aclose()
+
+    header = (
+        f"{'пул':<28} {'соед.':>6} {'ошибок':>7} {'p99 1-й, мс':>12} "
+        f"{'p50, мс':>8} {'p95, мс':>8} {'p99, мс':>8} {'max, мс':>8}"
+    )
+    print(f"concurrency={concurrency}, bursts={bursts}")
+    print(header)
+    print("-" * len(header))
+
+    await _scenario(
+        "ConnectionPool (default)",
+        redis.ConnectionPool.from_url(REDIS_URL, decode_responses=True),
+        concurrency,
+        bursts,
+        warmup=0,
+    )
+    await _scenario(
+        f"Blocking({max_connections})",
+        create_connection_pool(max_connections=max_connections),
+        concurrency,
+        bursts,
+        warmup=0,
+    )
+    await _scenario(
+        f"Blocking({max_connections}) + warmup",
+        create_connection_pool(max_connections=max_connections),
+        concurrency,
+        bursts,
+        warmup=max(REDIS_POOL_WARMUP_CONNECTIONS, max_connections),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--max-connections", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.bursts, args.max_connections))
@@ -0,0 +1,155 @@
+"""
+Чтение последних транзакций кошелька до и после перехода на журнал:
+  до    - документ пользователя с массивом wallet.transactionIds и
+          $match {_id: {$in: <весь массив>}} + $sort date + $limit;
+  после - $match {userId} + $sort createdAt, _id + $limit по индексу
+          userId_1_createdAt_-1__id_-1.
+Печатает байты запроса/ответа, просмотренные ключи и документы (explain)
+и задержки p50/p99.
+
+Запуск из корня репозитория (нужен тот же .env, что и для backend). Данные
+создаются в отдельной базе `<MONGO_DB_NAME>_benchmark` и удаляются после замера:
+    python -m benchmarks.wallet_ledger [--transactions 100000] [--iterations 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core.config import MONGO_URI, MONGO_DB_NAME
+from backend.core.database import mongo_client_options
+from backend.models.user_views import WALLET_TRANSACTIONS_LIMIT
+from backend.services.wallet_service import LEDGER_SORT, ledger_filter
+from backend.tools.migrate_wallet_ledger import LEDGER_INDEX
+
+INSERT_BATCH = 10000
+
+
+def _percentile(values: list, percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _seed(db, transactions: int):
+    user_id = bson.ObjectId()
+    started = datetime.now(timezone.utc) - timedelta(seconds=transactions)
+    ids = []
+    for offset in range(0, transactions, INSERT_BATCH):
+        batch = []
+        for index in range(offset, min(offset + INSERT_BATCH, transactions)):
+            date = started + timedelta(seconds=index)
+            batch.append(
+                {
+                    "_id": bson.ObjectId(),
+                    "userId": user_id,
+                    "amount": 10.0,
+                    "type": "deposit",
+                    "status": "completed",
+                    "description": "Пополнение баланса на 10.0 RUB",
+                    "paymentMethod": "manual",
+                    "currency": "RUB",
+                    "date": date,
+                    "createdAt": date,
+                    "updatedAt": date,
+                }
+            )
+        await db.transactions.insert_many(batch, ordered=False)
+        ids.extend(doc["_id"] for doc in batch)
+    await db.users.insert_one(
+        {"_id": user_id, "wallet": {"balance": 0.0, "transactionIds": ids}}
+    )
+    return user_id
+
+
+async def _read_before(db, user_id):
+    user = await db.users.find_one({"_id": user_id}, {"wallet": 1})
+    ids = user["wallet"]["transactionIds"]
+    pipeline = [
+        {"$match": {"_id": {"$in": ids}}},
+        {"$sort": {"date": -1}},
+        {"$limit": WALLET_TRANSACTIONS_LIMIT},
+    ]
+    result = await db.transactions.aggregate(pipeline).to_list(length=None)
+    return bson.encode(user), pipeline, result
+
+
+async def _read_after(db, user_id):
+    pipeline = [
+        {"$match": ledger_filter(user_id)},
+        {"$sort": dict(LEDGER_SORT)},
+        {"$limit": WALLET_TRANSACTIONS_LIMIT},
+    ]
+    result = await db.transactions.aggregate(pipeline).to_list(length=None)
+    return b"", pipeline, result
+
+
+async def _explain(db, pipeline) -> dict:
+    match, sort, limit = pipeline
+    explained = await db.command(
+        "explain",
+        {
+            "find": "transactions",
+            "filter": match["$match"],
+            "sort": sort["$sort"],
+            "limit": limit["$limit"],
+        },
+        verbosity="executionStats",
+    )
+    stats = explained.get("executionStats", {})
+    return {
+        "keys": stats.get("totalKeysExamined", "-"),
+        "docs": stats.get("totalDocsExamined", "-"),
+    }
+
+
+async def main(transactions: int, iterations: int, database: str) -> None:
+    client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options(minPoolSize=0))
+    db = client[database]
+    await db.transactions.create_indexes([LEDGER_INDEX])
+    user_id = await _seed(db, transactions)
+
+    header = (
+        f"{'чтение':<8} {'ответ users, Б':>15} {'запрос, Б':>12} "
+        f"{'ключей':>8} {'докум.':>8} {'p50, мс':>8} {'p99, мс':>8}"
+    )
+    print(f"transactions={transactions}, iterations={iterations}")
+    print(header)
+    print("-" * len(header))
+    try:
+        for label, read in (("до", _read_before), ("после", _read_after)):
+            user_bytes, pipeline, result = await read(db, user_id)
+            assert len(result) == min(transactions, WALLET_TRANSACTIONS_LIMIT)
+            explained = await _explain(db, pipeline)
+            latencies = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                await read(db, user_id)
+                latencies.append(time.perf_counter() - started)
+            print(
+                f"{label:<8} {len(user_bytes):>15} "
+                f"{len(bson.encode({'pipeline': pipeline})):>12} "
+                f"{explained['keys']:>8} {explained['docs']:>8} "
+                f"{statistics.median(latencies) * 1000:>8.2f} "
+                f"{_percentile(latencies, 99) * 1000:>8.2f}"
+            )
+    finally:
+        await db.transactions.delete_many({"userId": user_id})
+        await db.users.delete_one({"_id": user_id})
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--database", default=f"{MONGO_DB_NAME or 'test'}_benchmark")
+    args = parser.parse_args()
+    asyncio.run(main(args.transactions, args.iterations, args.database))
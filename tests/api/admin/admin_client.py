@@ -0,0 +1,29 @@
+from typing import Any
+
+import httpx
+
+
+class AdminClient:
+    def __init__(self, base_url: str = "http://localhost:3005"):
+        self.base_url = base_url
+
+    async def login_admin(self, credential: dict[str, Any]) -> httpx.Response:
+        async with httpx.AsyncClient() as client:
+            url = f"{self.base_url}/api/admin/login"
+            return await client.post(url, json=credential)
+
+    async def get_users(self, token: str, **params) -> httpx.Response:
+        async with httpx.AsyncClient() as client:
+            url = f"{self.base_url}/api/admin/users"
+            headers = {}
+            if token:
+                headers = {"Authorization": f"Bearer {token}"}
+            return await client.get(url, headers=headers, params=params)
+
+    async def export_users(self, token: str, **params) -> httpx.Response:
+        async with httpx.AsyncClient() as client:
+            url = f"{self.base_url}/api/admin/users/export"
+            headers = {}
+            if token:
+                headers = {"Authorization": f"Bearer {token}"}
+            return await client.get(url, headers=headers, params=params)
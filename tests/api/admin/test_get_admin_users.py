@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import uuid
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.tools import backfill_user_created_at
+from tests.api.admin.admin_client import AdminClient
+from tests.conftest import AdminUsersCreationFunction, delete_users_from_db
+
+
+async def read_all_pages(
+    api_client_admin: AdminClient, token: str, **params
+) -> list[str]:
+    user_ids = []
+    cursor = None
+    while True:
+        if cursor:
+            params["before"] = cursor
+        response = await api_client_admin.get_users(token, **params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["users"]) <= params["limit"]
+        user_ids += [user["_id"] for user in page["users"]]
+        cursor = page["nextCursor"]
+        if not cursor:
+            return user_ids
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestGetAdminUsersPositive:
+    async def test_get_admin_users_pages(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+        registered_users_for_admin: AdminUsersCreationFunction,
+    ):
+        marker = uuid.uuid4().hex[:10]
+        user_ids = [
+            await registered_users_for_admin(f"page_{marker}_{index}")
+            for index in range(3)
+        ]
+
+        response = await api_client_admin.get_users(
+            admin_access_token, search=marker, limit=2
+        )
+        assert response.status_code == 200
+        assert response.json()["total"] == 3
+        assert response.json()["nextCursor"]
+
+        found = await read_all_pages(
+            api_client_admin, admin_access_token, search=marker, limit=2
+        )
+        assert found == list(reversed(user_ids))
+
+    async def test_export_admin_users(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+        registered_users_for_admin: AdminUsersCreationFunction,
+    ):
+        marker = uuid.uuid4().hex[:10]
+        user_ids = [
+            await registered_users_for_admin(f"export_{marker}_{index}")
+            for index in range(3)
+        ]
+
+        response = await api_client_admin.export_users(
+            admin_access_token, search=marker
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        users = [json.loads(line) for line in response.text.splitlines()]
+        assert [user["_id"] for user in users] == list(reversed(user_ids))
+        assert all(user["email"].startswith("export_") for user in users)
+
+    async def test_get_admin_users_plan_from_catalog(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+        registered_users_for_admin: AdminUsersCreationFunction,
+    ):
+        marker = uuid.uuid4().hex[:10]
+        subscribed_id = await registered_users_for_admin(f"plan_{marker}_paid")
+        orphan_id = await registered_users_for_admin(f"plan_{marker}_orphan")
+        client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+        try:
+            db = client["8_films"]
+            plan = await db.subscriptionplans.find_one(sort=[("price", -1)])
+            assert plan
+            await db.users.update_one(
+                {"_id": ObjectId(subscribed_id)},
+                {"$set": {"currentSubscription.planId": plan["_id"]}},
+            )
+            # План, которого нет в каталоге (например, удаленный)
+            await db.users.update_one(
+                {"_id": ObjectId(orphan_id)},
+                {"$set": {"currentSubscription.planId": ObjectId()}},
+            )
+        finally:
+            client.close()
+
+        response = await api_client_admin.get_users(
+            admin_access_token, search=marker, limit=10
+        )
+        assert response.status_code == 200
+        rows = {user["_id"]: user for user in response.json()["users"]}
+        response = await api_client_admin.export_users(
+            admin_access_token, search=marker
+        )
+        assert response.status_code == 200
+        exported = {
+            user["_id"]: user for user in map(json.loads, response.text.splitlines())
+        }
+        assert exported == rows
+
+        subscription = rows[subscribed_id]["currentSubscription"]
+        assert subscription["planId"] == str(plan["_id"])
+        assert subscription["plan"] == {
+            "_id": str(plan["_id"]),
+            "name": plan["name"],
+            "price": plan["price"],
+            "features": plan.get("features", []),
+        }
+        assert rows[orphan_id]["currentSubscription"]["plan"] is None
+
+    async def test_get_admin_users_without_created_at(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+        registered_users_for_admin: AdminUsersCreationFunction,
+    ):
+        marker = uuid.uuid4().hex[:10]
+        registered_id = await registered_users_for_admin(f"dated_{marker}")
+        legacy_ids = [ObjectId() for _ in range(3)]
+        client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+        db = client["8_films"]
+        try:
+            # Пользователи, записанные до появления createdAt
+            await db.users.insert_many(
+                [
+                    {
+                        "_id": user_id,
+                        "username": f"legacy_{marker}_{index}",
+                        "email": f"legacy_{marker}_{index}@example.com",
+                        "usernameLower": f"legacy_{marker}_{index}",
+                        "emailLower": f"legacy_{marker}_{index}@example.com",
+                        "password": "x",
+                        "role": "user",
+                        "wallet": {"balance": 0.0},
+                    }
+                    for index, user_id in enumerate(legacy_ids)
+                ]
+            )
+
+            # Без createdAt - после остальных, по убыванию _id
+            found = await read_all_pages(
+                api_client_admin, admin_access_token, search=marker, limit=1
+            )
+            legacy_order = [str(user_id) for user_id in reversed(legacy_ids)]
+            assert found == [registered_id, *legacy_order]
+
+            await backfill_user_created_at.main(
+                argparse.Namespace(batch=100, database="8_films", rebuild=True)
+            )
+            for user_id in legacy_ids:
+                user = await db.users.find_one({"_id": user_id})
+                assert user["createdAt"] == user_id.generation_time.replace(tzinfo=None)
+            found = await read_all_pages(
+                api_client_admin, admin_access_token, search=marker, limit=1
+            )
+            assert sorted(found) == sorted([registered_id, *legacy_order])
+        finally:
+            client.close()
+            await delete_users_from_db(*(str(user_id) for user_id in legacy_ids))
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestGetAdminUsersNegative:
+    @pytest.mark.parametrize(
+        "params, status_code",
+        [
+            ({"before": "invalid"}, 400),
+            ({"limit": 0}, 422),
+            ({"limit": 101}, 422),
+        ],
+    )
+    async def test_get_admin_users_invalid_params(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+        params: dict,
+        status_code: int,
+    ):
+        response = await api_client_admin.get_users(admin_access_token, **params)
+        assert response.status_code == status_code
+
+    async def test_export_admin_users_without_token(
+        self,
+        api_client_admin: AdminClient,
+    ):
+        response = await api_client_admin.export_users(None)
+        assert response.status_code == 401
@@ -0,0 +1,153 @@
+import argparse
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.tools import build_user_search
+from tests.api.admin.admin_client import AdminClient
+from tests.conftest import AdminUsersCreationFunction, delete_users_from_db
+
+
+def found_ids(response) -> list[str]:
+    return [user["_id"] for user in response.json()["users"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestSearchAdminUsersPositive:
+    async def test_search_admin_users_prefix(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+        registered_users_for_admin: AdminUsersCreationFunction,
+    ):
+        marker = uuid.uuid4().hex[:10]
+        user_id = await registered_users_for_admin(f"Search_{marker}_finder")
+
+        response = await api_client_admin.get_users(
+            admin_access_token, search=f"SEARCH_{marker}", mode="prefix"
+        )
+        assert response.status_code == 200
+        assert found_ids(response) == [user_id]
+
+        response = await api_client_admin.get_users(
+            admin_access_token, search=marker, mode="prefix"
+        )
+        assert response.status_code == 200
+        assert found_ids(response) == []
+
+    @pytest.mark.parametrize(
+        "mode",
+        ["contains", None],
+        ids=["Contains mode", "Contains by default"],
+    )
+    async def test_search_admin_users_contains(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+        registered_users_for_admin: AdminUsersCreationFunction,
+        mode: str,
+    ):
+        marker = uuid.uuid4().hex[:10]
+        user_id = await registered_users_for_admin(f"search_{marker}_finder")
+
+        params = {"search": marker.upper()}
+        if mode:
+            params["mode"] = mode
+        response = await api_client_admin.get_users(admin_access_token, **params)
+        assert response.status_code == 200
+        assert found_ids(response) == [user_id]
+        assert response.json()["total"] == 1
+
+    async def test_search_admin_users_fuzzy(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+        registered_users_for_admin: AdminUsersCreationFunction,
+    ):
+        marker = uuid.uuid4().hex[:10]
+        user_id = await registered_users_for_admin(f"search_{marker}_finder")
+
+        typo = f"saerch_{marker}_finder"
+        response = await api_client_admin.get_users(
+            admin_access_token, search=typo, mode="fuzzy"
+        )
+        assert response.status_code == 200
+        assert found_ids(response)[0] == user_id
+        assert response.json()["total"] >= 1
+        assert response.json()["nextCursor"] is None
+
+    async def test_build_user_search_indexes_existing_users(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+    ):
+        marker = uuid.uuid4().hex[:10]
+        username = f"Legacy_{marker}"
+        user_id = ObjectId()
+        client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+        db = client["8_films"]
+        try:
+            # Пользователь, записанный до появления полей поиска
+            now = datetime.now(timezone.utc)
+            await db.users.insert_one(
+                {
+                    "_id": user_id,
+                    "username": username,
+                    "email": f"{username}@Example.com",
+                    "password": "x",
+                    "role": "user",
+                    "wallet": {"balance": 0.0},
+                    "createdAt": now,
+                    "updatedAt": now,
+                }
+            )
+
+            await build_user_search.main(
+                argparse.Namespace(batch=100, database="8_films", rebuild=True)
+            )
+
+            user = await db.users.find_one({"_id": user_id})
+            assert user["usernameLower"] == username.casefold()
+            assert user["emailLower"] == f"{username}@example.com".casefold()
+            grams = await db.usertrigrams.distinct("trigram", {"userId": user_id})
+            assert f"{marker[-2:]} " in grams
+
+            for mode in ("prefix", "contains"):
+                response = await api_client_admin.get_users(
+                    admin_access_token, search=username, mode=mode
+                )
+                assert response.status_code == 200
+                assert found_ids(response) == [str(user_id)]
+            response = await api_client_admin.get_users(
+                admin_access_token, search=f"legacy_{marker[:-1]}", mode="fuzzy"
+            )
+            assert str(user_id) in found_ids(response)
+        finally:
+            client.close()
+            await delete_users_from_db(str(user_id))
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestSearchAdminUsersNegative:
+    async def test_search_admin_users_invalid_mode(
+        self,
+        api_client_admin: AdminClient,
+        admin_access_token: str,
+    ):
+        response = await api_client_admin.get_users(
+            admin_access_token, search="user", mode="regex"
+        )
+        assert response.status_code == 422
+
+    async def test_search_admin_users_without_token(
+        self,
+        api_client_admin: AdminClient,
+    ):
+        response = await api_client_admin.get_users(None, search="user")
+        assert response.status_code == 401
@@ -0,0 +1,148 @@
+import asyncio
+import uuid
+from typing import Any
+
+import pytest
+import redis
+from fastapi import HTTPException
+
+from backend.core.cache import cached, get_or_compute, patch_cached
+from backend.core.cache_codec import encode_value
+from backend.core.config import REDIS_URL
+from backend.core.redis_client import cache_get, cache_set
+
+
+def new_cache_key(namespace: str = "cache_test") -> str:
+    return f"{namespace}:{uuid.uuid4().hex}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestGetOrComputePositive:
+    async def test_get_or_compute_single_flight(self, cache_redis: Any):
+        key = new_cache_key()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.2)
+            return {"value": calls}
+
+        results = await asyncio.gather(
+            *(get_or_compute(key, compute, ttl=60) for _ in range(10))
+        )
+        assert calls == 1
+        assert results == [{"value": 1}] * 10
+        assert await cache_get(key) == {"value": 1}
+        assert 0 < await cache_redis.ttl(key) <= 60
+
+        assert await get_or_compute(key, compute, ttl=60) == {"value": 1}
+        assert calls == 1
+
+    async def test_get_or_compute_waits_for_lock_owner(self, cache_redis: Any):
+        key = new_cache_key()
+        # Значение уже пересчитывает другой воркер, держащий блокировку
+        await cache_redis.set(f"lock:{key}", "other-worker", px=5000)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return {"value": "own"}
+
+        async def other_worker():
+            await asyncio.sleep(0.3)
+            await cache_set(key, {"value": "other"}, ex=60)
+
+        value, _ = await asyncio.gather(
+            get_or_compute(key, compute, ttl=60), other_worker()
+        )
+        assert value == {"value": "other"}
+        assert calls == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestCachedNegativeResults:
+    async def test_cached_not_found_is_cached_for_negative_ttl(self, cache_redis: Any):
+        user_id = uuid.uuid4().hex
+        calls = 0
+
+        @cached(
+            namespace="cache_test_negative", key="{user_id}", ttl=600, negative_ttl=5
+        )
+        async def load_user(user_id: str):
+            nonlocal calls
+            calls += 1
+            raise HTTPException(status_code=404, detail="User not found")
+
+        for _ in range(2):
+            with pytest.raises(HTTPException) as error:
+                await load_user(user_id)
+            assert error.value.status_code == 404
+            assert error.value.detail == "User not found"
+        assert calls == 1
+        key = f"cache_test_negative:{user_id}"
+        assert 0 < await cache_redis.ttl(key) <= 5
+
+    async def test_cached_other_errors_are_not_cached(self, cache_redis: Any):
+        user_id = uuid.uuid4().hex
+        calls = 0
+
+        @cached(namespace="cache_test_negative", key="{user_id}", ttl=600)
+        async def load_user(user_id: str):
+            nonlocal calls
+            calls += 1
+            raise HTTPException(status_code=500, detail="Server error")
+
+        for _ in range(2):
+            with pytest.raises(HTTPException) as error:
+                await load_user(user_id)
+            assert error.value.status_code == 500
+        assert calls == 2
+        assert not await cache_redis.exists(f"cache_test_negative:{user_id}")
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestPatchCached:
+    async def test_patch_cached_updates_value_and_keeps_ttl(self, cache_redis: Any):
+        key = new_cache_key()
+        await cache_set(key, {"balance": 10}, ex=60)
+
+        updated = await patch_cached(
+            key, lambda value: {**value, "balance": value["balance"] + 5}
+        )
+        assert updated is True
+        assert await cache_get(key) == {"balance": 15}
+        assert 0 < await cache_redis.ttl(key) <= 60
+
+    async def test_patch_cached_version_mismatch_deletes_key(self, cache_redis: Any):
+        key = new_cache_key()
+        await cache_set(key, {"balance": 10}, ex=60)
+
+        assert await patch_cached(key, lambda value: None) is False
+        assert not await cache_redis.exists(key)
+
+    async def test_patch_cached_concurrent_change_deletes_key(self, cache_redis: Any):
+        key = new_cache_key()
+        await cache_set(key, {"balance": 10}, ex=60)
+        other_client = redis.Redis.from_url(REDIS_URL)
+
+        def patch(value):
+            # Другой воркер успел записать ключ между чтением и записью
+            other_client.set(key, encode_value({"balance": 99}), keepttl=True)
+            return {**value, "balance": value["balance"] + 5}
+
+        try:
+            assert await patch_cached(key, patch) is False
+        finally:
+            other_client.close()
+        assert not await cache_redis.exists(key)
+
+    async def test_patch_cached_missing_key(self, cache_redis: Any):
+        key = new_cache_key()
+
+        assert await patch_cached(key, lambda value: value) is False
+        assert not await cache_redis.exists(key)
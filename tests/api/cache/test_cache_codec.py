@@ -0,0 +1,81 @@
+import json
+import uuid
+from typing import Any
+
+import pytest
+
+from backend.core import cache_codec
+from backend.core.cache_codec import (
+    COMPRESSION_ZLIB,
+    FORMAT_JSON,
+    CacheDecodeError,
+    decode_value,
+    encode_value,
+)
+from backend.core.redis_client import cache_get
+
+PAYLOAD = {
+    "user": {
+        "id": "6650c1f2a1b2c3d4e5f60718",
+        "username": "Пользователь",
+        "wallet": {"balance": 150.5, "transactions": []},
+        "features": ["HD"] * 200,
+    }
+}
+
+
+def codec_available(codec: str, compression: str) -> bool:
+    if codec == "msgpack" and cache_codec.msgpack is None:
+        return False
+    if compression == "zstd" and cache_codec.zstandard is None:
+        return False
+    return True
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestCacheCodecPositive:
+    @pytest.mark.parametrize("codec", ["json", "msgpack"])
+    @pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+    async def test_cache_codec_round_trip(self, codec: str, compression: str):
+        if not codec_available(codec, compression):
+            pytest.skip(f"{codec}/{compression} не установлен")
+
+        raw = encode_value(PAYLOAD, codec=codec, compression=compression)
+
+        assert decode_value(raw) == PAYLOAD
+
+    async def test_cache_codec_tags_compressed_json(self):
+        raw = encode_value(PAYLOAD, codec="json", compression="zlib", min_bytes=0)
+
+        assert raw[0] == FORMAT_JSON | COMPRESSION_ZLIB
+        assert decode_value(raw) == PAYLOAD
+
+    async def test_cache_codec_reads_legacy_json(self):
+        legacy = json.dumps(PAYLOAD, ensure_ascii=False)
+
+        assert decode_value(legacy) == PAYLOAD
+        assert decode_value(legacy.encode("utf-8")) == PAYLOAD
+
+    async def test_cache_get_reads_legacy_json_from_redis(self, cache_redis: Any):
+        key = f"cache_test:{uuid.uuid4().hex}"
+        # Значение записано кодом до появления кодека
+        await cache_redis.set(key, json.dumps(PAYLOAD), ex=60)
+
+        assert await cache_get(key) == PAYLOAD
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestCacheCodecNegative:
+    async def test_cache_codec_rejects_corrupted_value(self):
+        raw = encode_value(PAYLOAD, codec="json", compression="zlib", min_bytes=0)
+
+        with pytest.raises(CacheDecodeError):
+            decode_value(raw[:10])
+
+    async def test_cache_get_treats_corrupted_value_as_miss(self, cache_redis: Any):
+        key = f"cache_test:{uuid.uuid4().hex}"
+        await cache_redis.set(key, "{not json", ex=60)
+
+        assert await cache_get(key) is None
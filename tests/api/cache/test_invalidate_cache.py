@@ -0,0 +1,69 @@
+import uuid
+from typing import Any
+
+import pytest
+
+from backend.core import redis_client as redis_client_module
+from backend.core.redis_client import (
+    cache_key,
+    cache_keys_for_tag,
+    invalidate_cache,
+    legacy_key,
+)
+
+
+async def unlink_calls(redis_client: Any) -> int:
+    stats = await redis_client.info("commandstats")
+    return stats.get("cmdstat_unlink", {}).get("calls", 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestInvalidateCachePositive:
+    async def test_invalidate_cache_expands_tags_into_single_unlink(
+        self, cache_redis: Any
+    ):
+        user_id = uuid.uuid4().hex
+        tagged_keys = cache_keys_for_tag(f"user:{user_id}")
+        extra_key = f"cache_test:{user_id}"
+        for key in (*tagged_keys, extra_key):
+            await cache_redis.set(key, "1", ex=60)
+
+        calls_before = await unlink_calls(cache_redis)
+        removed = await invalidate_cache(extra_key, tags=[f"user:{user_id}"])
+
+        assert removed == len(tagged_keys) + 1
+        assert await unlink_calls(cache_redis) == calls_before + 1
+        assert await cache_redis.exists(*tagged_keys, extra_key) == 0
+
+    async def test_invalidate_cache_unlinks_legacy_keys_in_same_call(
+        self, cache_redis: Any, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(redis_client_module, "REDIS_LEGACY_KEY_FALLBACK", True)
+        user_id = uuid.uuid4().hex
+        keys = [cache_key("user_data", user_id), cache_key("wallet_data", user_id)]
+        legacy_keys = [legacy_key(key) for key in keys]
+        assert legacy_keys == [f"user_data:{user_id}", f"wallet_data:{user_id}"]
+        for key in (*keys, *legacy_keys):
+            await cache_redis.set(key, "1", ex=60)
+
+        calls_before = await unlink_calls(cache_redis)
+        removed = await invalidate_cache(*keys)
+
+        # Новые и старые имена ключей удаляются одной командой UNLINK
+        assert removed == 4
+        assert await unlink_calls(cache_redis) == calls_before + 1
+        assert await cache_redis.exists(*keys, *legacy_keys) == 0
+
+    async def test_invalidate_cache_without_keys_skips_redis(self, cache_redis: Any):
+        calls_before = await unlink_calls(cache_redis)
+        assert await invalidate_cache() == 0
+        assert await unlink_calls(cache_redis) == calls_before
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestInvalidateCacheNegative:
+    async def test_invalidate_cache_unknown_tag(self, cache_redis: Any):
+        with pytest.raises(ValueError):
+            await invalidate_cache(tags=["cache_test:1"])
@@ -0,0 +1,61 @@
+import asyncio
+import uuid
+from typing import Any
+
+import pytest
+
+from backend.core import cache as cache_module
+from backend.core import local_cache as local_cache_module
+from backend.core.cache import cached
+from backend.core.local_cache import LocalCache, close_local_cache, init_local_cache
+from backend.core.redis_client import cache_set
+
+
+async def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.05)
+    return condition()
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestLocalCachePositive:
+    async def test_tracking_invalidation_evicts_local_entry(
+        self, cache_redis: Any, monkeypatch: pytest.MonkeyPatch
+    ):
+        cache = LocalCache({"cache_test_l1:": 8})
+        monkeypatch.setattr(local_cache_module, "local_cache", cache)
+        monkeypatch.setattr(cache_module, "local_cache", cache)
+        item_id = uuid.uuid4().hex
+        key = f"cache_test_l1:{item_id}"
+        calls = 0
+
+        @cached(namespace="cache_test_l1", key="{item_id}", ttl=60)
+        async def load_item(item_id: str):
+            nonlocal calls
+            calls += 1
+            return {"price": 100}
+
+        await init_local_cache()
+        try:
+            assert await wait_for(lambda: cache.active)
+            # Инвалидация от записи первого значения в Redis может прийти
+            # после заполнения L1, поэтому читаем, пока значение не закрепится
+            for _ in range(20):
+                assert await load_item(item_id) == {"price": 100}
+                if cache.get(key) is not None:
+                    break
+                await asyncio.sleep(0.05)
+            assert cache.get(key) == {"price": 100}
+
+            # Значение изменил другой воркер
+            await cache_set(key, {"price": 200}, ex=60)
+
+            assert await wait_for(lambda: cache.get(key) is None)
+            assert await load_item(item_id) == {"price": 200}
+            assert calls == 1
+        finally:
+            await close_local_cache()
@@ -0,0 +1,131 @@
+import asyncio
+import uuid
+from typing import Any
+
+import pytest
+
+from backend.core import plan_catalog as plan_catalog_module
+from backend.core.plan_catalog import (
+    PLANS_CHANGED_CHANNEL,
+    PLANS_SNAPSHOT_GRACE_SECONDS,
+    PLANS_SNAPSHOT_KEY,
+    PLANS_VERSION_KEY,
+    PlanCatalog,
+    get_plan_catalog,
+    notify_plans_changed,
+    refresh_plan_catalog,
+)
+from backend.models import SubscriptionPlan
+
+
+async def create_plan(plans_db: list, price: float) -> SubscriptionPlan:
+    plan = SubscriptionPlan(
+        name=f"cache_test_{uuid.uuid4().hex}", price=price, features=["HD"]
+    )
+    await plan.insert()
+    plans_db.append(plan.id)
+    return plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestPlanCatalogPositive:
+    async def test_plan_catalog_refreshes_after_notify(
+        self, cache_redis: Any, plans_db: list
+    ):
+        before = await refresh_plan_catalog()
+        plan = await create_plan(plans_db, price=123)
+        assert get_plan_catalog().get(plan.id) is None
+
+        await notify_plans_changed()
+
+        after = get_plan_catalog()
+        assert after.version == before.version + 1
+        assert after.get(plan.id).price == 123
+        assert after.get_by_name(plan.name).id == plan.id
+        # Старый снимок не меняется: читатели видят его целиком
+        assert before.get(plan.id) is None
+
+        await SubscriptionPlan.find_one(SubscriptionPlan.id == plan.id).update(
+            {"$set": {"price": 150}}
+        )
+        await notify_plans_changed()
+        assert get_plan_catalog().get(plan.id).price == 150
+
+        await SubscriptionPlan.find_one(SubscriptionPlan.id == plan.id).delete()
+        await notify_plans_changed()
+        assert get_plan_catalog().get(plan.id) is None
+
+    async def test_notify_plans_changed_publishes_version(
+        self, cache_redis: Any, plans_db: list
+    ):
+        pubsub = cache_redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(PLANS_CHANGED_CHANNEL)
+        try:
+            await create_plan(plans_db, price=200)
+            await notify_plans_changed()
+
+            message = None
+            for _ in range(50):
+                message = await pubsub.get_message(timeout=0.1)
+                if message:
+                    break
+                await asyncio.sleep(0.02)
+            assert message is not None
+            assert int(message["data"]) == get_plan_catalog().version
+        finally:
+            await pubsub.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestPlanCatalogSnapshotPositive:
+    async def test_plan_catalog_publishes_versioned_snapshot(
+        self, cache_redis: Any, plans_db: list
+    ):
+        before = await refresh_plan_catalog(publish=True)
+        plan = await create_plan(plans_db, price=321)
+
+        after = await refresh_plan_catalog(publish=True)
+
+        assert after.version == before.version + 1
+        assert int(await cache_redis.get(PLANS_VERSION_KEY)) == after.version
+        assert await cache_redis.hexists(
+            PLANS_SNAPSHOT_KEY.format(version=after.version), str(plan.id)
+        )
+        # Предыдущая версия не меняется и истекает после короткой паузы
+        assert not await cache_redis.hexists(
+            PLANS_SNAPSHOT_KEY.format(version=before.version), str(plan.id)
+        )
+        ttl = await cache_redis.ttl(PLANS_SNAPSHOT_KEY.format(version=before.version))
+        assert 0 < ttl <= PLANS_SNAPSHOT_GRACE_SECONDS
+
+    async def test_plan_catalog_same_content_keeps_version(
+        self, cache_redis: Any, plans_db: list
+    ):
+        await create_plan(plans_db, price=322)
+        first = await refresh_plan_catalog(publish=True)
+
+        second = await refresh_plan_catalog(publish=True)
+
+        assert second.version == first.version
+        assert int(await cache_redis.get(PLANS_VERSION_KEY)) == first.version
+
+    async def test_plan_catalog_worker_loads_snapshot_from_redis(
+        self, cache_redis: Any, plans_db: list, monkeypatch: pytest.MonkeyPatch
+    ):
+        plan = await create_plan(plans_db, price=323)
+        published = await refresh_plan_catalog(publish=True)
+
+        # Новый воркер: пустой каталог и MongoDB не нужна
+        monkeypatch.setattr(plan_catalog_module, "_catalog", PlanCatalog(0, ()))
+
+        def find_all():
+            raise AssertionError("каталог должен читаться из снимка в Redis")
+
+        monkeypatch.setattr(SubscriptionPlan, "find_all", find_all)
+        loaded = await refresh_plan_catalog()
+
+        assert loaded.version == published.version
+        assert loaded.get(plan.id).price == 323
+        assert [p.id for p in loaded.plans] == [p.id for p in published.plans]
@@ -0,0 +1,54 @@
+import uuid
+from typing import Any
+
+import pytest
+
+from backend.core.redis_client import cache_key
+from backend.tools.redis_audit import NO_TTL, audit, key_namespace
+
+
+@pytest.mark.positive
+@pytest.mark.parametrize(
+    "key, namespace",
+    [
+        ("u:{42}:data", "user_data"),
+        ("u:{42}:wallet", "wallet_data"),
+        ("u:{42}:token_version", "token_version"),
+        ("user_data:42", "user_data (legacy)"),
+        ("lock:u:{42}:data", "lock:user_data"),
+        ("{plans}:v:3", "{plans}"),
+        ("plans_changed", "plans_changed"),
+    ],
+)
+def test_key_namespace(key: str, namespace: str):
+    assert key_namespace(key) == namespace
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestRedisAuditPositive:
+    async def test_audit_groups_keys_by_namespace(self, cache_redis: Any):
+        user_id = f"cache_test_{uuid.uuid4().hex}"
+        data_keys = [cache_key("user_data", f"{user_id}{i}") for i in range(3)]
+        wallet_key = cache_key("wallet_data", user_id)
+        legacy_key = f"user_data:{user_id}"
+        keys = [*data_keys, wallet_key, legacy_key]
+        for key in data_keys:
+            await cache_redis.set(key, "x" * 100, ex=30)
+        await cache_redis.set(wallet_key, "x", ex=7200)
+        await cache_redis.set(legacy_key, "x")
+
+        try:
+            report = await audit(cache_redis, f"*{user_id}*", batch=2, pause=0)
+        finally:
+            await cache_redis.delete(*keys)
+
+        assert set(report) == {"user_data", "wallet_data", "user_data (legacy)"}
+        assert report["user_data"]["keys"] == 3
+        assert report["user_data"]["ttl"]["<1m"] == 3
+        assert report["user_data"]["memory_bytes"] > 300
+        # Пространства отсортированы по суммарной памяти
+        assert next(iter(report)) == "user_data"
+        assert report["wallet_data"]["ttl"]["1h-1d"] == 1
+        assert report["user_data (legacy)"]["ttl"][NO_TTL] == 1
+        assert report["user_data (legacy)"]["no_ttl_examples"] == [legacy_key]
@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+from typing import Any
+
+import pytest
+from redis.exceptions import ConnectionError, ResponseError
+
+from backend.core import redis_client as redis_client_module
+from backend.core.redis_client import (
+    UNAVAILABLE,
+    CircuitBreaker,
+    call_redis,
+    invalidate_cache,
+)
+
+RESET_TIMEOUT = 0.2
+
+
+@pytest.fixture
+def breaker(monkeypatch: pytest.MonkeyPatch) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=RESET_TIMEOUT)
+    breaker.on_close.append(redis_client_module._schedule_replay)
+    monkeypatch.setattr(redis_client_module, "redis_breaker", breaker)
+    monkeypatch.setattr(redis_client_module, "_pending_invalidations", set())
+    return breaker
+
+
+def failing(error: Exception):
+    async def operation():
+        raise error
+
+    return operation
+
+
+async def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        assert await call_redis(failing(ConnectionError("down"))) is UNAVAILABLE
+    assert breaker.state == "open"
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestRedisBreakerPositive:
+    async def test_breaker_open_half_open_closed(
+        self, cache_redis: Any, breaker: CircuitBreaker
+    ):
+        await open_breaker(breaker)
+        calls = 0
+
+        async def ping():
+            nonlocal calls
+            calls += 1
+            return await cache_redis.ping()
+
+        # Пока breaker открыт, Redis не вызывается
+        assert await call_redis(ping) is UNAVAILABLE
+        assert calls == 0
+        assert breaker.rejected == 1
+
+        await asyncio.sleep(RESET_TIMEOUT)
+        assert await call_redis(ping) is True
+        assert calls == 1
+        assert breaker.state == "closed"
+        assert breaker.failures == 0
+        assert breaker.times_opened == 1
+
+    async def test_breaker_failed_probe_reopens(
+        self, cache_redis: Any, breaker: CircuitBreaker
+    ):
+        await open_breaker(breaker)
+
+        await asyncio.sleep(RESET_TIMEOUT)
+        assert await call_redis(failing(TimeoutError())) is UNAVAILABLE
+        assert breaker.state == "open"
+        assert breaker.times_opened == 1
+        assert await call_redis(cache_redis.ping) is UNAVAILABLE
+
+    async def test_breaker_replays_pending_invalidations(
+        self, cache_redis: Any, breaker: CircuitBreaker
+    ):
+        key = f"cache_test:{uuid.uuid4().hex}"
+        await cache_redis.set(key, "stale", ex=60)
+        await open_breaker(breaker)
+
+        assert await invalidate_cache(key) == 0
+        assert breaker.stats()["pending_invalidations"] == 1
+        assert await cache_redis.exists(key) == 1
+
+        await asyncio.sleep(RESET_TIMEOUT)
+        assert await call_redis(cache_redis.ping) is True
+        for _ in range(50):
+            if not await cache_redis.exists(key):
+                break
+            await asyncio.sleep(0.02)
+        assert await cache_redis.exists(key) == 0
+        assert breaker.stats()["pending_invalidations"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestRedisBreakerNegative:
+    async def test_breaker_ignores_response_errors(
+        self, cache_redis: Any, breaker: CircuitBreaker
+    ):
+        for _ in range(breaker.failure_threshold + 1):
+            result = await call_redis(failing(ResponseError("WRONGTYPE")))
+            assert result is UNAVAILABLE
+        assert breaker.state == "closed"
+        assert breaker.failures == 0
+
+        await open_breaker(breaker)
+        await asyncio.sleep(RESET_TIMEOUT)
+        assert await call_redis(failing(ResponseError("WRONGTYPE"))) is UNAVAILABLE
+        assert breaker.state == "half_open"
+        assert breaker.times_opened == 1
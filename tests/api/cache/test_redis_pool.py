@@ -0,0 +1,77 @@
+from typing import Any, AsyncGenerator
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+
+from backend.core import redis_client as redis_client_module
+from backend.core.redis_client import (
+    UNAVAILABLE,
+    CircuitBreaker,
+    call_redis,
+    create_connection_pool,
+    warmup_connection_pool,
+)
+
+
+@pytest.fixture
+def breaker(monkeypatch: pytest.MonkeyPatch) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr(redis_client_module, "redis_breaker", breaker)
+    return breaker
+
+
+@pytest_asyncio.fixture
+async def small_pool_client(
+    cache_redis: Any, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[redis.Redis, None]:
+    # Пул на одно соединение с коротким ожиданием свободного соединения
+    client = redis.Redis(
+        connection_pool=create_connection_pool(max_connections=1, timeout=0.05)
+    )
+    monkeypatch.setattr(redis_client_module, "redis_client", client)
+
+    yield client
+
+    await client.aclose()
+    await client.connection_pool.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestRedisPoolPositive:
+    async def test_warmup_is_bounded_by_pool_size(self, cache_redis: Any):
+        client = redis.Redis(connection_pool=create_connection_pool(max_connections=3))
+        try:
+            assert await warmup_connection_pool(client, 10) == 3
+            pool = client.connection_pool
+            assert len(pool._available_connections) == 3
+            assert not pool._in_use_connections
+        finally:
+            await client.aclose()
+            await client.connection_pool.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestRedisPoolNegative:
+    async def test_exhausted_pool_is_unavailable(
+        self, small_pool_client: redis.Redis, breaker: CircuitBreaker
+    ):
+        pool = small_pool_client.connection_pool
+        held = await pool.get_connection()
+        try:
+            # Все соединения заняты: вызов не ждёт дольше таймаута пула
+            # и засчитывается breaker'у как отказ Redis
+            result = await call_redis(lambda: small_pool_client.get("cache_test_pool"))
+            assert result is UNAVAILABLE
+            assert breaker.failures == 1
+            assert len(pool._in_use_connections) == 1
+        finally:
+            await pool.release(held)
+
+        # После освобождения соединения запросы снова проходят
+        assert (
+            await call_redis(lambda: small_pool_client.get("cache_test_pool")) is None
+        )
+        assert breaker.failures == 0
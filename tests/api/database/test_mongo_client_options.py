@@ -0,0 +1,78 @@
+import importlib.util
+from typing import List
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core import database
+from backend.core.database import available_compressors, mongo_client_options
+
+
+@pytest.fixture
+def installed_modules(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Делает «установленными» только модули из списка (zlib есть всегда)."""
+    installed = ["zlib"]
+    find_spec = importlib.util.find_spec
+
+    def fake_find_spec(name, *args, **kwargs):
+        if name in ("zstandard", "snappy", "zlib"):
+            return find_spec("zlib") if name in installed else None
+        return find_spec(name, *args, **kwargs)
+
+    monkeypatch.setattr(importlib.util, "find_spec", fake_find_spec)
+    return installed
+
+
+@pytest.mark.positive
+class TestMongoClientOptionsPositive:
+    def test_all_compressors_available(self, installed_modules: List[str]):
+        installed_modules.extend(["zstandard", "snappy"])
+        assert available_compressors(["zstd", "snappy", "zlib"]) == [
+            "zstd",
+            "snappy",
+            "zlib",
+        ]
+
+    def test_missing_compressors_fall_back_to_zlib(
+        self, installed_modules: List[str], monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(database, "MONGO_COMPRESSORS", ["zstd", "snappy", "zlib"])
+        monkeypatch.setattr(database, "MONGO_ZLIB_COMPRESSION_LEVEL", 3)
+
+        options = mongo_client_options()
+
+        assert options["compressors"] == "zlib"
+        assert options["zlibCompressionLevel"] == 3
+
+    def test_overrides_take_priority(self):
+        options = mongo_client_options(maxPoolSize=7, appname="cache_test")
+        assert options["maxPoolSize"] == 7
+        assert options["appname"] == "cache_test"
+
+    def test_options_accepted_by_motor_client(self, installed_modules: List[str]):
+        client = AsyncIOMotorClient(
+            "mongodb://localhost:27017",
+            connect=False,
+            **mongo_client_options(maxPoolSize=7, minPoolSize=2),
+        )
+        try:
+            assert client.options.pool_options.max_pool_size == 7
+            assert client.options.pool_options.min_pool_size == 2
+        finally:
+            client.close()
+
+
+@pytest.mark.negative
+class TestMongoClientOptionsNegative:
+    def test_no_compressor_available(
+        self, installed_modules: List[str], monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(database, "MONGO_COMPRESSORS", ["zstd", "snappy"])
+
+        options = mongo_client_options()
+
+        assert "compressors" not in options
+        assert "zlibCompressionLevel" not in options
+
+    def test_unknown_compressor_is_dropped(self, installed_modules: List[str]):
+        assert available_compressors(["lz4", "zlib"]) == ["zlib"]
@@ -0,0 +1,78 @@
+import uuid
+from typing import Any
+
+import pytest
+from pymongo.read_preferences import ReadPreference
+
+from backend.core import read_routing
+from backend.core import redis_client as redis_client_module
+from backend.core.config import MONGO_READ_MAX_STALENESS_SECONDS
+from backend.core.read_routing import (
+    SECONDARY_READS,
+    pin_primary_reads,
+    read_preference_for,
+)
+from backend.core.redis_client import CircuitBreaker, cache_key
+
+
+@pytest.fixture
+def secondary_reads(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(read_routing, "MONGO_READ_FROM_SECONDARIES", True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestReadRoutingPositive:
+    async def test_pinned_user_reads_from_primary(
+        self, cache_redis: Any, secondary_reads: None
+    ):
+        user_id = f"cache_test_{uuid.uuid4().hex}"
+        other_user_id = f"cache_test_{uuid.uuid4().hex}"
+        pin_key = cache_key("read_pin", user_id)
+        try:
+            assert await read_preference_for(user_id) == SECONDARY_READS
+
+            await pin_primary_reads(user_id)
+
+            assert await read_preference_for(user_id) == ReadPreference.PRIMARY
+            assert await read_preference_for(other_user_id) == SECONDARY_READS
+            # Маркер живет не меньше допустимого отставания вторичных узлов
+            assert await cache_redis.ttl(pin_key) > MONGO_READ_MAX_STALENESS_SECONDS
+        finally:
+            await cache_redis.delete(pin_key)
+
+    async def test_shared_reads_go_to_secondaries(
+        self, cache_redis: Any, secondary_reads: None
+    ):
+        read_preference = await read_preference_for()
+        assert read_preference == SECONDARY_READS
+        assert read_preference.max_staleness == MONGO_READ_MAX_STALENESS_SECONDS
+
+    async def test_secondary_reads_disabled(
+        self, cache_redis: Any, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(read_routing, "MONGO_READ_FROM_SECONDARIES", False)
+        user_id = f"cache_test_{uuid.uuid4().hex}"
+        await pin_primary_reads(user_id)
+
+        assert await read_preference_for(user_id) == ReadPreference.PRIMARY
+        assert await cache_redis.exists(cache_key("read_pin", user_id)) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestReadRoutingNegative:
+    async def test_redis_unavailable_reads_from_primary(
+        self,
+        cache_redis: Any,
+        secondary_reads: None,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure(ConnectionError("down"))
+        monkeypatch.setattr(redis_client_module, "redis_breaker", breaker)
+
+        # Маркер проверить нельзя - чтение идет на первичный узел
+        user_id = f"cache_test_{uuid.uuid4().hex}"
+        assert await read_preference_for(user_id) == ReadPreference.PRIMARY
+        assert breaker.rejected == 1
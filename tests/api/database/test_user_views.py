@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+import pytest
+from beanie import PydanticObjectId
+from beanie.odm.utils.projection import get_projection
+
+from backend.models.user_views import (
+    UserPrincipalView,
+    UserProfileView,
+    UserSubscriptionView,
+    UserTokenVersionView,
+    UserWalletView,
+)
+
+LEAN_VIEWS = (
+    UserPrincipalView,
+    UserProfileView,
+    UserSubscriptionView,
+    UserTokenVersionView,
+    UserWalletView,
+)
+
+
+def full_user_document() -> dict:
+    transaction_ids = [PydanticObjectId() for _ in range(100)]
+    return {
+        "_id": PydanticObjectId(),
+        "username": "cache_test",
+        "email": "cache_test@example.com",
+        "password": "$2b$12$hash",
+        "refreshTokens": ["token"],
+        "role": "user",
+        "tokenVersion": 3,
+        "createdAt": datetime.now(timezone.utc),
+        "wallet": {"balance": 10.0, "transactionIds": transaction_ids},
+        "currentSubscription": {"planId": PydanticObjectId(), "isActive": True},
+    }
+
+
+@pytest.mark.positive
+@pytest.mark.parametrize("view", LEAN_VIEWS, ids=lambda view: view.__name__)
+class TestUserViewsPositive:
+    def test_projection_skips_secrets(self, view):
+        projection = get_projection(view)
+        for field in ("password", "refreshTokens"):
+            assert field not in projection
+        # Транзакции читаются из коллекции transactions, а не из массива id
+        assert "wallet.transactionIds" not in projection
+
+    def test_view_drops_fields_outside_projection(self, view):
+        data = view.model_validate(full_user_document()).model_dump()
+        assert "password" not in data
+        assert "refreshTokens" not in data
+
+
+@pytest.mark.positive
+class TestUserViewFieldsPositive:
+    def test_wallet_view_reads_only_balance(self):
+        assert get_projection(UserWalletView) == {"_id": 1, "wallet.balance": 1}
+        view = UserWalletView.model_validate(full_user_document())
+        assert view.wallet.model_dump() == {"balance": 10.0}
+
+    def test_principal_view_carries_token_version(self):
+        view = UserPrincipalView.model_validate(full_user_document())
+        assert view.tokenVersion == 3
+        assert set(get_projection(UserPrincipalView)) == {"_id", "role", "tokenVersion"}
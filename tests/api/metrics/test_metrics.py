@@ -0,0 +1,97 @@
+import json
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+
+from backend.core import metrics
+from backend.core.metrics_exporter import (
+    METRICS_WORKER_KEY,
+    METRICS_WORKERS_KEY,
+    WORKER_ID,
+    collect_metrics,
+)
+from backend.routers import metrics_router
+
+OTHER_WORKER = "metrics-test:1"
+
+metrics.describe("metrics_test_events_total", "counter", "Тестовый счетчик")
+metrics.describe(
+    "metrics_test_seconds", "histogram", "Тестовая гистограмма", buckets=(0.1, 1.0)
+)
+
+
+def other_worker_snapshot() -> dict:
+    return {
+        "counters": [["metrics_test_events_total", {"event": "hit"}, 5]],
+        "histograms": [["metrics_test_seconds", {}, [1, 0, 0.05, 1]]],
+        "gauges": [
+            ["redis_pool_connections", {"state": "idle", "worker": OTHER_WORKER}, 3]
+        ],
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestMetricsPositive:
+    async def test_merge_snapshots_sums_workers(self):
+        first = {
+            "counters": [["metrics_test_events_total", {"event": "hit"}, 2]],
+            "histograms": [["metrics_test_seconds", {}, [0, 1, 0.5, 1]]],
+            "gauges": [["redis_pool_connections", {"worker": "a"}, 1]],
+        }
+
+        merged = metrics.merge_snapshots([first, other_worker_snapshot()])
+
+        assert merged["counters"] == [
+            ["metrics_test_events_total", {"event": "hit"}, 7]
+        ]
+        assert merged["histograms"] == [["metrics_test_seconds", {}, [1, 1, 0.55, 2]]]
+        assert len(merged["gauges"]) == 2
+
+    async def test_collect_metrics_merges_worker_snapshots(self, cache_redis: Any):
+        metrics.inc("metrics_test_events_total", 2, event="hit")
+        own = next(
+            value
+            for name, labels, value in metrics.snapshot()["counters"]
+            if name == "metrics_test_events_total" and labels == {"event": "hit"}
+        )
+        other_key = METRICS_WORKER_KEY.format(worker=OTHER_WORKER)
+        await cache_redis.set(other_key, json.dumps(other_worker_snapshot()), ex=60)
+        await cache_redis.sadd(METRICS_WORKERS_KEY, OTHER_WORKER)
+
+        try:
+            output = await collect_metrics()
+        finally:
+            await cache_redis.srem(METRICS_WORKERS_KEY, OTHER_WORKER, WORKER_ID)
+            await cache_redis.delete(
+                other_key, METRICS_WORKER_KEY.format(worker=WORKER_ID)
+            )
+
+        lines = output.splitlines()
+        assert f'metrics_test_events_total{{event="hit"}} {int(own + 5)}' in lines
+        assert "metrics_workers_reporting 2" in lines
+        assert 'metrics_test_seconds_bucket{le="0.1"} 1' in lines
+        assert (
+            f'redis_pool_connections{{state="idle",worker="{OTHER_WORKER}"}} 3' in lines
+        )
+        assert "# TYPE metrics_test_events_total counter" in lines
+
+    async def test_metrics_token_accepted(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(metrics_router, "METRICS_TOKEN", "secret")
+
+        assert metrics_router.verify_metrics_token("Bearer secret") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestMetricsNegative:
+    @pytest.mark.parametrize("authorization", [None, "Bearer wrong", "secret"])
+    async def test_metrics_token_required(
+        self, monkeypatch: pytest.MonkeyPatch, authorization
+    ):
+        monkeypatch.setattr(metrics_router, "METRICS_TOKEN", "secret")
+
+        with pytest.raises(HTTPException) as error:
+            metrics_router.verify_metrics_token(authorization)
+        assert error.value.status_code == 401
@@ -1,5 +1,6 @@
 import pytest
 
+from backend.core.redis_client import cache_key
 from tests.api.user.user_client import UserClient
 from tests.conftest import (
     clean_cache_redis,
@@ -25,7 +26,9 @@ class TestGetUserDataPositive:
         assert response.status_code == 200
         assert response.json()["user"]["username"] == user_data["username"]
         assert response.json()["user"]["email"] == user_data["email"]
-        await clean_cache_redis(f"user_data:{response_data.json()['user']['id']}")
+        await clean_cache_redis(
+            cache_key("user_data", response_data.json()["user"]["id"])
+        )
 
 
 @pytest.mark.asyncio
@@ -1,5 +1,10 @@
+import asyncio
+import os
+import bcrypt
 import pytest
 import uuid
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
 
 from tests.api.user.user_client import UserClient
 from tests.conftest import UserCreationFunction
@@ -37,6 +42,48 @@ class TestLoginUserPositive:
         assert "accessToken" in response.json()
         assert "refreshToken" in response.json()
 
+    async def test_login_user_rehashes_password_with_outdated_cost(
+        self,
+        api_client_user: UserClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+    ):
+        user_data, response_data, _ = await registered_user_in_db_per_function(None)
+        user_id = ObjectId(response_data.json()["user"]["id"])
+        outdated_hash = bcrypt.hashpw(
+            user_data["password"].encode("utf-8"), bcrypt.gensalt(rounds=4)
+        ).decode("utf-8")
+        client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+        try:
+            users = client["8_films"].users
+            await users.update_one(
+                {"_id": user_id}, {"$set": {"password": outdated_hash}}
+            )
+            credential = {
+                "email": user_data["email"],
+                "password": user_data["password"],
+            }
+            response = await api_client_user.login_user(credential)
+            assert response.status_code == 200
+
+            # Перехеширование идет в фоне после ответа на вход
+            stored_hash = outdated_hash
+            for _ in range(50):
+                user = await users.find_one({"_id": user_id}, {"password": 1})
+                stored_hash = user["password"]
+                if stored_hash != outdated_hash:
+                    break
+                await asyncio.sleep(0.1)
+            assert stored_hash != outdated_hash
+            assert not stored_hash.startswith("$2b$04$")
+            assert bcrypt.checkpw(
+                user_data["password"].encode("utf-8"), stored_hash.encode("utf-8")
+            )
+        finally:
+            client.close()
+
+        response = await api_client_user.login_user(credential)
+        assert response.status_code == 200
+
 
 @pytest.mark.asyncio
 @pytest.mark.positive
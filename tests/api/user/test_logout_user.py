@@ -1,4 +1,9 @@
-from backend.core.redis_client import get_redis_client, init_redis, close_redis
+from backend.core.redis_client import (
+    get_redis_client,
+    init_redis,
+    close_redis,
+    cache_key,
+)
 import pytest
 
 from tests.api.user.user_client import UserClient
@@ -25,13 +30,13 @@ class TestLogoutUserPositive:
         redis_client = get_redis_client()
         if redis_client:
             refresh_token_in_redis_before_logout = await redis_client.exists(
-                f"refresh_token:{user_id}"
+                cache_key("refresh_token", user_id)
             )
             user_data_in_redis_before_logout = await redis_client.exists(
-                f"user_data:{user_id}"
+                cache_key("user_data", user_id)
             )
             wallet_data_in_redis_before_logout = await redis_client.exists(
-                f"wallet_data:{user_id}"
+                cache_key("wallet_data", user_id)
             )
             assert refresh_token_in_redis_before_logout == 1
             assert user_data_in_redis_before_logout == 1
@@ -40,13 +45,13 @@ class TestLogoutUserPositive:
         response = await api_client_user.logout_user(accessToken)
         if redis_client:
             refresh_token_in_redis_after_logout = await redis_client.exists(
-                f"refresh_token:{user_id}"
+                cache_key("refresh_token", user_id)
             )
             user_data_in_redis_after_logout = await redis_client.exists(
-                f"user_data:{user_id}"
+                cache_key("user_data", user_id)
             )
             wallet_data_in_redis_after_logout = await redis_client.exists(
-                f"wallet_data:{user_id}"
+                cache_key("wallet_data", user_id)
             )
             assert refresh_token_in_redis_after_logout == 0
             assert user_data_in_redis_after_logout == 0
@@ -58,3 +63,22 @@ class TestLogoutUserPositive:
         )
         assert user_data_in_redis_before_logout != user_data_in_redis_after_logout
         await close_redis()
+
+    async def test_logout_user_revokes_access_token(
+        self,
+        api_client_user: UserClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+        api_client_wallet: WalletClient,
+    ):
+        _, response_data, accessToken = await registered_user_in_db_per_function(None)
+        response = await api_client_user.get_user_data(accessToken)
+        assert response.status_code == 200
+
+        response = await api_client_user.logout_user(accessToken)
+        assert response.status_code == 200
+
+        response = await api_client_user.get_user_data(accessToken)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token revoked"
+        response = await api_client_wallet.get_user_wallet(accessToken)
+        assert response.status_code == 401
@@ -0,0 +1,42 @@
+import pytest
+from fastapi import HTTPException
+
+from backend.core import password_hasher
+from backend.core.config import (
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE,
+    PASSWORD_HASH_RETRY_AFTER,
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestPasswordHasherPositive:
+    async def test_password_hasher_hash_and_verify_in_pool(self):
+        try:
+            hashed = await password_hasher.hash_password("Password123", rounds=4)
+            assert await password_hasher.verify_password("Password123", hashed)
+            assert not await password_hasher.verify_password("Password1234", hashed)
+        finally:
+            password_hasher.shutdown_password_hasher()
+        assert password_hasher.get_password_hasher_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestPasswordHasherNegative:
+    async def test_password_hasher_rejects_when_queue_is_full(self, monkeypatch):
+        rejected_before = password_hasher.get_password_hasher_stats()["rejected"]
+        monkeypatch.setattr(
+            password_hasher,
+            "_in_flight",
+            PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE,
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await password_hasher.hash_password("Password123")
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == str(PASSWORD_HASH_RETRY_AFTER)
+        stats = password_hasher.get_password_hasher_stats()
+        assert stats["rejected"] == rejected_before + 1
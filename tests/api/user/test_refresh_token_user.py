@@ -1,5 +1,10 @@
 from jose import jwt
-from backend.core.redis_client import get_redis_client, init_redis, close_redis
+from backend.core.redis_client import (
+    get_redis_client,
+    init_redis,
+    close_redis,
+    cache_key,
+)
 import pytest
 import time
 import asyncio
@@ -49,7 +54,7 @@ class TestRefreshTokenNegative:
         await init_redis()
         redis_client = get_redis_client()
         if redis_client:
-            await redis_client.delete(f"refresh_token:{user_id}")
+            await redis_client.delete(cache_key("refresh_token", user_id))
         await close_redis()
         response = await api_client_user.get_new_tokens(refreshToken)
         assert response.status_code == 401
@@ -1,7 +1,13 @@
 import pytest
 import uuid
-from backend.core.redis_client import get_redis_client, init_redis, close_redis
+from backend.core.redis_client import (
+    get_redis_client,
+    init_redis,
+    close_redis,
+    cache_key,
+)
 from tests.api.user.user_client import UserClient
+from tests.api.wallet.wallet_client import WalletClient
 from tests.conftest import UserCreationFunction, UserCleanFunction
 from tests.data.API_User.user_test_data import UpdateUserData
 
@@ -43,11 +49,15 @@ class TestUpdateUserPositive:
         await init_redis()
         redis_client = get_redis_client()
         if redis_client:
-            user_data_before_update = await redis_client.exists(f"user_data:{user_id}")
+            user_data_before_update = await redis_client.exists(
+                cache_key("user_data", user_id)
+            )
             assert user_data_before_update == 1
         response = await api_client_user.update_user(accessToken, update_user_data)
         if redis_client:
-            user_data_after_update = await redis_client.exists(f"user_data:{user_id}")
+            user_data_after_update = await redis_client.exists(
+                cache_key("user_data", user_id)
+            )
             assert user_data_after_update == 0
         assert response.status_code == 200
         assert response.json()["user"]["username"] == update_user_data["username"]
@@ -55,6 +65,73 @@ class TestUpdateUserPositive:
         assert user_data_before_update != user_data_after_update
         await close_redis()
 
+    async def test_update_user_invalidates_cached_principal(
+        self,
+        api_client_user: UserClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+    ):
+        user_data, response_data, accessToken = (
+            await registered_user_in_db_per_function(None)
+        )
+        update_user_data = UpdateUserData.base_user_update_data.copy()
+        update_user_data["email"] = user_data["email"]
+        update_user_data["newPassword"] = "Password1234"
+        response = await api_client_user.update_user(accessToken, update_user_data)
+        assert response.status_code == 200
+
+        response_login = await api_client_user.login_user(
+            {"email": user_data["email"], "password": "Password1234"}
+        )
+        assert response_login.status_code == 200
+        accessToken = response_login.json()["accessToken"]
+
+        # Пользователь из кэша со старым хэшем пароля не принял бы новый пароль
+        update_user_data["currentPassword"] = "Password1234"
+        update_user_data["newPassword"] = "Password12345"
+        response = await api_client_user.update_user(accessToken, update_user_data)
+        assert response.status_code == 200
+
+    async def test_update_user_keeps_concurrent_wallet_changes(
+        self,
+        api_client_user: UserClient,
+        api_client_wallet: WalletClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+    ):
+        user_data, response_data, accessToken = (
+            await registered_user_in_db_per_function(None)
+        )
+        # Пользователь попадает в кэш до пополнения кошелька
+        await api_client_user.get_user_data(accessToken)
+        response = await api_client_wallet.wallet_deposit(accessToken, 10.00)
+        assert response.status_code == 200
+
+        update_user_data = UpdateUserData.base_user_update_data.copy()
+        update_user_data["email"] = user_data["email"]
+        update_user_data["username"] = "update_user"
+        response = await api_client_user.update_user(accessToken, update_user_data)
+        assert response.status_code == 200
+
+        response_wallet = await api_client_wallet.get_user_wallet(accessToken)
+        assert response_wallet.json()["balance"] == 10.00
+
+    async def test_update_user_password_revokes_access_token(
+        self,
+        api_client_user: UserClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+    ):
+        user_data, response_data, accessToken = (
+            await registered_user_in_db_per_function(None)
+        )
+        update_user_data = UpdateUserData.base_user_update_data.copy()
+        update_user_data["email"] = user_data["email"]
+        update_user_data["newPassword"] = "Password1234"
+        response = await api_client_user.update_user(accessToken, update_user_data)
+        assert response.status_code == 200
+
+        response = await api_client_user.get_user_data(accessToken)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token revoked"
+
 
 @pytest.mark.asyncio
 @pytest.mark.positive
@@ -2,7 +2,12 @@ import pytest
 import os
 import aiofiles
 import mimetypes
-from backend.core.redis_client import get_redis_client, init_redis, close_redis
+from backend.core.redis_client import (
+    get_redis_client,
+    init_redis,
+    close_redis,
+    cache_key,
+)
 from tests.api.user.user_client import UserClient
 from tests.conftest import UserCreationFunction, UserCleanFunction
 
@@ -74,7 +79,9 @@ class TestUploadAvatarPositive:
         await init_redis()
         redis_client = get_redis_client()
         if redis_client:
-            user_data_before_upload = await redis_client.exists(f"user_data:{user_id}")
+            user_data_before_upload = await redis_client.exists(
+                cache_key("user_data", user_id)
+            )
             assert user_data_before_upload == 1
 
         filename = "file_positive_2_mb.jpg"
@@ -87,7 +94,9 @@ class TestUploadAvatarPositive:
                 files=files_to_upload, token=accessToken
             )
         if redis_client:
-            user_data_after_upload = await redis_client.exists(f"user_data:{user_id}")
+            user_data_after_upload = await redis_client.exists(
+                cache_key("user_data", user_id)
+            )
             assert user_data_after_upload == 0
         assert user_data_before_upload != user_data_after_upload
         assert response.status_code == 200
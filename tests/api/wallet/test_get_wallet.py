@@ -1,7 +1,12 @@
+import os
+
 import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
 
+from backend.core.redis_client import cache_key
 from tests.api.wallet.wallet_client import WalletClient
-from tests.conftest import UserCreationFunction, UserCleanFunction
+from tests.conftest import UserCreationFunction, UserCleanFunction, clean_cache_redis
 
 
 @pytest.mark.asyncio
@@ -19,6 +24,35 @@ class TestGetUserWalletPositive:
 
         assert response.status_code == 200
 
+    async def test_get_user_wallet_reads_ledger_without_transaction_ids(
+        self,
+        api_client_wallet: WalletClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+    ):
+        _, response_data, accessToken = await registered_user_in_db_per_function(None)
+        user_id = response_data.json()["user"]["id"]
+        for amount in (10, 20):
+            response = await api_client_wallet.wallet_deposit(accessToken, amount)
+            assert response.status_code == 200
+
+        # Транзакции читаются из коллекции transactions по userId, поэтому
+        # кошелек не зависит от устаревшего массива wallet.transactionIds
+        client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+        try:
+            db = client["8_films"]
+            await db.users.update_one(
+                {"_id": ObjectId(user_id)}, {"$unset": {"wallet.transactionIds": ""}}
+            )
+            await clean_cache_redis(cache_key("wallet_data", user_id))
+
+            response = await api_client_wallet.get_user_wallet(accessToken)
+            assert response.status_code == 200
+            assert response.json()["balance"] == 30
+            assert [tx["amount"] for tx in response.json()["transactions"]] == [20, 10]
+        finally:
+            await db.transactions.delete_many({"userId": ObjectId(user_id)})
+            client.close()
+
 
 @pytest.mark.asyncio
 @pytest.mark.negative
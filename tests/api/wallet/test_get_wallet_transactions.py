@@ -0,0 +1,141 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from tests.api.wallet.wallet_client import WalletClient
+from tests.conftest import UserCreationFunction
+
+
+@pytest.mark.asyncio
+@pytest.mark.positive
+class TestGetWalletTransactionsPositive:
+    async def test_get_wallet_transactions_pages(
+        self,
+        api_client_wallet: WalletClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+    ):
+        _, response_data, accessToken = await registered_user_in_db_per_function(None)
+        deposit_amounts = [10, 20, 30, 40, 50]
+        for amount in deposit_amounts:
+            response = await api_client_wallet.wallet_deposit(accessToken, amount)
+            assert response.status_code == 200
+
+        amounts = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["before"] = cursor
+            response = await api_client_wallet.get_wallet_transactions(
+                accessToken, **params
+            )
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["transactions"]) <= 2
+            amounts += [transaction["amount"] for transaction in page["transactions"]]
+            cursor = page["nextCursor"]
+            if not cursor:
+                break
+        assert amounts == list(reversed(deposit_amounts))
+
+    async def test_get_wallet_transactions_without_created_at(
+        self,
+        api_client_wallet: WalletClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+    ):
+        _, response_data, accessToken = await registered_user_in_db_per_function(None)
+        user_id = ObjectId(response_data.json()["user"]["id"])
+        for amount in (10, 20):
+            response = await api_client_wallet.wallet_deposit(accessToken, amount)
+            assert response.status_code == 200
+
+        client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+        db = client["8_films"]
+        try:
+            # Транзакции, записанные до появления createdAt
+            date = datetime.now(timezone.utc) - timedelta(days=1)
+            await db.transactions.insert_many(
+                [
+                    {
+                        "userId": user_id,
+                        "amount": amount,
+                        "type": "deposit",
+                        "status": "completed",
+                        "description": "legacy",
+                        "currency": "RUB",
+                        "date": date,
+                    }
+                    for amount in (1, 2, 3)
+                ]
+            )
+
+            amounts = []
+            cursor = None
+            while True:
+                params = {"limit": 2}
+                if cursor:
+                    params["before"] = cursor
+                response = await api_client_wallet.get_wallet_transactions(
+                    accessToken, **params
+                )
+                assert response.status_code == 200
+                page = response.json()
+                amounts += [
+                    transaction["amount"] for transaction in page["transactions"]
+                ]
+                cursor = page["nextCursor"]
+                if not cursor:
+                    break
+            assert amounts == [20, 10, 3, 2, 1]
+        finally:
+            await db.transactions.delete_many({"userId": user_id})
+            client.close()
+
+    async def test_get_wallet_transactions_filter_by_type(
+        self,
+        api_client_wallet: WalletClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+    ):
+        _, response_data, accessToken = await registered_user_in_db_per_function(None)
+        await api_client_wallet.wallet_deposit(accessToken, 10)
+        response = await api_client_wallet.get_wallet_transactions(
+            accessToken, type="subscription"
+        )
+        assert response.status_code == 200
+        assert response.json()["transactions"] == []
+        assert response.json()["nextCursor"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.negative
+class TestGetWalletTransactionsNegative:
+    @pytest.mark.parametrize(
+        "params, status_code",
+        [
+            ({"before": "invalid"}, 400),
+            ({"limit": 0}, 422),
+            ({"limit": 101}, 422),
+        ],
+    )
+    async def test_get_wallet_transactions_invalid_params(
+        self,
+        api_client_wallet: WalletClient,
+        registered_user_in_db_per_class: UserCreationFunction,
+        params: dict,
+        status_code: int,
+    ):
+        _, response_data, accessToken = await registered_user_in_db_per_class(None)
+        response = await api_client_wallet.get_wallet_transactions(
+            accessToken, **params
+        )
+        assert response.status_code == status_code
+
+    async def test_get_wallet_transactions_without_token(
+        self,
+        api_client_wallet: WalletClient,
+    ):
+        response = await api_client_wallet.get_wallet_transactions(None)
+        assert response.status_code == 401
@@ -1,6 +1,9 @@
 import pytest
 import asyncio
+from typing import Any
 
+from backend.core.cache_codec import encode_value
+from backend.core.redis_client import cache_get, cache_key
 from tests.api.wallet.wallet_client import WalletClient
 from tests.conftest import UserCreationFunction, UserCleanFunction
 from tests.data.API_Wallet.wallet_test_data import WalletDepositData
@@ -39,6 +42,46 @@ class TestWalletDepositPositive:
         real_balance_user = await api_client_wallet.get_user_wallet(accessToken)
         assert expected_balance == real_balance_user.json()["balance"]
 
+    async def test_wallet_deposit_updates_cached_wallet(
+        self,
+        api_client_wallet: WalletClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+        cache_redis: Any,
+    ):
+        _, response_data, accessToken = await registered_user_in_db_per_function(None)
+        key = cache_key("wallet_data", response_data.json()["user"]["id"])
+        response = await api_client_wallet.get_user_wallet(accessToken)
+        assert response.status_code == 200
+        ttl = await cache_redis.ttl(key)
+        assert ttl > 0
+
+        response = await api_client_wallet.wallet_deposit(accessToken, 10)
+        assert response.status_code == 200
+        # Кэш обновлен на месте (compare-and-set), а не удален
+        cached_wallet = await cache_get(key)
+        assert cached_wallet["balance"] == 10
+        assert cached_wallet["transactions"][0]["amount"] == 10
+        assert 0 < await cache_redis.ttl(key) <= ttl
+
+    async def test_wallet_deposit_drops_stale_cached_wallet(
+        self,
+        api_client_wallet: WalletClient,
+        registered_user_in_db_per_function: UserCreationFunction,
+        cache_redis: Any,
+    ):
+        _, response_data, accessToken = await registered_user_in_db_per_function(None)
+        key = cache_key("wallet_data", response_data.json()["user"]["id"])
+        response = await api_client_wallet.get_user_wallet(accessToken)
+        assert response.status_code == 200
+        stale_wallet = {**response.json(), "balance": 999}
+        await cache_redis.set(key, encode_value(stale_wallet), keepttl=True)
+
+        response = await api_client_wallet.wallet_deposit(accessToken, 10)
+        assert response.status_code == 200
+        assert not await cache_redis.exists(key)
+        response = await api_client_wallet.get_user_wallet(accessToken)
+        assert response.json()["balance"] == 10
+
 
 @pytest.mark.asyncio
 @pytest.mark.negative
@@ -21,3 +21,11 @@ class WalletClient:
                 headers = {"Authorization": f"Bearer {token}"}
             req = {"amount": amount}
             return await client.post(url, headers=headers, json=req)
+
+    async def get_wallet_transactions(self, token: str, **params) -> httpx.Response:
+        async with httpx.AsyncClient() as client:
+            url = f"{self.base_url}/api/wallet/transactions"
+            headers = {}
+            if token:
+                headers = {"Authorization": f"Bearer {token}"}
+            return await client.get(url, headers=headers, params=params)
@@ -2,6 +2,7 @@ from typing import AsyncGenerator, Callable, Optional, Any, Awaitable
 
 import httpx
 
+from tests.api.admin.admin_client import AdminClient
 from tests.api.wallet.wallet_client import WalletClient
 import pytest
 import asyncio
@@ -11,8 +12,18 @@ import uuid
 from tests.api.user.user_client import UserClient
 from tests.data.API_User.user_test_data import CreateUserData
 from motor.motor_asyncio import AsyncIOMotorClient
-from backend.core.redis_client import get_redis_client, init_redis, close_redis
+from backend.core.redis_client import (
+    get_redis_client,
+    init_redis,
+    close_redis,
+    cache_key,
+    USER_KEY_SUFFIXES,
+)
+from backend.core.plan_catalog import PLANS_CHANGED_CHANNEL, PLANS_VERSION_KEY
 from bson import ObjectId
+from beanie import init_beanie
+from backend.models import SubscriptionPlan
+from backend.core.plan_catalog import notify_plans_changed
 import pytest_asyncio
 
 
@@ -21,6 +32,7 @@ UserCreationFunction = Callable[
     Awaitable[tuple[dict[str, Any], httpx.Response, str]],
 ]
 UserCleanFunction = Callable[[str], Awaitable[None]]
+AdminUsersCreationFunction = Callable[[str], Awaitable[str]]
 
 
 @pytest.fixture(scope="session")
@@ -33,14 +45,46 @@ def api_client_wallet() -> WalletClient:
     return WalletClient()
 
 
-async def clean_cache_redis(delete_cache: str) -> None:
+@pytest.fixture(scope="session")
+def api_client_admin() -> AdminClient:
+    return AdminClient()
+
+
+async def clean_cache_redis(*delete_cache: str) -> None:
     await init_redis()
     redis_client = get_redis_client()
     if redis_client:
-        await redis_client.delete(delete_cache)
+        for key in delete_cache:
+            await redis_client.delete(key)
     await close_redis()
 
 
+async def clean_user_cache_redis(user_id: str) -> None:
+    await clean_cache_redis(
+        *(cache_key(namespace, user_id) for namespace in USER_KEY_SUFFIXES)
+    )
+
+
+async def delete_users_from_db(*user_ids: str) -> None:
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+    try:
+        db = client["8_films"]
+        user_ids_obj = [ObjectId(user_id) for user_id in user_ids]
+        await db.users.delete_many({"_id": {"$in": user_ids_obj}})
+        await db.usertrigrams.delete_many({"userId": {"$in": user_ids_obj}})
+    finally:
+        client.close()
+    for user_id in user_ids:
+        await clean_user_cache_redis(user_id)
+
+
+async def reload_plan_catalog(redis_client: Any) -> None:
+    # Без указателя на снимок воркеры перечитывают планы из MongoDB
+    await redis_client.delete(PLANS_VERSION_KEY)
+    await redis_client.publish(PLANS_CHANGED_CHANNEL, "reload")
+    await asyncio.sleep(1)
+
+
 @pytest_asyncio.fixture(scope="class")
 async def registered_user_in_db_per_class(
     api_client_user: UserClient, request: Any
@@ -80,8 +124,7 @@ async def registered_user_in_db_per_class(
     if registered_user_data:
         client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
         user_id = registered_user_data["response_data"].json()["user"]["id"]
-        await clean_cache_redis(f"refresh_token:{user_id}")
-        await clean_cache_redis(f"wallet_data:{user_id}")
+        await clean_user_cache_redis(user_id)
 
         try:
             db = client["8_films"]
@@ -141,8 +184,7 @@ async def registered_user_in_db_per_function(
         client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
         user_id = registered_user_data["response_data"].json()["user"]["id"]
 
-        await clean_cache_redis(f"refresh_token:{user_id}")
-        await clean_cache_redis(f"wallet_data:{user_id}")
+        await clean_user_cache_redis(user_id)
 
         try:
             db = client["8_films"]
@@ -170,7 +212,7 @@ async def registered_user_in_db_per_function(
 async def clean_user_now() -> UserCleanFunction:
     async def delete_user(user_id: str) -> None:
 
-        await clean_cache_redis(f"refresh_token:{user_id}")
+        await clean_user_cache_redis(user_id)
         client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
         db = client["8_films"]
         try:
@@ -186,7 +228,6 @@ async def clean_user_now() -> UserCleanFunction:
 @pytest_asyncio.fixture(scope="function")
 async def prepare_db_and_redis_without_basic_plan() -> AsyncGenerator[None, None]:
     basic_plan = None
-    basic_plan_redis = None
     client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
     db = client["8_films"]
 
@@ -196,16 +237,95 @@ async def prepare_db_and_redis_without_basic_plan() -> AsyncGenerator[None, None
 
     await init_redis()
     redis_client = get_redis_client()
-    if redis_client:
-        basic_plan_redis = await redis_client.get("plan:Базовый")
-        await redis_client.delete("plan:Базовый")
+    await reload_plan_catalog(redis_client)
 
     yield
 
     if basic_plan:
         await db.subscriptionplans.insert_one(basic_plan)
-    if basic_plan_redis:
-        await redis_client.set("plan:Базовый", basic_plan_redis)
+    await reload_plan_catalog(redis_client)
     client.close()
     await close_redis()
-    await asyncio.sleep(1)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def cache_redis() -> AsyncGenerator[Any, None]:
+    await init_redis()
+    redis_client = get_redis_client()
+
+    yield redis_client
+
+    keys = [key async for key in redis_client.scan_iter("cache_test*")]
+    keys += [key async for key in redis_client.scan_iter("lock:cache_test*")]
+    if keys:
+        await redis_client.delete(*keys)
+    await close_redis()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def plans_db() -> AsyncGenerator[list, None]:
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+    db = client["8_films"]
+    await init_beanie(database=db, document_models=[SubscriptionPlan])
+    plan_ids: list = []
+
+    yield plan_ids
+
+    try:
+        if plan_ids:
+            await db.subscriptionplans.delete_many({"_id": {"$in": plan_ids}})
+            await notify_plans_changed()
+    finally:
+        client.close()
+
+
+@pytest_asyncio.fixture(scope="class")
+async def admin_access_token(
+    api_client_user: UserClient, api_client_admin: AdminClient
+) -> AsyncGenerator[str, None]:
+    user_data = CreateUserData.base_user_data.copy()
+    user_data["email"] = f"admin_{uuid.uuid4()}@example.com"
+    user_data["username"] = f"admin_{uuid.uuid4()}"
+    response = await api_client_user.register_user(user_data)
+    assert response.status_code == 201
+    user_id = response.json()["user"]["id"]
+
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+    try:
+        db = client["8_films"]
+        await db.users.update_one(
+            {"_id": ObjectId(user_id)}, {"$set": {"role": "admin"}}
+        )
+    finally:
+        client.close()
+    await clean_user_cache_redis(user_id)
+
+    response = await api_client_admin.login_admin(
+        {"email": user_data["email"], "password": user_data["password"]}
+    )
+    assert response.status_code == 200
+
+    yield response.json()["accessToken"]
+
+    await delete_users_from_db(user_id)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def registered_users_for_admin(
+    api_client_user: UserClient,
+) -> AsyncGenerator[AdminUsersCreationFunction, None]:
+    user_ids = []
+
+    async def create_user(username: str) -> str:
+        user_data = CreateUserData.base_user_data.copy()
+        user_data["email"] = f"{username}@example.com"
+        user_data["username"] = username
+        response = await api_client_user.register_user(user_data)
+        assert response.status_code == 201
+        user_ids.append(response.json()["user"]["id"])
+        return user_ids[-1]
+
+    yield create_user
+
+    if user_ids:
+        await delete_users_from_db(*user_ids)